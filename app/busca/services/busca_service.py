@@ -0,0 +1,311 @@
+"""
+Service de Busca Textual
+Busca unificada em pacientes, solicitações de exame e laudos
+
+Cada tabela pesquisável tem uma coluna tsvector ("buscaVetor") mantida por
+trigger e indexada com GIN. A configuração pt_unaccent é a `portuguese` com
+unaccent antes do stemmer, de modo que "Joao" encontra "João". Os termos
+digitados viram prefixos (`term:*`), então a busca funciona enquanto o
+usuário digita.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import exists, func, literal, text
+from sqlalchemy.orm import Session
+
+from app.gestao_perfis.models.usuario import Usuario, TipoUsuario
+from app.gestao_perfis.models.paciente import Paciente
+from app.gestao_perfis.models.medico_paciente import MedicoPaciente
+from app.gestao_exames.models.solicitacao_exame import SolicitacaoExame
+from app.gestao_exames.models.laudo import Laudo, StatusLaudo
+
+CONFIG = "pt_unaccent"
+
+TIPOS = ("paciente", "solicitacao", "laudo")
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 50
+
+# Expressão do vetor de cada tabela; {r} é o registro (NEW no trigger ou o
+# nome da tabela na carga inicial). Peso A para o que identifica o registro.
+VETORES = {
+    "usuarios": (
+        ("nome", "email", "cpf"),
+        f"""
+        setweight(to_tsvector('{CONFIG}', coalesce({{r}}.nome, '')), 'A') ||
+        setweight(to_tsvector('{CONFIG}',
+            coalesce(regexp_replace({{r}}.cpf, '[^0-9]', '', 'g'), '')), 'A') ||
+        setweight(to_tsvector('{CONFIG}', coalesce({{r}}.email, '')), 'C')
+        """,
+    ),
+    "solicitacoes_exame": (
+        ("nomeExame", "hipoteseDiagnostica", "codigoSolicitacao"),
+        f"""
+        setweight(to_tsvector('{CONFIG}', coalesce({{r}}."nomeExame", '')), 'A') ||
+        setweight(to_tsvector('{CONFIG}', coalesce({{r}}."codigoSolicitacao", '')), 'A') ||
+        setweight(to_tsvector('{CONFIG}', coalesce({{r}}."hipoteseDiagnostica", '')), 'B')
+        """,
+    ),
+    "laudos": (
+        ("titulo", "descricao"),
+        f"""
+        setweight(to_tsvector('{CONFIG}', coalesce({{r}}.titulo, '')), 'A') ||
+        setweight(to_tsvector('{CONFIG}', coalesce({{r}}.descricao, '')), 'B')
+        """,
+    ),
+}
+
+CONFIG_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{CONFIG}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {CONFIG} (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION {CONFIG}
+                ALTER MAPPING FOR hword, hword_part, word
+                WITH unaccent, portuguese_stem;
+        END IF;
+    END
+    $$
+    """,
+]
+
+# Nome sem acentos, minúsculo e com espaços simples (autocomplete) e
+# telefone só com dígitos (busca exata), mantidos no próprio usuário
+NORMALIZACAO_SQL = [
+    'ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS "nomeNormalizado" varchar COLLATE "C"',
+    'ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS "telefoneDigitos" varchar',
+    """
+    CREATE OR REPLACE FUNCTION usuarios_normalizar() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW."nomeNormalizado" :=
+            regexp_replace(lower(unaccent(trim(NEW.nome))), '\\s+', ' ', 'g');
+        NEW."telefoneDigitos" :=
+            nullif(regexp_replace(NEW.telefone, '[^0-9]', '', 'g'), '');
+        RETURN NEW;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS usuarios_normalizar ON usuarios",
+    """
+    CREATE TRIGGER usuarios_normalizar
+    BEFORE INSERT OR UPDATE OF nome, telefone ON usuarios
+    FOR EACH ROW EXECUTE FUNCTION usuarios_normalizar()
+    """,
+    'CREATE INDEX IF NOT EXISTS ix_usuarios_nome_normalizado ON usuarios ("nomeNormalizado")',
+    'CREATE INDEX IF NOT EXISTS "ix_usuarios_telefoneDigitos" ON usuarios ("telefoneDigitos")',
+    """
+    UPDATE usuarios SET nome = nome
+    WHERE "nomeNormalizado" IS NULL
+    """,
+]
+
+
+def normalizar_nome(nome: str) -> str:
+    """Mesma normalização do trigger usuarios_normalizar (sem acentos, minúsculo)"""
+    decomposto = unicodedata.normalize("NFKD", nome or "")
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.lower().split())
+
+
+def _vetor_sql(tabela: str) -> List[str]:
+    """DDL da coluna, trigger, índice GIN e carga inicial de uma tabela"""
+    colunas, expressao = VETORES[tabela]
+    lista_colunas = ", ".join(f'"{c}"' for c in colunas)
+    return [
+        f'ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS "buscaVetor" tsvector',
+        f"""
+        CREATE OR REPLACE FUNCTION {tabela}_busca_vetor() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW."buscaVetor" := {expressao.format(r="NEW")};
+            RETURN NEW;
+        END
+        $$
+        """,
+        f"DROP TRIGGER IF EXISTS {tabela}_busca ON {tabela}",
+        f"""
+        CREATE TRIGGER {tabela}_busca
+        BEFORE INSERT OR UPDATE OF {lista_colunas} ON {tabela}
+        FOR EACH ROW EXECUTE FUNCTION {tabela}_busca_vetor()
+        """,
+        f'CREATE INDEX IF NOT EXISTS ix_{tabela}_busca ON {tabela} USING gin ("buscaVetor")',
+        f"""
+        UPDATE {tabela} SET "buscaVetor" = {expressao.format(r=tabela)}
+        WHERE "buscaVetor" IS NULL
+        """,
+    ]
+
+
+def consulta_texto(termo: str):
+    """
+    tsquery de prefixo para o termo digitado (None se não houver palavras).
+    Só letras e dígitos passam, então a entrada nunca quebra a sintaxe.
+    """
+    palavras = re.findall(r"\w+", termo or "")
+    if not palavras:
+        return None
+    return func.to_tsquery(CONFIG, " & ".join(f"{p}:*" for p in palavras))
+
+
+class BuscaService:
+    """Service para busca textual com visibilidade por tipo de usuário"""
+
+    @staticmethod
+    def instalar(db: Session):
+        """Cria configuração, colunas, triggers e índices e faz a carga inicial (idempotente)"""
+        for sql in CONFIG_SQL:
+            db.execute(text(sql))
+        for tabela in VETORES:
+            for sql in _vetor_sql(tabela):
+                db.execute(text(sql))
+        for sql in NORMALIZACAO_SQL:
+            db.execute(text(sql))
+        db.commit()
+
+    @staticmethod
+    def filtro(coluna, termo: str):
+        """Condição `coluna @@ consulta` para as listagens com ?search="""
+        consulta = consulta_texto(termo)
+        if consulta is None:
+            return literal(True)
+        return coluna.op("@@")(consulta)
+
+    @staticmethod
+    def _buscar_pacientes(db: Session, usuario: Usuario, consulta, limite: int):
+        rank = func.ts_rank_cd(Usuario.buscaVetor, consulta).label("rank")
+        query = (
+            db.query(
+                Usuario.id,
+                Usuario.nome,
+                Usuario.cpf,
+                rank,
+            )
+            .join(Paciente, Paciente.usuarioId == Usuario.id)
+            .filter(Usuario.buscaVetor.op("@@")(consulta))
+        )
+        if usuario.tipo == TipoUsuario.MEDICO:
+            # Mesma regra de /pacientes: pacientes que o médico já atendeu
+            query = query.filter(
+                exists().where(
+                    MedicoPaciente.pacienteId == Usuario.id,
+                    MedicoPaciente.medicoId == usuario.id,
+                )
+            )
+        return [
+            {
+                "tipo": "paciente",
+                "id": r.id,
+                "titulo": r.nome,
+                "detalhe": r.cpf,
+                "data": None,
+                "rank": r.rank,
+            }
+            for r in query.order_by(rank.desc()).limit(limite)
+        ]
+
+    @staticmethod
+    def _buscar_solicitacoes(db: Session, usuario: Usuario, consulta, limite: int):
+        rank = func.ts_rank_cd(SolicitacaoExame.buscaVetor, consulta).label("rank")
+        query = db.query(
+            SolicitacaoExame.id,
+            SolicitacaoExame.nomeExame,
+            SolicitacaoExame.codigoSolicitacao,
+            SolicitacaoExame.pacienteId,
+            SolicitacaoExame.dataSolicitacao,
+            rank,
+        ).filter(SolicitacaoExame.buscaVetor.op("@@")(consulta))
+
+        if usuario.tipo == TipoUsuario.MEDICO:
+            query = query.filter(SolicitacaoExame.medicoSolicitante == usuario.id)
+        elif usuario.tipo == TipoUsuario.PACIENTE:
+            query = query.filter(SolicitacaoExame.pacienteId == usuario.id)
+
+        return [
+            {
+                "tipo": "solicitacao",
+                "id": r.id,
+                "titulo": r.nomeExame,
+                "detalhe": r.codigoSolicitacao,
+                "paciente_id": r.pacienteId,
+                "data": r.dataSolicitacao.isoformat() if r.dataSolicitacao else None,
+                "rank": r.rank,
+            }
+            for r in query.order_by(rank.desc()).limit(limite)
+        ]
+
+    @staticmethod
+    def _buscar_laudos(db: Session, usuario: Usuario, consulta, limite: int):
+        rank = func.ts_rank_cd(Laudo.buscaVetor, consulta).label("rank")
+        query = db.query(
+            Laudo.id,
+            Laudo.titulo,
+            Laudo.status,
+            Laudo.pacienteId,
+            Laudo.dataEmissao,
+            rank,
+        ).filter(Laudo.buscaVetor.op("@@")(consulta))
+
+        if usuario.tipo == TipoUsuario.MEDICO:
+            query = query.filter(Laudo.medicoId == usuario.id)
+        elif usuario.tipo == TipoUsuario.PACIENTE:
+            # Paciente só vê laudos finalizados
+            query = query.filter(
+                Laudo.pacienteId == usuario.id,
+                Laudo.status == StatusLaudo.FINALIZADO,
+            )
+
+        return [
+            {
+                "tipo": "laudo",
+                "id": r.id,
+                "titulo": r.titulo,
+                "detalhe": r.status.value,
+                "paciente_id": r.pacienteId,
+                "data": r.dataEmissao.isoformat() if r.dataEmissao else None,
+                "rank": r.rank,
+            }
+            for r in query.order_by(rank.desc()).limit(limite)
+        ]
+
+    @staticmethod
+    def buscar(
+        db: Session,
+        usuario: Usuario,
+        termo: str,
+        tipos: Optional[Sequence[str]] = None,
+        limite: int = LIMITE_PADRAO,
+    ) -> List[Dict]:
+        """
+        Resultados de todos os tipos visíveis ao usuário, do mais relevante
+        para o menos relevante. Cada tipo é uma consulta no seu índice GIN
+        limitada a `limite`; o merge final acontece em memória.
+        """
+        consulta = consulta_texto(termo)
+        if consulta is None:
+            return []
+
+        limite = max(1, min(limite, LIMITE_MAXIMO))
+        tipos = set(tipos or TIPOS)
+
+        buscas = {
+            "paciente": BuscaService._buscar_pacientes,
+            "solicitacao": BuscaService._buscar_solicitacoes,
+            "laudo": BuscaService._buscar_laudos,
+        }
+        if usuario.tipo == TipoUsuario.PACIENTE:
+            # Paciente não pesquisa o cadastro de outros pacientes
+            buscas.pop("paciente")
+
+        resultados = []
+        for tipo, buscar in buscas.items():
+            if tipo in tipos:
+                resultados.extend(buscar(db, usuario, consulta, limite))
+
+        resultados.sort(key=lambda r: r["rank"], reverse=True)
+        return resultados[:limite]
@@ -7,7 +7,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.gestao_perfis.services.auth_service import AuthService
 from app.gestao_perfis.models.usuario import Usuario
 
@@ -53,6 +53,25 @@ def get_current_user(
         raise credentials_exception
 
 
+def autenticar_token(token: str) -> Optional[Usuario]:
+    """
+    Autenticação para conexões de longa duração (SSE/WebSocket), onde o
+    token chega pela query string. Usa uma sessão própria, fechada logo
+    após a consulta, para não reter uma conexão do pool durante o stream.
+    """
+    payload = AuthService.verificar_token(token)
+    if payload is None or payload.get("sub") is None:
+        return None
+
+    db = SessionLocal()
+    try:
+        return AuthService.buscar_usuario_por_id(db, int(payload["sub"]))
+    except Exception:
+        return None
+    finally:
+        db.close()
+
+
 def get_current_active_user(
     current_user: Usuario = Depends(get_current_user),
 ) -> Usuario:
@@ -0,0 +1,245 @@
+"""
+Barramento de eventos entre workers
+
+Cada worker mantém estado em memória (caches, conexões de push) que precisa
+saber das escritas feitas pelos outros workers. O barramento entrega
+mensagens JSON por canal a todos os processos, com backends plugáveis:
+
+- postgres (padrão): LISTEN/NOTIFY no próprio banco da aplicação
+- redis: pub/sub em um servidor compatível com Redis (REDIS_URL)
+- local: apenas o processo atual (desenvolvimento/testes)
+
+Mensagens publicadas pelo próprio worker são entregues localmente na hora
+e ignoradas quando voltam pelo backend.
+
+Mensagens publicadas enquanto a escuta está caída se perdem. Por isso, a
+cada reconexão os callbacks de ao_reconectar descartam o estado local que
+dependia delas (ex.: todos os caches).
+"""
+
+import json
+import logging
+import os
+import select
+import threading
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+BARRAMENTO_BACKEND = os.getenv("BARRAMENTO_BACKEND", "postgres")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Identifica este processo nas mensagens publicadas
+ORIGEM = uuid.uuid4().hex
+
+Callback = Callable[[dict], None]
+
+
+class BackendLocal:
+    """Sem transporte: só os assinantes do próprio processo recebem"""
+
+    remoto = False
+
+    def publicar(self, canal: str, mensagem: str):
+        pass
+
+    def escutar(self, canais: List[str], ao_receber, parar: threading.Event, ao_conectar):
+        pass
+
+
+class BackendPostgres:
+    """Transporte via LISTEN/NOTIFY do PostgreSQL"""
+
+    remoto = True
+
+    def __init__(self):
+        self.dsn = engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+
+    def publicar(self, canal: str, mensagem: str):
+        with engine.connect() as conn:
+            conn.execute(
+                text("SELECT pg_notify(:canal, :mensagem)"),
+                {"canal": canal, "mensagem": mensagem},
+            )
+            conn.commit()
+
+    def escutar(self, canais: List[str], ao_receber, parar: threading.Event, ao_conectar):
+        import psycopg2
+        import psycopg2.extensions
+
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        try:
+            with conn.cursor() as cur:
+                for canal in canais:
+                    cur.execute(f'LISTEN "{canal}"')
+            ao_conectar()
+
+            while not parar.is_set():
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notificacao = conn.notifies.pop(0)
+                    ao_receber(notificacao.channel, notificacao.payload)
+        finally:
+            conn.close()
+
+
+class BackendRedis:
+    """Transporte via pub/sub de um servidor compatível com Redis"""
+
+    remoto = True
+
+    def __init__(self, url: str = REDIS_URL):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "BARRAMENTO_BACKEND=redis requer o pacote 'redis' instalado"
+            ) from e
+
+        self.cliente = redis.Redis.from_url(url)
+
+    def publicar(self, canal: str, mensagem: str):
+        self.cliente.publish(canal, mensagem)
+
+    def escutar(self, canais: List[str], ao_receber, parar: threading.Event, ao_conectar):
+        pubsub = self.cliente.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(*canais)
+        try:
+            ao_conectar()
+            while not parar.is_set():
+                mensagem = pubsub.get_message(timeout=1.0)
+                if mensagem and mensagem["type"] == "message":
+                    canal = mensagem["channel"]
+                    dados = mensagem["data"]
+                    ao_receber(
+                        canal.decode() if isinstance(canal, bytes) else canal,
+                        dados.decode() if isinstance(dados, bytes) else dados,
+                    )
+        finally:
+            pubsub.close()
+
+
+BACKENDS = {
+    "local": BackendLocal,
+    "postgres": BackendPostgres,
+    "redis": BackendRedis,
+}
+
+
+class Barramento:
+    """Publica e distribui mensagens por canal entre todos os workers"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._assinantes: Dict[str, List[Callback]] = {}
+        self._ao_reconectar: List[Callable[[], None]] = []
+        self._conexoes = 0
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def assinar(self, canal: str, callback: Callback):
+        """Registra um callback para as mensagens do canal"""
+        self._assinantes.setdefault(canal, []).append(callback)
+
+    def ao_reconectar(self, callback: Callable[[], None]):
+        """
+        Registra um callback chamado quando a escuta volta após uma queda,
+        para descartar o estado que pode ter perdido mensagens
+        """
+        self._ao_reconectar.append(callback)
+
+    def publicar(self, canal: str, dados: dict):
+        """
+        Entrega a mensagem aos assinantes locais e aos demais workers.
+        Falhas no transporte são registradas mas não propagadas: a escrita
+        que originou o evento já foi confirmada.
+        """
+        self._entregar(canal, dados)
+
+        if not self.backend.remoto:
+            return
+        try:
+            mensagem = json.dumps({"origem": ORIGEM, "dados": dados}, default=str)
+            self.backend.publicar(canal, mensagem)
+        except Exception:
+            logger.exception("Falha ao publicar no barramento (canal=%s)", canal)
+
+    def _entregar(self, canal: str, dados: dict):
+        for callback in self._assinantes.get(canal, []):
+            try:
+                callback(dados)
+            except Exception:
+                logger.exception("Erro no assinante do canal %s", canal)
+
+    def _ao_receber(self, canal: str, mensagem: str):
+        try:
+            envelope = json.loads(mensagem)
+        except ValueError:
+            logger.warning("Mensagem inválida no canal %s: %r", canal, mensagem)
+            return
+        if envelope.get("origem") == ORIGEM:
+            return
+        self._entregar(canal, envelope.get("dados") or {})
+
+    def _conectado(self):
+        self._conexoes += 1
+        if self._conexoes == 1:
+            return
+        logger.warning("Barramento reconectado; descartando estado local")
+        for callback in self._ao_reconectar:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Erro no callback de reconexão do barramento")
+
+    def _loop(self):
+        espera = 1.0
+        while not self._parar.is_set():
+            try:
+                self.backend.escutar(
+                    list(self._assinantes), self._ao_receber, self._parar, self._conectado
+                )
+                espera = 1.0
+            except Exception:
+                logger.exception("Conexão do barramento perdida; reconectando")
+                self._parar.wait(espera)
+                espera = min(espera * 2, 30.0)
+
+    def iniciar(self):
+        """
+        Inicia a escuta em background (uma conexão por worker).
+        Os canais escutados são os que já têm assinantes neste momento.
+        """
+        if not self.backend.remoto or self._thread is not None:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="barramento", daemon=True
+        )
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def criar_barramento(nome_backend: str = BARRAMENTO_BACKEND) -> Barramento:
+    backend_cls = BACKENDS.get(nome_backend)
+    if backend_cls is None:
+        raise ValueError(f"Backend de barramento desconhecido: {nome_backend}")
+    return Barramento(backend_cls())
+
+
+barramento = criar_barramento()
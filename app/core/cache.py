@@ -0,0 +1,250 @@
+"""
+Cache em memória para funções de service
+
+- TTL por namespace (ou por chave, passando uma função como ttl)
+- Coalescência de misses concorrentes (single-flight): apenas uma thread
+  recalcula a chave enquanto as demais aguardam o mesmo resultado
+- Memória limitada com expulsão LRU
+- Invalidação explícita por prefixo de chave, opcionalmente adiada para
+  depois do commit da sessão que fez a escrita, propagada a todos os
+  workers pelo barramento (app.core.barramento)
+- Métricas de hit/miss por namespace
+"""
+
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Union
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.barramento import barramento
+
+CANAL_INVALIDACAO = "cache_invalidacao"
+
+
+class _Carga:
+    """Carga em andamento de uma chave (single-flight)"""
+
+    __slots__ = ("evento", "valor", "erro", "invalidada")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.valor = None
+        self.erro = None
+        self.invalidada = False
+
+
+class CacheTTL:
+    """Cache LRU com expiração por TTL, seguro para uso entre threads"""
+
+    def __init__(
+        self,
+        nome: str,
+        ttl: Union[float, Callable[[tuple], float]] = 60,
+        max_itens: int = 1024,
+    ):
+        self.nome = nome
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[tuple, tuple[float, Any]]" = OrderedDict()
+        self._cargas: Dict[tuple, _Carga] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalescidos = 0
+        self.expulsoes = 0
+
+    def _ttl_da_chave(self, chave: tuple) -> float:
+        return self.ttl(chave) if callable(self.ttl) else self.ttl
+
+    def obter(self, chave: tuple, carregar: Callable[[], Any]) -> Any:
+        """Retorna o valor em cache ou executa `carregar` (uma vez por chave)"""
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                if item[0] > agora:
+                    self._itens.move_to_end(chave)
+                    self.hits += 1
+                    return item[1]
+                del self._itens[chave]
+
+            carga = self._cargas.get(chave)
+            if carga is not None:
+                self.coalescidos += 1
+                lider = False
+            else:
+                carga = _Carga()
+                self._cargas[chave] = carga
+                self.misses += 1
+                lider = True
+
+        if not lider:
+            carga.evento.wait()
+            if carga.erro is not None:
+                raise carga.erro
+            return carga.valor
+
+        try:
+            carga.valor = carregar()
+        except BaseException as e:
+            carga.erro = e
+            raise
+        else:
+            with self._lock:
+                # Uma invalidação durante a carga torna o valor suspeito
+                if not carga.invalidada:
+                    expira_em = time.monotonic() + self._ttl_da_chave(chave)
+                    self._itens[chave] = (expira_em, carga.valor)
+                    self._itens.move_to_end(chave)
+                    while len(self._itens) > self.max_itens:
+                        self._itens.popitem(last=False)
+                        self.expulsoes += 1
+            return carga.valor
+        finally:
+            with self._lock:
+                self._cargas.pop(chave, None)
+            carga.evento.set()
+
+    def invalidar(self, *prefixo) -> int:
+        """Remove as chaves que começam com `prefixo` (sem prefixo: todas)"""
+        n = len(prefixo)
+        with self._lock:
+            chaves = [c for c in self._itens if c[:n] == prefixo]
+            for chave in chaves:
+                del self._itens[chave]
+            for chave, carga in self._cargas.items():
+                if chave[:n] == prefixo:
+                    carga.invalidada = True
+        return len(chaves)
+
+    def atualizar(self, chave: tuple, fn: Callable[[Any], None]) -> bool:
+        """
+        Aplica `fn` ao valor em cache (mutável) sem recarregá-lo.
+        Uma carga em andamento da mesma chave é descartada, já que pode ter
+        lido o estado anterior à mudança. Retorna se havia valor em cache.
+        """
+        with self._lock:
+            carga = self._cargas.get(chave)
+            if carga is not None:
+                carga.invalidada = True
+            item = self._itens.get(chave)
+            if item is None:
+                return False
+            fn(item[1])
+            return True
+
+    def metricas(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalescidos": self.coalescidos,
+                "expulsoes": self.expulsoes,
+                "taxa_acerto": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+_caches: Dict[str, CacheTTL] = {}
+
+
+def obter_cache(
+    nome: str,
+    ttl: Union[float, Callable[[tuple], float]] = 60,
+    max_itens: int = 1024,
+) -> CacheTTL:
+    """Retorna o namespace `nome`, criando-o na primeira chamada"""
+    cache = _caches.get(nome)
+    if cache is None:
+        cache = _caches.setdefault(nome, CacheTTL(nome, ttl, max_itens))
+    return cache
+
+
+def em_cache(
+    nome: str,
+    ttl: Union[float, Callable[[tuple], float]] = 60,
+    max_itens: int = 1024,
+):
+    """
+    Decorator para funções de service no formato `fn(db, *args)`.
+    A sessão (primeiro parâmetro) não entra na chave; os demais argumentos,
+    na ordem da assinatura, formam a chave usada para invalidação por prefixo.
+    O valor retornado não deve conter objetos ORM (ficam presos à sessão).
+    """
+    cache = obter_cache(nome, ttl, max_itens)
+
+    def decorator(fn):
+        assinatura = inspect.signature(fn)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            argumentos = assinatura.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            chave = tuple(argumentos.arguments.values())[1:]
+            return cache.obter(chave, lambda: fn(*args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def invalidar(nome: str, *prefixo):
+    """
+    Invalida chaves de um namespace neste worker e publica o evento para
+    que os demais workers façam o mesmo. Os elementos do prefixo precisam
+    ser serializáveis em JSON (ids, strings).
+    """
+    barramento.publicar(CANAL_INVALIDACAO, {"nome": nome, "prefixo": list(prefixo)})
+
+
+def _invalidar_local(dados: dict):
+    cache = _caches.get(dados.get("nome"))
+    if cache is not None:
+        cache.invalidar(*dados.get("prefixo", []))
+
+
+barramento.assinar(CANAL_INVALIDACAO, _invalidar_local)
+
+
+def limpar_tudo():
+    """Esvazia todos os namespaces deste worker"""
+    for cache in list(_caches.values()):
+        cache.invalidar()
+
+
+# Invalidações publicadas com a escuta caída se perderam
+barramento.ao_reconectar(limpar_tudo)
+
+
+def invalidar_apos_commit(db: Session, nome: str, *prefixo):
+    """
+    Agenda a invalidação para depois do commit da sessão.
+    Evita que uma leitura concorrente recoloque no cache o estado anterior
+    à escrita; em caso de rollback nada é invalidado.
+    """
+    db.info.setdefault("invalidacoes_cache", []).append((nome, prefixo))
+
+
+def metricas() -> dict:
+    """Métricas de todos os namespaces registrados"""
+    return {nome: cache.metricas() for nome, cache in _caches.items()}
+
+
+@event.listens_for(Session, "after_commit")
+def _aplicar_invalidacoes(session: Session):
+    for nome, prefixo in session.info.pop("invalidacoes_cache", []):
+        invalidar(nome, *prefixo)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_invalidacoes(session: Session, previous_transaction):
+    session.info.pop("invalidacoes_cache", None)
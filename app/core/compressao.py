@@ -0,0 +1,117 @@
+"""
+Compressão das respostas (brotli ou gzip)
+
+Negocia pelo Accept-Encoding, preferindo brotli quando o pacote está
+instalado (menor que gzip para JSON com textos longos, como descricao e
+observacoes). Só comprime respostas de corpo único, de tipos textuais e a
+partir de um tamanho mínimo: abaixo disso o cabeçalho e a CPU não compensam.
+Respostas em streaming (SSE de /eventos/stream, arquivos) passam intactas.
+"""
+
+import gzip
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # opcional: sem o pacote, só gzip
+    brotli = None
+
+TIPOS_COMPRIMIVEIS = ("application/json", "text/html", "text/plain", "text/csv")
+
+
+def escolher_codificacao(accept_encoding: str) -> Optional[str]:
+    """'br', 'gzip' ou None conforme o que o cliente aceita (q=0 recusa)"""
+    aceitas = set()
+    for item in accept_encoding.lower().split(","):
+        nome, _, parametros = item.strip().partition(";")
+        if parametros.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        aceitas.add(nome.strip())
+    if brotli is not None and "br" in aceitas:
+        return "br"
+    if "gzip" in aceitas:
+        return "gzip"
+    return None
+
+
+def comprimir(corpo: bytes, codificacao: str, nivel_gzip: int, nivel_brotli: int) -> bytes:
+    if codificacao == "br":
+        return brotli.compress(corpo, quality=nivel_brotli)
+    return gzip.compress(corpo, compresslevel=nivel_gzip)
+
+
+class CompressaoMiddleware:
+    """Middleware ASGI de compressão com tamanho mínimo"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimo_bytes: int = 1024,
+        nivel_gzip: int = 6,
+        nivel_brotli: int = 4,
+    ):
+        self.app = app
+        self.minimo_bytes = minimo_bytes
+        self.nivel_gzip = nivel_gzip
+        self.nivel_brotli = nivel_brotli
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacao = escolher_codificacao(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        inicio: Optional[Message] = None
+        repassar = False
+
+        async def enviar(mensagem: Message):
+            nonlocal inicio, repassar
+
+            if mensagem["type"] == "http.response.start":
+                inicio = mensagem
+                cabecalhos = Headers(raw=mensagem["headers"])
+                tipo = cabecalhos.get("content-type", "")
+                comprimivel = tipo.startswith(TIPOS_COMPRIMIVEIS)
+                if comprimivel:
+                    # Caches intermediários separam as versões por codificação
+                    MutableHeaders(raw=mensagem["headers"]).add_vary_header(
+                        "Accept-Encoding"
+                    )
+                repassar = (
+                    codificacao is None
+                    or not comprimivel
+                    or "content-encoding" in cabecalhos
+                )
+                if repassar:
+                    await send(mensagem)
+                return
+
+            if mensagem["type"] != "http.response.body" or repassar:
+                await send(mensagem)
+                return
+
+            # Primeiro corpo: decide entre comprimir ou repassar o resto
+            repassar = True
+            corpo = mensagem.get("body", b"")
+            if mensagem.get("more_body", False) or len(corpo) < self.minimo_bytes:
+                await send(inicio)
+                await send(mensagem)
+                return
+
+            corpo = comprimir(corpo, codificacao, self.nivel_gzip, self.nivel_brotli)
+            cabecalhos = MutableHeaders(raw=inicio["headers"])
+            cabecalhos["Content-Encoding"] = codificacao
+            cabecalhos["Content-Length"] = str(len(corpo))
+            etag = cabecalhos.get("etag")
+            if etag and not etag.startswith("W/"):
+                # O corpo mudou byte a byte: o ETag forte deixa de valer
+                cabecalhos["ETag"] = "W/" + etag
+            await send(inicio)
+            await send({**mensagem, "body": corpo})
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,113 @@
+"""
+ETags fracos e respostas 304 para listagens e detalhes
+
+A versão de uma listagem é (count, max(id), max("atualizadoEm")) da query já
+filtrada, calculada numa única consulta que só lê as colunas da tabela
+principal e que substitui o count que a paginação já fazia. Inserções mudam
+max(id), exclusões mudam o count e edições mudam max("atualizadoEm"). Se o
+If-None-Match do cliente bate, a rota responde 304 sem buscar a página, sem
+carregar relacionamentos e sem serializar.
+
+As respostas também trazem campos de tabelas relacionadas (nome e CPF do
+paciente, CRM do médico, dados da solicitação). Cada uma entra na versão por
+um marcador: o max("atualizadoEm") das linhas relacionadas, numa subconsulta
+correlacionada à tabela principal (ver marcador). Assim, renomear um paciente
+ou editar uma solicitação também muda o ETag.
+
+O ETag inclui o usuário e a query string (página, filtros, fields), pois a
+mesma URL devolve conteúdos diferentes por usuário. É fraco (W/): a versão
+não é um hash do corpo.
+"""
+
+import hashlib
+from typing import Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Query, Session
+
+COLUNA_ATUALIZACAO = "atualizadoEm"
+
+# Incrementar quando o formato das respostas mudar, para invalidar os ETags
+VERSAO_FORMATO = 1
+
+
+def gerar_etag(*partes) -> str:
+    resumo = hashlib.sha1(repr((VERSAO_FORMATO,) + partes).encode()).hexdigest()
+    return f'W/"{resumo[:24]}"'
+
+
+def cabecalhos(etag: str) -> dict:
+    # Cliente pode guardar, mas deve revalidar sempre (resposta por usuário)
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def nao_modificado(request: Request, etag: str) -> bool:
+    """If-None-Match contém o ETag (comparação fraca)"""
+    cabecalho = request.headers.get("if-none-match")
+    if not cabecalho:
+        return False
+    if cabecalho.strip() == "*":
+        return True
+    alvo = etag.removeprefix("W/")
+    return any(t.strip().removeprefix("W/") == alvo for t in cabecalho.split(","))
+
+
+def resposta_304(etag: str) -> Response:
+    return Response(status_code=304, headers=cabecalhos(etag))
+
+
+def marcador(principal, atualizado_em, *condicoes):
+    """
+    max(atualizado_em) das linhas relacionadas a cada linha de principal,
+    para versao_da_listagem/versao_do_registro. As condições ligam a tabela
+    relacionada à principal, ex.: marcador(Laudo, Medico.atualizadoEm,
+    Medico.usuarioId == Laudo.medicoId).
+    """
+    return (
+        select(func.max(atualizado_em))
+        .where(*condicoes)
+        .correlate(principal)
+        .scalar_subquery()
+    )
+
+
+def versao_da_listagem(
+    query: Query, chave, atualizado_em, *marcadores
+) -> Tuple[int, tuple]:
+    """
+    (total, versão) da query da listagem. O total serve para a paginação
+    (apply_pagination(..., total=total)), evitando o count separado.
+    """
+    colunas = [chave.label("chave"), atualizado_em.label("atualizado")] + [
+        m.label(f"marcador_{i}") for i, m in enumerate(marcadores)
+    ]
+    sub = query.with_entities(*colunas).order_by(None).subquery()
+    versao = query.session.query(
+        func.count(), *(func.max(c) for c in sub.c)
+    ).one()
+    return versao[0], tuple(versao)
+
+
+def versao_do_registro(
+    db: Session, chave, atualizado_em, valor, *marcadores
+) -> Optional[tuple]:
+    """Versão de um registro pelo id; None se não existir"""
+    linha = db.query(chave, atualizado_em, *marcadores).filter(chave == valor).first()
+    return tuple(linha) if linha else None
+
+
+def instalar(db: Session, tabelas: Iterable[str]):
+    """
+    Adiciona a coluna de atualização em tabelas criadas antes dela. O default
+    é em UTC, como o datetime.utcnow dos modelos: com now() no fuso do banco,
+    uma edição posterior poderia ficar abaixo do max() e não mudar a versão.
+    """
+    for tabela in tabelas:
+        db.execute(
+            text(
+                f'ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS "{COLUNA_ATUALIZACAO}" '
+                "timestamp DEFAULT timezone('utc', now())"
+            )
+        )
+    db.commit()
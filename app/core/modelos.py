@@ -0,0 +1,13 @@
+"""
+Registro de todos os modelos no Base.metadata
+
+Os relacionamentos são declarados por nome ("Consulta", "Paciente", ...) e
+o SQLAlchemy só os resolve se todas as classes tiverem sido importadas.
+A API importa tudo pelo main; scripts avulsos devem importar este módulo
+antes de usar o ORM.
+"""
+
+import app.gestao_perfis.models  # noqa: F401
+import app.gestao_consultas.models  # noqa: F401
+import app.gestao_exames.models  # noqa: F401
+import app.idempotencia.models  # noqa: F401
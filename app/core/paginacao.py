@@ -0,0 +1,87 @@
+"""
+Paginação por cursor (keyset)
+
+O cursor é opaco para o cliente: os valores da chave de ordenação do último
+item da página, serializados em JSON e codificados em base64 url-safe.
+A página seguinte filtra por `(colunas) < (valores)` em vez de OFFSET, de
+modo que o custo não cresce com a profundidade da navegação.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+
+# Limite máximo de itens por página em listagens com cursor
+LIMITE_MAXIMO = 200
+
+
+def _serializar(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return {"dt": valor.isoformat()}
+    return valor
+
+
+def _desserializar(valor: Any, coluna) -> Any:
+    """Valor do cursor no tipo da coluna; ValueError se não corresponder"""
+    if isinstance(valor, dict) and isinstance(valor.get("dt"), str):
+        valor = datetime.fromisoformat(valor["dt"])
+    try:
+        tipo = coluna.type.python_type
+    except (AttributeError, NotImplementedError):
+        tipo = None
+    # bool é subclasse de int, mas não é um id válido
+    if valor is None or isinstance(valor, bool) or (tipo and not isinstance(valor, tipo)):
+        raise ValueError("Cursor inválido")
+    return valor
+
+
+def codificar_cursor(*valores) -> str:
+    """Gera o cursor a partir dos valores da chave de ordenação"""
+    dados = json.dumps([_serializar(v) for v in valores], separators=(",", ":"))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, colunas: Sequence) -> list:
+    """
+    Recupera os valores da chave, conferindo o tipo de cada coluna;
+    ValueError se o cursor não for válido (a rota responde 400)
+    """
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        if not isinstance(valores, list) or len(valores) != len(colunas):
+            raise ValueError
+        return [_desserializar(v, c) for v, c in zip(valores, colunas)]
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+
+
+def limitar(limite: int) -> int:
+    """Restringe o tamanho de página a [1, LIMITE_MAXIMO]"""
+    return max(1, min(limite, LIMITE_MAXIMO))
+
+
+def aplicar_cursor(query, colunas: Sequence, cursor: Optional[str], descendente: bool = True):
+    """Filtra a query para começar depois do cursor (ordem de `colunas`)"""
+    if not cursor:
+        return query
+    valores = decodificar_cursor(cursor, colunas)
+    chave = tuple_(*colunas)
+    return query.filter(chave < tuple_(*valores) if descendente else chave > tuple_(*valores))
+
+
+def paginar(
+    query, limite: int, chave: Callable[[Any], tuple]
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Executa a query (já ordenada e filtrada pelo cursor) buscando um item a
+    mais para saber se há próxima página. Retorna (itens, proximo_cursor).
+    """
+    linhas = query.limit(limite + 1).all()
+    if len(linhas) <= limite:
+        return linhas, None
+    itens = linhas[:limite]
+    return itens, codificar_cursor(*chave(itens[-1]))
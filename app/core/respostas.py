@@ -0,0 +1,41 @@
+"""
+Respostas JSON renderizadas com orjson
+
+Para rotas com `response_model`, o FastAPI valida o retorno de novo contra o
+modelo e passa tudo por `jsonable_encoder` antes do `json.dumps`. Nas
+listagens isso é refeito para cada campo de cada item da página, embora os
+dados venham do banco e já tenham o formato certo.
+
+Retornando `RespostaORJSON` a rota pula essa etapa (o FastAPI não mexe em
+objetos Response) e o `response_model` fica só para a documentação. Os
+modelos devem ser montados com `model_construct`, sem validação; datetimes,
+dates e enums são serializados nativamente pelo orjson.
+"""
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _padrao(valor: Any) -> Any:
+    """Tipos que o orjson não conhece"""
+    if isinstance(valor, BaseModel):
+        # Campos do modelo; os aninhados voltam para cá
+        return valor.__dict__
+    if isinstance(valor, Decimal):
+        return float(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def serializar(conteudo: Any) -> bytes:
+    return orjson.dumps(conteudo, default=_padrao, option=orjson.OPT_NON_STR_KEYS)
+
+
+class RespostaORJSON(JSONResponse):
+    """JSONResponse que serializa com orjson, sem jsonable_encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return serializar(content)
@@ -3,10 +3,15 @@ Models - Gestão de Consultas
 """
 from .consulta import Consulta, StatusConsulta
 from .log_prontuario import LogProntuario, TipoEvento
+from .timeline_paciente import EventoTimeline
+from .consulta_diaria import ConsultaDiaria, MarcaRollup
 
 __all__ = [
     "Consulta",
     "StatusConsulta",
     "LogProntuario",
     "TipoEvento",
+    "EventoTimeline",
+    "ConsultaDiaria",
+    "MarcaRollup",
 ]
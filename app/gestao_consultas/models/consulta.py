@@ -2,7 +2,7 @@
 Modelo de Consulta
 """
 from enum import Enum
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text, Index, text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -19,6 +19,22 @@ class StatusConsulta(str, Enum):
 
 class Consulta(Base):
     __tablename__ = "consultas"
+    __table_args__ = (
+        # Disponibilidade e agenda do médico filtram por médico + horário
+        Index("ix_consultas_medico_data_hora", "medicoId", "dataHora"),
+        # Rollup diário da clínica (consultas_diarias) lê por período
+        Index("ix_consultas_data_hora", "dataHora"),
+        # Histórico do paciente, paginado por (dataHora, id)
+        Index("ix_consultas_paciente_data_hora", "pacienteId", "dataHora", "id"),
+        # Garante no banco que um horário tem no máximo uma consulta ativa
+        Index(
+            "uq_consultas_medico_data_hora_ativa",
+            "medicoId",
+            "dataHora",
+            unique=True,
+            postgresql_where=text("status IN ('AGENDADA', 'CONFIRMADA')"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     pacienteId = Column(Integer, ForeignKey("pacientes.usuarioId"), nullable=False)
@@ -28,6 +44,8 @@ class Consulta(Base):
     motivoConsulta = Column(Text)
     observacoes = Column(Text)
     linkSalaVirtual = Column(String)
+    # Duração do médico no agendamento (a dele pode mudar depois)
+    duracaoMinutos = Column(Integer)
     
     # Relacionamentos
     paciente = relationship("Paciente", foreign_keys=[pacienteId])
@@ -0,0 +1,39 @@
+"""
+Modelos do Rollup Diário de Consultas (dashboard de operações)
+"""
+
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+
+from app.core.database import Base
+
+
+class ConsultaDiaria(Base):
+    """
+    Desfecho das consultas de cada médico por dia. Só dias encerrados entram
+    no rollup: uma consulta ainda agendada/confirmada num dia que já passou
+    conta como falta (no-show).
+    """
+
+    __tablename__ = "consultas_diarias"
+
+    dia = Column(Date, primary_key=True)
+    medicoId = Column(Integer, ForeignKey("medicos.usuarioId"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0, server_default="0")
+    realizadas = Column(Integer, nullable=False, default=0, server_default="0")
+    canceladas = Column(Integer, nullable=False, default=0, server_default="0")
+    faltas = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<ConsultaDiaria(dia={self.dia}, medico={self.medicoId})>"
+
+
+class MarcaRollup(Base):
+    """Último dia já consolidado por cada rollup atualizado em lote"""
+
+    __tablename__ = "marcas_rollup"
+
+    nome = Column(String, primary_key=True)
+    processadoAte = Column(Date, nullable=False)
+
+    def __repr__(self):
+        return f"<MarcaRollup(nome={self.nome}, processadoAte={self.processadoAte})>"
@@ -2,7 +2,7 @@
 Modelo de Log do Prontuário
 """
 from enum import Enum
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text, Index, Identity, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -18,12 +18,31 @@ class TipoEvento(str, Enum):
 
 
 class LogProntuario(Base):
+    """
+    Tabela particionada por mês de dataEvento (RANGE). As partições são
+    criadas e arquivadas pelo ParticionamentoService; por isso a chave
+    primária inclui dataEvento.
+    """
+
     __tablename__ = "logs_prontuario"
+    __table_args__ = (
+        # Linha do tempo paginada por (dataEvento, id) decrescente; tipoEvento
+        # incluído filtra sem ir ao heap. descricao (texto livre) fica fora
+        # para o índice não crescer com ela: é lida só para a página
+        Index(
+            "ix_logs_prontuario_timeline",
+            "pacienteId",
+            text('"dataEvento" DESC'),
+            text("id DESC"),
+            postgresql_include=["tipoEvento"],
+        ),
+        {"postgresql_partition_by": 'RANGE ("dataEvento")'},
+    )
 
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, Identity(), primary_key=True)
     pacienteId = Column(Integer, ForeignKey("pacientes.usuarioId"), nullable=False)
     tipoEvento = Column(SQLEnum(TipoEvento), nullable=False)
-    dataEvento = Column(DateTime, default=datetime.utcnow)
+    dataEvento = Column(DateTime, primary_key=True, default=datetime.utcnow)
     descricao = Column(Text)
     referenciaId = Column(Integer)  # ID da consulta, exame, laudo, etc
     
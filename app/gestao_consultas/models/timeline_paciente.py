@@ -0,0 +1,55 @@
+"""
+Modelo da Linha do Tempo do Paciente (read model do prontuário)
+"""
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    ForeignKey,
+    Enum as SQLEnum,
+    Text,
+    Index,
+    UniqueConstraint,
+    text,
+)
+
+from app.core.database import Base
+from app.gestao_consultas.models.log_prontuario import TipoEvento
+
+
+class EventoTimeline(Base):
+    """
+    Evento do prontuário já desnormalizado com os campos exibidos na tela
+    (exame, médico, status, arquivo). Mantido pelo TimelineService nas
+    escritas de consultas, exames e laudos; nunca editado diretamente.
+    """
+
+    __tablename__ = "timeline_paciente"
+    __table_args__ = (
+        # Um evento por entidade de origem (permite upsert de status)
+        UniqueConstraint("tipoEvento", "referenciaId", name="uq_timeline_paciente_referencia"),
+        # A tela do prontuário é uma varredura de intervalo neste índice
+        Index(
+            "ix_timeline_paciente_data",
+            "pacienteId",
+            text('"dataEvento" DESC'),
+            text("id DESC"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    pacienteId = Column(Integer, ForeignKey("pacientes.usuarioId"), nullable=False)
+    tipoEvento = Column(SQLEnum(TipoEvento), nullable=False)
+    referenciaId = Column(Integer, nullable=False)
+    dataEvento = Column(DateTime, nullable=False)
+    titulo = Column(String, nullable=False)
+    status = Column(String)
+    medicoId = Column(Integer)
+    medicoNome = Column(String)
+    nomeLaboratorio = Column(String)
+    arquivoUrl = Column(String)
+    descricao = Column(Text)
+
+    def __repr__(self):
+        return f"<EventoTimeline(id={self.id}, tipo={self.tipoEvento}, paciente={self.pacienteId})>"
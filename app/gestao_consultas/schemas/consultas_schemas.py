@@ -2,7 +2,7 @@
 Schemas Pydantic para Gestão de Consultas
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -54,6 +54,41 @@ class DefinirHorarioAtendimentoRequest(BaseModel):
         }
 
 
+class IntervaloAtendimento(BaseModel):
+    inicio: str = Field(..., description="Início no formato HH:MM", pattern="^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$")
+    fim: str = Field(..., description="Fim no formato HH:MM (exclusivo)", pattern="^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$")
+
+
+class DiaAtendimento(BaseModel):
+    dia_semana: DiaSemanaEnum = Field(..., description="Dia da semana")
+    intervalos: List[IntervaloAtendimento] = Field(default_factory=list)
+
+
+class DefinirSemanaAtendimentoRequest(BaseModel):
+    duracao_slot_minutos: int = Field(30, ge=5, le=240, description="Duração de cada slot")
+    dias: List[DiaAtendimento] = Field(..., description="Dias ausentes ficam sem atendimento")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "duracao_slot_minutos": 30,
+                "dias": [
+                    {
+                        "dia_semana": "Segunda",
+                        "intervalos": [
+                            {"inicio": "08:00", "fim": "12:00"},
+                            {"inicio": "14:00", "fim": "18:00"}
+                        ]
+                    },
+                    {
+                        "dia_semana": "Quarta",
+                        "intervalos": [{"inicio": "08:00", "fim": "12:00"}]
+                    }
+                ]
+            }
+        }
+
+
 class AgendarConsultaRequest(BaseModel):
     paciente_id: int = Field(..., description="ID do paciente")
     medico_id: int = Field(..., description="ID do médico")
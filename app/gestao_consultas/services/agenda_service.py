@@ -2,11 +2,74 @@
 Service para Gestão de Agenda
 Feature 1 - Épico 2: Ciclo de Vida de Consultas
 """
-from typing import List, Optional
-from datetime import time, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from datetime import time, datetime
+from sqlalchemy import delete, insert, text
 from sqlalchemy.orm import Session
 
 from app.gestao_perfis.models.agenda import Agenda, DiaSemana
+from app.gestao_consultas.services.motor_disponibilidade import (
+    DURACAO_PADRAO_MINUTOS,
+    ModeloSemanal,
+)
+from app.gestao_consultas.services.cache_disponibilidade import (
+    invalidar_medico_apos_commit,
+    obter_disponiveis,
+)
+
+
+# Primeiros slots livres de todos os médicos de uma especialidade, em uma
+# única consulta: os dias do período são cruzados com a agenda recorrente
+# (diaSemana é gravado pelo nome do enum; ISODOW: segunda = 1) e os slots
+# que se sobrepõem a uma consulta ativa são descartados pelo NOT EXISTS,
+# resolvido pelo índice (medicoId, dataHora) de consultas.
+HORARIOS_ESPECIALIDADE_SQL = text(
+    """
+    WITH dias AS (
+        SELECT CAST(d AS date) AS dia
+        FROM generate_series(
+            CAST(:data_inicio AS timestamp),
+            CAST(:data_fim AS timestamp),
+            interval '1 day'
+        ) AS d
+    ),
+    semana (nome, isodow) AS (
+        VALUES ('SEGUNDA', 1), ('TERCA', 2), ('QUARTA', 3), ('QUINTA', 4),
+               ('SEXTA', 5), ('SABADO', 6), ('DOMINGO', 7)
+    ),
+    slots AS (
+        SELECT a."medicoId" AS medico_id,
+               dias.dia + a.hora AS slot,
+               COALESCE(m."duracaoConsulta", :duracao_padrao)
+                   * interval '1 minute' AS duracao
+        FROM medico_especialidades me
+        JOIN medicos m ON m."usuarioId" = me."medicoId"
+        JOIN agendas a ON a."medicoId" = me."medicoId"
+        JOIN semana s ON s.nome = CAST(a."diaSemana" AS text)
+        JOIN dias ON EXTRACT(ISODOW FROM dias.dia) = s.isodow
+        WHERE me."especialidadeId" = :especialidade_id
+    )
+    SELECT s.medico_id, u.nome, m.crm, s.slot
+    FROM slots s
+    JOIN medicos m ON m."usuarioId" = s.medico_id
+    JOIN usuarios u ON u.id = s.medico_id
+    WHERE s.slot >= :agora
+      AND NOT EXISTS (
+          SELECT 1
+          FROM consultas c
+          WHERE c."medicoId" = s.medico_id
+            AND c.status IN ('AGENDADA', 'CONFIRMADA')
+            AND c."dataHora" > s.slot - s.duracao
+            AND c."dataHora" < s.slot + s.duracao
+      )
+    ORDER BY s.slot, s.medico_id
+    LIMIT :limite
+    """
+)
+
+# Maior período da busca por especialidade: os slots de todos os médicos
+# são gerados antes do LIMIT, então o custo cresce com os dias pedidos
+MAX_DIAS_BUSCA_ESPECIALIDADE = 31
 
 
 class AgendaService:
@@ -41,6 +104,7 @@ class AgendaService:
         )
         
         db.add(novo_horario)
+        invalidar_medico_apos_commit(db, medico_id)
         db.commit()
         db.refresh(novo_horario)
         
@@ -57,11 +121,71 @@ class AgendaService:
         if not horario:
             return False
         
+        medico_id = horario.medicoId
         db.delete(horario)
+        invalidar_medico_apos_commit(db, medico_id)
         db.commit()
         
         return True
     
+    @staticmethod
+    def definir_semana_atendimento(
+        db: Session,
+        medico_id: int,
+        semana: Dict[DiaSemana, List[Tuple[time, time]]],
+        duracao_minutos: int
+    ) -> Tuple[int, int]:
+        """
+        Substitui a agenda recorrente do médico por um modelo semanal
+        (dia -> intervalos [início, fim) fatiados em slots de duracao_minutos).
+        Aplica só a diferença para as linhas existentes, em uma transação.
+        Retorna (inseridos, removidos).
+        """
+        from app.gestao_perfis.models.medico import Medico
+        
+        desejados = set()
+        for dia_semana, intervalos in semana.items():
+            for inicio, fim in intervalos:
+                inicio_min = inicio.hour * 60 + inicio.minute
+                fim_min = fim.hour * 60 + fim.minute
+                if fim_min <= inicio_min:
+                    raise ValueError(
+                        f"Intervalo inválido em {dia_semana.value}: {inicio} - {fim}"
+                    )
+                for minuto in range(inicio_min, fim_min - duracao_minutos + 1, duracao_minutos):
+                    desejados.add((dia_semana, time(minuto // 60, minuto % 60)))
+        
+        existentes = db.query(Agenda.id, Agenda.diaSemana, Agenda.hora).filter(
+            Agenda.medicoId == medico_id
+        ).all()
+        
+        mantidos = set()
+        remover = []
+        for agenda_id, dia_semana, hora in existentes:
+            chave = (dia_semana, hora)
+            if chave in desejados and chave not in mantidos:
+                mantidos.add(chave)
+            else:
+                remover.append(agenda_id)
+        inserir = [
+            {"medicoId": medico_id, "diaSemana": dia_semana, "hora": hora}
+            for dia_semana, hora in sorted(desejados - mantidos, key=lambda c: (c[0].name, c[1]))
+        ]
+        
+        if remover:
+            db.execute(delete(Agenda).where(Agenda.id.in_(remover)))
+        if inserir:
+            db.execute(insert(Agenda), inserir)
+        
+        db.query(Medico).filter(Medico.usuarioId == medico_id).update(
+            {Medico.duracaoConsulta: duracao_minutos}, synchronize_session=False
+        )
+        
+        invalidar_medico_apos_commit(db, medico_id)
+        db.commit()
+        
+        return len(inserir), len(remover)
+    
     @staticmethod
     def listar_horarios_medico(
         db: Session,
@@ -79,6 +203,39 @@ class AgendaService:
         
         return query.all()
     
+    @staticmethod
+    def carregar_modelo_semanal(db: Session, medico_id: int) -> ModeloSemanal:
+        """Monta o modelo semanal de slots do médico a partir da agenda"""
+        from app.gestao_perfis.models.medico import Medico
+        
+        horarios = db.query(Agenda.diaSemana, Agenda.hora).filter(
+            Agenda.medicoId == medico_id
+        ).all()
+        duracao = db.query(Medico.duracaoConsulta).filter(
+            Medico.usuarioId == medico_id
+        ).scalar()
+        
+        return ModeloSemanal(horarios, duracao)
+    
+    @staticmethod
+    def buscar_consultas_ativas(
+        db: Session,
+        medico_id: int,
+        inicio: datetime,
+        fim: datetime
+    ) -> List[datetime]:
+        """Horários das consultas que ocupam agenda no intervalo [inicio, fim)"""
+        from app.gestao_consultas.models.consulta import Consulta, StatusConsulta
+        
+        rows = db.query(Consulta.dataHora).filter(
+            Consulta.medicoId == medico_id,
+            Consulta.dataHora >= inicio,
+            Consulta.dataHora < fim,
+            Consulta.status.in_([StatusConsulta.AGENDADA, StatusConsulta.CONFIRMADA])
+        ).all()
+        
+        return [data_hora for (data_hora,) in rows]
+    
     @staticmethod
     def obter_horarios_disponiveis(
         db: Session,
@@ -89,48 +246,55 @@ class AgendaService:
         """
         História 1.1 e 1.2: Mostrar horários vagos
         Retorna lista de horários disponíveis (sem consulta agendada)
+        entre os dias de data_inicio e data_fim, inclusive.
+        Servido do cache por (médico, semana); ver cache_disponibilidade
         """
-        from app.gestao_consultas.models.consulta import Consulta, StatusConsulta
+        return obter_disponiveis(db, medico_id, data_inicio.date(), data_fim.date())
+    
+    @staticmethod
+    def obter_horarios_disponiveis_especialidade(
+        db: Session,
+        especialidade_id: int,
+        data_inicio: datetime,
+        data_fim: datetime,
+        limite: int = 20,
+        agora: Optional[datetime] = None
+    ) -> List[dict]:
+        """
+        Primeiros `limite` horários livres entre todos os médicos da
+        especialidade, entre os dias de data_inicio e data_fim, inclusive
+        (no máximo MAX_DIAS_BUSCA_ESPECIALIDADE dias). Horários já passados
+        não são retornados.
+        """
+        agora = agora or datetime.now()
+        dia_inicio = max(data_inicio.date(), agora.date())
+        dia_fim = data_fim.date()
         
-        # Busca agenda do médico
-        horarios_agenda = db.query(Agenda).filter(Agenda.medicoId == medico_id).all()
-        
-        # Gera todos os horários possíveis no período
-        horarios_possiveis = []
-        data_atual = data_inicio
-        
-        while data_atual <= data_fim:
-            dia_semana_map = {
-                0: DiaSemana.SEGUNDA,
-                1: DiaSemana.TERCA,
-                2: DiaSemana.QUARTA,
-                3: DiaSemana.QUINTA,
-                4: DiaSemana.SEXTA,
-                5: DiaSemana.SABADO,
-                6: DiaSemana.DOMINGO
-            }
-            
-            dia_semana = dia_semana_map.get(data_atual.weekday())
-            
-            # Verifica se médico atende neste dia
-            for horario in horarios_agenda:
-                if horario.diaSemana == dia_semana:
-                    horario_completo = datetime.combine(
-                        data_atual.date(),
-                        horario.hora
-                    )
-                    horarios_possiveis.append(horario_completo)
-            
-            data_atual += timedelta(days=1)
+        if (data_fim.date() - data_inicio.date()).days + 1 > MAX_DIAS_BUSCA_ESPECIALIDADE:
+            raise ValueError(
+                f"Período máximo da busca é de {MAX_DIAS_BUSCA_ESPECIALIDADE} dias"
+            )
+        if dia_fim < dia_inicio:
+            return []
         
-        # Remove horários já agendados
-        consultas_agendadas = db.query(Consulta).filter(
-            Consulta.medicoId == medico_id,
-            Consulta.dataHora.between(data_inicio, data_fim),
-            Consulta.status.in_([StatusConsulta.AGENDADA, StatusConsulta.CONFIRMADA])
+        rows = db.execute(
+            HORARIOS_ESPECIALIDADE_SQL,
+            {
+                "especialidade_id": especialidade_id,
+                "data_inicio": datetime.combine(dia_inicio, time.min),
+                "data_fim": datetime.combine(dia_fim, time.min),
+                "agora": agora,
+                "duracao_padrao": DURACAO_PADRAO_MINUTOS,
+                "limite": limite,
+            },
         ).all()
         
-        horarios_ocupados = {c.dataHora for c in consultas_agendadas}
-        horarios_disponiveis = [h for h in horarios_possiveis if h not in horarios_ocupados]
-        
-        return sorted(horarios_disponiveis)
+        return [
+            {
+                "medico_id": row.medico_id,
+                "nome": row.nome,
+                "crm": row.crm,
+                "data_hora": row.slot,
+            }
+            for row in rows
+        ]
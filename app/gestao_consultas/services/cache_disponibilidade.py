@@ -0,0 +1,190 @@
+"""
+Cache de Disponibilidade por (médico, semana)
+Feature 1 - Épico 2: Ciclo de Vida de Consultas
+
+Cada semana em cache guarda os slots do modelo semanal (minutos absolutos)
+e um bitset (int) com os slots livres. Agendamentos e cancelamentos
+atualizam os bits no lugar, em todos os workers, via barramento; mudanças
+na agenda do médico descartam as semanas dele. Só semanas frias vão ao
+banco, calculadas pelo motor de disponibilidade.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.barramento import barramento
+from app.core.cache import obter_cache
+from app.gestao_consultas.services.motor_disponibilidade import (
+    ModeloSemanal,
+    de_minutos,
+    para_minutos,
+)
+
+CANAL_DISPONIBILIDADE = "disponibilidade"
+
+# Rede de segurança para eventos perdidos; a invalidação é por evento
+TTL_SEMANA = 3600
+
+_cache = obter_cache("disponibilidade", ttl=TTL_SEMANA, max_itens=20000)
+
+
+class SemanaDisponivel:
+    """Slots de uma semana de um médico e o bitset dos que estão livres"""
+
+    __slots__ = ("slots", "duracao", "ocupadas", "livres")
+
+    def __init__(self, slots: List[int], duracao: int, ocupadas: List[int], livres: List[int]):
+        self.slots = slots
+        self.duracao = duracao
+        self.ocupadas = ocupadas
+        livres_set = set(livres)
+        self.livres = 0
+        for i, s in enumerate(slots):
+            if s in livres_set:
+                self.livres |= 1 << i
+
+    def _afetados(self, minuto: int) -> range:
+        """Índices dos slots cujo intervalo cruza [minuto, minuto + duração)"""
+        return range(
+            bisect_right(self.slots, minuto - self.duracao),
+            bisect_left(self.slots, minuto + self.duracao),
+        )
+
+    def ocupar(self, minuto: int):
+        # A semana pode ter sido carregada já com a consulta antes do evento
+        if minuto in self.ocupadas:
+            return
+        self.ocupadas.append(minuto)
+        for i in self._afetados(minuto):
+            self.livres &= ~(1 << i)
+
+    def liberar(self, minuto: int):
+        if minuto not in self.ocupadas:
+            return
+        self.ocupadas.remove(minuto)
+        for i in self._afetados(minuto):
+            s = self.slots[i]
+            if not any(o < s + self.duracao and o + self.duracao > s for o in self.ocupadas):
+                self.livres |= 1 << i
+
+    def disponiveis(self, inicio: int, fim: int) -> List[int]:
+        """Slots livres com início em [inicio, fim)"""
+        return [
+            s
+            for i, s in enumerate(self.slots)
+            if inicio <= s < fim and self.livres >> i & 1
+        ]
+
+
+def _segunda(dia: date) -> date:
+    return dia - timedelta(days=dia.weekday())
+
+
+def _carregar_semana(
+    db: Session, medico_id: int, segunda: date, modelo: ModeloSemanal
+) -> SemanaDisponivel:
+    from app.gestao_consultas.services.agenda_service import AgendaService
+
+    domingo = segunda + timedelta(days=6)
+    inicio = datetime.combine(segunda, datetime.min.time())
+    consultas = AgendaService.buscar_consultas_ativas(
+        db,
+        medico_id,
+        inicio - timedelta(minutes=modelo.duracao),
+        inicio + timedelta(days=7, minutes=modelo.duracao),
+    )
+    slots = modelo.expandir(segunda, domingo)
+    ocupadas = [para_minutos(c) for c in consultas]
+    livres = modelo.subtrair_ocupados(slots, modelo.intervalos_ocupados(consultas))
+    return SemanaDisponivel(slots, modelo.duracao, ocupadas, livres)
+
+
+def obter_disponiveis(
+    db: Session, medico_id: int, dia_inicio: date, dia_fim: date
+) -> List[datetime]:
+    """
+    Horários livres do médico entre os dias dia_inicio e dia_fim, inclusive,
+    servidos da memória; semanas ausentes são calculadas e guardadas.
+    """
+    from app.gestao_consultas.services.agenda_service import AgendaService
+
+    modelo: Optional[ModeloSemanal] = None
+
+    def carregador(segunda: date):
+        def carregar():
+            nonlocal modelo
+            if modelo is None:
+                modelo = AgendaService.carregar_modelo_semanal(db, medico_id)
+            return _carregar_semana(db, medico_id, segunda, modelo)
+
+        return carregar
+
+    inicio = para_minutos(datetime.combine(dia_inicio, datetime.min.time()))
+    fim = para_minutos(datetime.combine(dia_fim + timedelta(days=1), datetime.min.time()))
+
+    livres: List[int] = []
+    segunda = _segunda(dia_inicio)
+    while segunda <= dia_fim:
+        semana = _cache.obter((medico_id, segunda.toordinal()), carregador(segunda))
+        livres.extend(semana.disponiveis(inicio, fim))
+        segunda += timedelta(days=7)
+
+    return [de_minutos(m) for m in livres]
+
+
+def _aplicar(dados: dict):
+    medico_id = dados["medico_id"]
+    acao = dados["acao"]
+
+    if acao == "invalidar":
+        _cache.invalidar(medico_id)
+        return
+
+    minuto = dados["minuto"]
+    segunda = _segunda(de_minutos(minuto).date()).toordinal()
+    # Slots da semana anterior/seguinte podem cruzar o intervalo da consulta
+    for ordinal in (segunda - 7, segunda, segunda + 7):
+        if acao == "ocupar":
+            _cache.atualizar((medico_id, ordinal), lambda s: s.ocupar(minuto))
+        elif acao == "liberar":
+            _cache.atualizar((medico_id, ordinal), lambda s: s.liberar(minuto))
+
+
+barramento.assinar(CANAL_DISPONIBILIDADE, _aplicar)
+
+
+def _agendar(db: Session, acao: str, medico_id: int, data_hora: Optional[datetime] = None):
+    evento = {"acao": acao, "medico_id": medico_id}
+    if data_hora is not None:
+        evento["minuto"] = para_minutos(data_hora)
+    db.info.setdefault("eventos_disponibilidade", []).append(evento)
+
+
+def ocupar_apos_commit(db: Session, medico_id: int, data_hora: datetime):
+    """Marca o horário como ocupado em todos os workers após o commit"""
+    _agendar(db, "ocupar", medico_id, data_hora)
+
+
+def liberar_apos_commit(db: Session, medico_id: int, data_hora: datetime):
+    """Devolve o horário à disponibilidade em todos os workers após o commit"""
+    _agendar(db, "liberar", medico_id, data_hora)
+
+
+def invalidar_medico_apos_commit(db: Session, medico_id: int):
+    """Descarta as semanas do médico (ex.: agenda recorrente alterada)"""
+    _agendar(db, "invalidar", medico_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_eventos(session: Session):
+    for evento in session.info.pop("eventos_disponibilidade", []):
+        barramento.publicar(CANAL_DISPONIBILIDADE, evento)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_eventos(session: Session, previous_transaction):
+    session.info.pop("eventos_disponibilidade", None)
@@ -0,0 +1,98 @@
+"""
+Service para o Rollup Diário de Consultas
+Mantém consultas_diarias, usado pelo dashboard de operações
+
+O desfecho de uma consulta só é conhecido depois que o dia passa (quem não
+foi atendido faltou), então o rollup é consolidado em lote: a marca
+d'água em marcas_rollup guarda o último dia já processado e cada
+atualização recalcula apenas os dias novos, mais uma pequena janela para
+trás que absorve consultas finalizadas com atraso.
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.gestao_consultas.models.consulta_diaria import MarcaRollup
+
+NOME_ROLLUP = "consultas_diarias"
+
+# Dias já consolidados que são recalculados a cada atualização
+REPROCESSAR_DIAS = 3
+
+CONSOLIDAR_SQL = [
+    """
+    DELETE FROM consultas_diarias WHERE dia >= :inicio AND dia < :fim
+    """,
+    """
+    INSERT INTO consultas_diarias (dia, "medicoId", total, realizadas, canceladas, faltas)
+    SELECT CAST("dataHora" AS date), "medicoId", count(*),
+           count(*) FILTER (WHERE status IN ('EM_ANDAMENTO', 'FINALIZADA')),
+           count(*) FILTER (WHERE status = 'CANCELADA'),
+           count(*) FILTER (WHERE status IN ('AGENDADA', 'CONFIRMADA'))
+    FROM consultas
+    WHERE "dataHora" >= :inicio AND "dataHora" < :fim
+    GROUP BY 1, 2
+    """,
+]
+
+
+class ConsultaDiariaService:
+    """Service para consolidar o desfecho diário das consultas"""
+
+    @staticmethod
+    def processado_ate(db: Session) -> Optional[date]:
+        marca = db.get(MarcaRollup, NOME_ROLLUP)
+        return marca.processadoAte if marca else None
+
+    @staticmethod
+    def atualizar(
+        db: Session,
+        hoje: Optional[date] = None,
+        reprocessar_dias: int = REPROCESSAR_DIAS,
+        forcar: bool = False,
+    ) -> int:
+        """
+        Consolida os dias encerrados desde a marca d'água. Sem efeito (e sem
+        lock) se o dia de ontem já foi processado, a menos que `forcar`.
+        Retorna o número de dias recalculados.
+        """
+        hoje = hoje or date.today()
+        ontem = hoje - timedelta(days=1)
+
+        ate = ConsultaDiariaService.processado_ate(db)
+        if ate is not None and ate >= ontem and not forcar:
+            return 0
+
+        # Serializa atualizações concorrentes (workers e cron)
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:nome))"), {"nome": NOME_ROLLUP})
+        db.expire_all()
+        ate = ConsultaDiariaService.processado_ate(db)
+        if ate is not None and ate >= ontem and not forcar:
+            db.rollback()
+            return 0
+
+        if ate is None:
+            # Primeira carga: todo o histórico
+            primeira = db.execute(
+                text('SELECT CAST(min("dataHora") AS date) FROM consultas')
+            ).scalar()
+            inicio = min(primeira or hoje, hoje)
+        else:
+            inicio = min(ate, ontem) + timedelta(days=1) - timedelta(days=reprocessar_dias)
+
+        params = {"inicio": inicio, "fim": hoje}
+        for sql in CONSOLIDAR_SQL:
+            db.execute(text(sql), params)
+
+        stmt = insert(MarcaRollup).values(nome=NOME_ROLLUP, processadoAte=ontem)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["nome"], set_={"processadoAte": stmt.excluded.processadoAte}
+            )
+        )
+        db.commit()
+        return (hoje - inicio).days
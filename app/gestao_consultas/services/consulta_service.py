@@ -2,12 +2,37 @@
 Service para Gestão de Consultas
 Feature 1 e 2 - Épico 2: Ciclo de Vida de Consultas
 """
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import func, literal_column, select, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
 
+from app.core.paginacao import aplicar_cursor, limitar, paginar
 from app.gestao_consultas.models.consulta import Consulta, StatusConsulta
 from app.gestao_consultas.models.log_prontuario import LogProntuario, TipoEvento
+from app.gestao_consultas.services.motor_disponibilidade import DURACAO_PADRAO_MINUTOS
+from app.gestao_consultas.services.timeline_service import TimelineService
+from app.gestao_perfis.services.medico_paciente_service import MedicoPacienteService
+from app.gestao_consultas.services.cache_disponibilidade import (
+    liberar_apos_commit,
+    ocupar_apos_commit,
+)
+
+# Índice único parcial de consultas ativas por (medicoId, dataHora)
+HORARIO_UNICO = "uq_consultas_medico_data_hora_ativa"
+
+# Status que ocupam o horário na agenda do médico
+STATUS_ATIVOS = (StatusConsulta.AGENDADA, StatusConsulta.CONFIRMADA)
+
+# Lock de agendamento por médico (pg_advisory_xact_lock(classe, medicoId))
+LOCK_AGENDA_MEDICO = "agendamento_medico"
+
+# Nenhuma consulta dura mais que isso: limita a faixa lida no índice
+DURACAO_MAXIMA = timedelta(hours=24)
+
+UM_MINUTO = literal_column("interval '1 minute'")
 
 
 class ConsultaService:
@@ -25,32 +50,63 @@ class ConsultaService:
         História 1.2: Agendar consulta
         Paciente agenda consulta com médico em horário disponível
         """
-        # Verifica se horário está disponível
-        consulta_existente = db.query(Consulta).filter(
+        from app.gestao_perfis.models.medico import Medico
+        
+        # Reservas do mesmo médico são serializadas até o commit: o índice
+        # único só recusa horários idênticos, e a sobreposição (10:00 e
+        # 10:15 com consultas de 30 min) é verificada com o lock tomado.
+        # Cada consulta ativa ocupa a duração gravada no seu agendamento
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:classe), :medico_id)"),
+            {"classe": LOCK_AGENDA_MEDICO, "medico_id": medico_id},
+        )
+        duracao = int(db.query(Medico.duracaoConsulta).filter(
+            Medico.usuarioId == medico_id
+        ).scalar() or DURACAO_PADRAO_MINUTOS)
+        fim_ocupado = Consulta.dataHora + UM_MINUTO * func.coalesce(
+            Consulta.duracaoMinutos, duracao
+        )
+        conflito = db.query(Consulta.id).filter(
             Consulta.medicoId == medico_id,
-            Consulta.dataHora == data_hora,
-            Consulta.status.in_([StatusConsulta.AGENDADA, StatusConsulta.CONFIRMADA])
+            Consulta.status.in_(STATUS_ATIVOS),
+            Consulta.dataHora > data_hora - DURACAO_MAXIMA,
+            Consulta.dataHora < data_hora + timedelta(minutes=duracao),
+            fim_ocupado > data_hora
         ).first()
-        
-        if consulta_existente:
+        if conflito:
+            db.rollback()
             raise ValueError("Horário não disponível")
         
-        # Busca link da sala virtual do médico
-        from app.gestao_perfis.models.medico import Medico
-        medico = db.query(Medico).filter(Medico.usuarioId == medico_id).first()
-        link_sala = medico.linkSalaVirtual if medico else None
+        # Link da sala virtual resolvido no próprio INSERT
+        link_sala = select(Medico.linkSalaVirtual).where(
+            Medico.usuarioId == medico_id
+        ).scalar_subquery()
         
-        # Cria consulta
         nova_consulta = Consulta(
             pacienteId=paciente_id,
             medicoId=medico_id,
             dataHora=data_hora,
             status=StatusConsulta.AGENDADA,
             motivoConsulta=motivo_consulta,
-            linkSalaVirtual=link_sala
+            linkSalaVirtual=link_sala,
+            duracaoMinutos=duracao
         )
         
+        # O índice único parcial de consultas ativas continua como garantia
+        # no banco para o mesmo horário
         db.add(nova_consulta)
+        try:
+            db.flush()
+        except IntegrityError as e:
+            db.rollback()
+            diag = getattr(e.orig, "diag", None)
+            if getattr(diag, "constraint_name", None) == HORARIO_UNICO:
+                raise ValueError("Horário não disponível")
+            raise
+        
+        TimelineService.registrar_consulta(db, nova_consulta)
+        MedicoPacienteService.registrar_consulta(db, nova_consulta)
+        ocupar_apos_commit(db, medico_id, data_hora)
         db.commit()
         db.refresh(nova_consulta)
         
@@ -62,6 +118,19 @@ class ConsultaService:
         
         return nova_consulta
     
+    @staticmethod
+    def instalar(db: Session):
+        """
+        Cria em uma tabela consultas já existente a coluna e os índices que
+        o create_all não adiciona (inclui o único parcial de ativas)
+        """
+        db.execute(
+            text('ALTER TABLE consultas ADD COLUMN IF NOT EXISTS "duracaoMinutos" integer')
+        )
+        for indice in Consulta.__table__.indexes:
+            db.execute(CreateIndex(indice, if_not_exists=True))
+        db.commit()
+    
     @staticmethod
     def confirmar_consulta(db: Session, consulta_id: int) -> Consulta:
         """Confirma consulta agendada"""
@@ -70,6 +139,7 @@ class ConsultaService:
         if not consulta:
             raise ValueError("Consulta não encontrada")
         
+        ConsultaService._registrar_mudanca_status(db, consulta, StatusConsulta.CONFIRMADA)
         consulta.status = StatusConsulta.CONFIRMADA
         db.commit()
         db.refresh(consulta)
@@ -87,6 +157,7 @@ class ConsultaService:
         if not consulta:
             raise ValueError("Consulta não encontrada")
         
+        ConsultaService._registrar_mudanca_status(db, consulta, StatusConsulta.EM_ANDAMENTO)
         consulta.status = StatusConsulta.EM_ANDAMENTO
         db.commit()
         db.refresh(consulta)
@@ -105,6 +176,7 @@ class ConsultaService:
         if not consulta:
             raise ValueError("Consulta não encontrada")
         
+        ConsultaService._registrar_mudanca_status(db, consulta, StatusConsulta.FINALIZADA)
         consulta.status = StatusConsulta.FINALIZADA
         if observacoes:
             consulta.observacoes = observacoes
@@ -122,6 +194,11 @@ class ConsultaService:
         if not consulta:
             raise ValueError("Consulta não encontrada")
         
+        if consulta.status != StatusConsulta.CANCELADA:
+            MedicoPacienteService.remover_interacao(
+                db, consulta.medicoId, consulta.pacienteId, consultas=1
+            )
+        ConsultaService._registrar_mudanca_status(db, consulta, StatusConsulta.CANCELADA)
         consulta.status = StatusConsulta.CANCELADA
         db.commit()
         db.refresh(consulta)
@@ -132,41 +209,135 @@ class ConsultaService:
     def listar_consultas_paciente(
         db: Session,
         paciente_id: int,
-        apenas_futuras: bool = False
-    ) -> List[Consulta]:
+        apenas_futuras: bool = False,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limite: int = 50
+    ) -> Tuple[List, Optional[str]]:
         """
         História 1.3: Visualizar consultas do paciente
-        Lista consultas futuras e/ou passadas
+        Lista consultas (mais recentes primeiro) paginadas por cursor.
+        Retorna (linhas id/medicoId/dataHora/status, proximo_cursor)
         """
-        query = db.query(Consulta).filter(Consulta.pacienteId == paciente_id)
+        query = db.query(
+            Consulta.id, Consulta.medicoId, Consulta.dataHora, Consulta.status
+        ).filter(Consulta.pacienteId == paciente_id)
         
-        if apenas_futuras:
-            query = query.filter(Consulta.dataHora >= datetime.now())
-        
-        return query.order_by(Consulta.dataHora.desc()).all()
+        return ConsultaService._paginar_consultas(
+            query, apenas_futuras, data_inicio, data_fim, cursor, limite
+        )
     
     @staticmethod
     def listar_consultas_medico(
         db: Session,
         medico_id: int,
-        apenas_futuras: bool = False
-    ) -> List[Consulta]:
+        apenas_futuras: bool = False,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limite: int = 50
+    ) -> Tuple[List, Optional[str]]:
         """
         História 1.3: Visualizar consultas do médico
-        Lista consultas futuras e/ou passadas
+        Lista consultas (mais recentes primeiro) paginadas por cursor.
+        Retorna (linhas id/pacienteId/dataHora/status, proximo_cursor)
+        """
+        query = db.query(
+            Consulta.id, Consulta.pacienteId, Consulta.dataHora, Consulta.status
+        ).filter(Consulta.medicoId == medico_id)
+        
+        return ConsultaService._paginar_consultas(
+            query, apenas_futuras, data_inicio, data_fim, cursor, limite
+        )
+    
+    @staticmethod
+    def proximas_consultas_medico(
+        db: Session,
+        medico_id: int,
+        limite: int = 10,
+        agora: Optional[datetime] = None
+    ) -> List:
         """
-        query = db.query(Consulta).filter(Consulta.medicoId == medico_id)
+        Próximas consultas ativas do médico (visão do dia), em ordem
+        cronológica. Usa o índice único parcial de consultas ativas.
+        """
+        from app.gestao_perfis.models.usuario import Usuario
         
+        return db.query(
+            Consulta.id,
+            Consulta.pacienteId,
+            Usuario.nome.label("pacienteNome"),
+            Consulta.dataHora,
+            Consulta.status,
+            Consulta.motivoConsulta,
+        ).join(
+            Usuario, Usuario.id == Consulta.pacienteId
+        ).filter(
+            Consulta.medicoId == medico_id,
+            Consulta.status.in_(STATUS_ATIVOS),
+            Consulta.dataHora >= (agora or datetime.now())
+        ).order_by(
+            Consulta.dataHora
+        ).limit(limitar(limite)).all()
+    
+    @staticmethod
+    def _paginar_consultas(
+        query,
+        apenas_futuras: bool,
+        data_inicio: Optional[datetime],
+        data_fim: Optional[datetime],
+        cursor: Optional[str],
+        limite: int
+    ) -> Tuple[List, Optional[str]]:
+        """Filtros de período e página keyset por (dataHora, id) decrescente"""
         if apenas_futuras:
             query = query.filter(Consulta.dataHora >= datetime.now())
+        if data_inicio:
+            query = query.filter(Consulta.dataHora >= data_inicio)
+        if data_fim:
+            query = query.filter(Consulta.dataHora < data_fim)
+        
+        query = aplicar_cursor(query, (Consulta.dataHora, Consulta.id), cursor)
+        query = query.order_by(Consulta.dataHora.desc(), Consulta.id.desc())
         
-        return query.order_by(Consulta.dataHora.desc()).all()
+        return paginar(query, limitar(limite), lambda c: (c.dataHora, c.id))
     
     @staticmethod
     def buscar_consulta_por_id(db: Session, consulta_id: int) -> Optional[Consulta]:
         """Busca consulta por ID"""
         return db.query(Consulta).filter(Consulta.id == consulta_id).first()
     
+    @staticmethod
+    def _registrar_mudanca_status(
+        db: Session,
+        consulta: Consulta,
+        novo_status: StatusConsulta
+    ):
+        """
+        Efeitos de uma mudança de status, chamada antes de alterar
+        consulta.status: disponibilidade (após o commit) e timeline
+        """
+        ConsultaService._atualizar_disponibilidade(db, consulta, novo_status)
+        TimelineService.atualizar_status(
+            db, TipoEvento.CONSULTA, consulta.id, novo_status.value
+        )
+
+    @staticmethod
+    def _atualizar_disponibilidade(
+        db: Session,
+        consulta: Consulta,
+        novo_status: StatusConsulta
+    ):
+        """Reflete no cache de disponibilidade a mudança de status (após o commit)"""
+        estava_ativa = consulta.status in STATUS_ATIVOS
+        ficara_ativa = novo_status in STATUS_ATIVOS
+        
+        if estava_ativa and not ficara_ativa:
+            liberar_apos_commit(db, consulta.medicoId, consulta.dataHora)
+        elif ficara_ativa and not estava_ativa:
+            ocupar_apos_commit(db, consulta.medicoId, consulta.dataHora)
+    
     @staticmethod
     def _registrar_log_prontuario(
         db: Session,
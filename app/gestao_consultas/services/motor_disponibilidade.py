@@ -0,0 +1,143 @@
+"""
+Motor de Disponibilidade da Agenda
+Feature 1 - Épico 2: Ciclo de Vida de Consultas
+
+Trabalha com minutos absolutos (inteiros) em vez de datetimes:
+- o modelo semanal do médico é montado uma única vez a partir das linhas de Agenda
+- a expansão sobre o período é aritmética (ordinal do dia * 1440 + offset)
+- consultas ocupadas viram intervalos [início, início + duração) e são
+  subtraídas com um merge de duas listas ordenadas
+"""
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.gestao_perfis.models.agenda import DiaSemana
+
+MINUTOS_DIA = 1440
+
+# Duração usada quando o médico não definiu duracaoConsulta
+DURACAO_PADRAO_MINUTOS = 30
+
+# Índice igual ao de date.weekday()
+INDICE_DIA_SEMANA = {
+    DiaSemana.SEGUNDA: 0,
+    DiaSemana.TERCA: 1,
+    DiaSemana.QUARTA: 2,
+    DiaSemana.QUINTA: 3,
+    DiaSemana.SEXTA: 4,
+    DiaSemana.SABADO: 5,
+    DiaSemana.DOMINGO: 6,
+}
+
+_EPOCA = datetime(1, 1, 1)
+
+Intervalo = Tuple[int, int]
+
+
+def para_minutos(dt: datetime) -> int:
+    """Converte datetime em minutos absolutos (segundos são descartados)"""
+    return (dt.toordinal() - 1) * MINUTOS_DIA + dt.hour * 60 + dt.minute
+
+
+def de_minutos(minutos: int) -> datetime:
+    """Converte minutos absolutos de volta em datetime"""
+    return _EPOCA + timedelta(minutes=minutos)
+
+
+def mesclar_intervalos(intervalos: Iterable[Intervalo]) -> List[Intervalo]:
+    """Ordena e une intervalos sobrepostos, gerando uma lista disjunta"""
+    mesclados: List[Intervalo] = []
+    for inicio, fim in sorted(intervalos):
+        if mesclados and inicio <= mesclados[-1][1]:
+            if fim > mesclados[-1][1]:
+                mesclados[-1] = (mesclados[-1][0], fim)
+        else:
+            mesclados.append((inicio, fim))
+    return mesclados
+
+
+class ModeloSemanal:
+    """Slots recorrentes de um médico, como offsets em minutos dentro do dia"""
+
+    def __init__(
+        self,
+        horarios: Iterable[Tuple[DiaSemana, time]],
+        duracao_minutos: Optional[float] = None,
+    ):
+        self.duracao = int(duracao_minutos or DURACAO_PADRAO_MINUTOS)
+        por_dia: List[set] = [set() for _ in range(7)]
+        for dia_semana, hora in horarios:
+            por_dia[INDICE_DIA_SEMANA[DiaSemana(dia_semana)]].add(
+                hora.hour * 60 + hora.minute
+            )
+        self.por_dia: List[Tuple[int, ...]] = [tuple(sorted(d)) for d in por_dia]
+
+    @property
+    def vazio(self) -> bool:
+        return not any(self.por_dia)
+
+    def expandir(self, inicio: date, fim: date) -> List[int]:
+        """Todos os slots (minutos absolutos) entre os dias inicio e fim, inclusive"""
+        slots: List[int] = []
+        if self.vazio:
+            return slots
+
+        primeiro = inicio.toordinal()
+        dia_semana = inicio.weekday()
+        for ordinal in range(primeiro, fim.toordinal() + 1):
+            offsets = self.por_dia[dia_semana]
+            if offsets:
+                base = (ordinal - 1) * MINUTOS_DIA
+                slots.extend([base + o for o in offsets])
+            dia_semana = 0 if dia_semana == 6 else dia_semana + 1
+        return slots
+
+    def subtrair_ocupados(
+        self, slots: Sequence[int], ocupados: Iterable[Intervalo]
+    ) -> List[int]:
+        """
+        Remove os slots cujo intervalo [s, s + duração) cruza algum intervalo
+        ocupado. `slots` deve estar ordenado; os ocupados são mesclados antes.
+        """
+        livres: List[int] = []
+        ocupados = mesclar_intervalos(ocupados)
+        if not ocupados:
+            return list(slots)
+
+        j = 0
+        total = len(ocupados)
+        for s in slots:
+            while j < total and ocupados[j][1] <= s:
+                j += 1
+            if j == total:
+                livres.extend(slots[bisect_left(slots, s):])
+                break
+            if ocupados[j][0] < s + self.duracao:
+                continue
+            livres.append(s)
+        return livres
+
+    def intervalos_ocupados(self, consultas: Iterable[datetime]) -> List[Intervalo]:
+        """Converte os horários das consultas em intervalos de minutos"""
+        return [
+            (m, m + self.duracao) for m in (para_minutos(c) for c in consultas)
+        ]
+
+    def disponiveis(
+        self, inicio: date, fim: date, consultas: Iterable[datetime]
+    ) -> List[datetime]:
+        """Horários de início livres entre os dias inicio e fim, inclusive"""
+        livres = self.subtrair_ocupados(
+            self.expandir(inicio, fim), self.intervalos_ocupados(consultas)
+        )
+        return [de_minutos(m) for m in livres]
+
+    def intervalos_disponiveis(
+        self, inicio: date, fim: date, consultas: Iterable[datetime]
+    ) -> List[Tuple[datetime, datetime]]:
+        """Como `disponiveis`, mas retornando (início, fim) de cada slot"""
+        livres = self.subtrair_ocupados(
+            self.expandir(inicio, fim), self.intervalos_ocupados(consultas)
+        )
+        return [(de_minutos(m), de_minutos(m + self.duracao)) for m in livres]
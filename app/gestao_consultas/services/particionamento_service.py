@@ -0,0 +1,406 @@
+"""
+Service para Particionamento e Arquivamento de logs_prontuario
+Feature 2 - Épico 3: Gestão de Exames e Documentação Clínica
+
+- Uma partição por mês de dataEvento (logs_prontuario_pAAAA_MM), criadas
+  com antecedência; a partição padrão recebe o que cair fora delas
+- Partições antigas ganham um índice BRIN em dataEvento (pequeno e
+  suficiente para varreduras por período em dados append-only)
+- Partições frias podem ser desanexadas e exportadas (COPY) para arquivos
+  CSV gzip, que continuam consultáveis sob demanda ou restauráveis
+"""
+
+import csv
+import gzip
+import logging
+import os
+from datetime import date
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+TABELA = "logs_prontuario"
+PARTICAO_PADRAO = f"{TABELA}_padrao"
+
+# Meses à frente com partição já criada
+MESES_A_FRENTE = 3
+
+# Partições com mais de N meses recebem índice BRIN
+MESES_BRIN = 3
+
+DIRETORIO_ARQUIVO = Path(
+    os.getenv("ARQUIVO_PRONTUARIO_DIR", "arquivo/prontuario")
+)
+
+
+def _mes(dia: date) -> date:
+    return date(dia.year, dia.month, 1)
+
+
+def _somar_meses(mes: date, n: int) -> date:
+    indice = mes.year * 12 + mes.month - 1 + n
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def nome_particao(mes: date) -> str:
+    return f"{TABELA}_p{mes.year:04d}_{mes.month:02d}"
+
+
+def mes_da_particao(nome: str) -> Optional[date]:
+    """Mês de uma partição mensal pelo nome (None para outras tabelas)"""
+    prefixo = f"{TABELA}_p"
+    if not nome.startswith(prefixo):
+        return None
+    try:
+        ano, mes = nome[len(prefixo):].split("_")
+        return date(int(ano), int(mes), 1)
+    except ValueError:
+        return None
+
+
+def arquivo_particao(mes: date, diretorio: Path = DIRETORIO_ARQUIVO) -> Path:
+    return Path(diretorio) / f"{nome_particao(mes)}.csv.gz"
+
+
+def _bloquear(db: Session):
+    """
+    Serializa a criação de partições entre workers (startup) e o cron até
+    o fim da transação; sem isso, dois CREATE TABLE do mesmo mês colidem
+    """
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:nome))"), {"nome": TABELA})
+
+
+class ParticionamentoService:
+    """Service para manter as partições mensais de logs_prontuario"""
+
+    @staticmethod
+    def esta_particionada(db: Session) -> bool:
+        return bool(
+            db.execute(
+                text(
+                    """
+                    SELECT EXISTS (
+                        SELECT 1 FROM pg_partitioned_table pt
+                        JOIN pg_class c ON c.oid = pt.partrelid
+                        WHERE c.relname = :tabela
+                    )
+                    """
+                ),
+                {"tabela": TABELA},
+            ).scalar()
+        )
+
+    @staticmethod
+    def listar_particoes(db: Session) -> List[str]:
+        """Partições anexadas a logs_prontuario (inclui a padrão)"""
+        return list(
+            db.execute(
+                text(
+                    """
+                    SELECT filha.relname
+                    FROM pg_inherits i
+                    JOIN pg_class pai ON pai.oid = i.inhparent
+                    JOIN pg_class filha ON filha.oid = i.inhrelid
+                    WHERE pai.relname = :tabela
+                    ORDER BY filha.relname
+                    """
+                ),
+                {"tabela": TABELA},
+            ).scalars()
+        )
+
+    @staticmethod
+    def criar_particao(db: Session, mes: date) -> bool:
+        """
+        Cria a partição do mês, se não existir. Linhas do mês que tenham
+        caído na partição padrão são movidas para ela antes do ATTACH.
+        Retorna True se a partição foi criada.
+        """
+        mes = _mes(mes)
+        nome = nome_particao(mes)
+        if nome in ParticionamentoService.listar_particoes(db):
+            return False
+
+        inicio, fim = mes.isoformat(), _somar_meses(mes, 1).isoformat()
+        db.execute(
+            text(
+                f"CREATE TABLE {nome} "
+                f"(LIKE {TABELA} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+        db.execute(
+            text(
+                f"""
+                WITH movidos AS (
+                    DELETE FROM {PARTICAO_PADRAO}
+                    WHERE "dataEvento" >= :inicio AND "dataEvento" < :fim
+                    RETURNING *
+                )
+                INSERT INTO {nome} SELECT * FROM movidos
+                """
+            ),
+            {"inicio": inicio, "fim": fim},
+        )
+        db.execute(
+            text(
+                f"ALTER TABLE {TABELA} ATTACH PARTITION {nome} "
+                f"FOR VALUES FROM ('{inicio}') TO ('{fim}')"
+            )
+        )
+        return True
+
+    @staticmethod
+    def garantir_particoes(
+        db: Session,
+        meses_a_frente: int = MESES_A_FRENTE,
+        desde: Optional[date] = None,
+        hoje: Optional[date] = None,
+    ) -> List[str]:
+        """
+        Garante a partição padrão e as mensais de `desde` (padrão: mês
+        atual) até `meses_a_frente` meses adiante. Idempotente.
+        """
+        _bloquear(db)
+        db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {PARTICAO_PADRAO} "
+                f"PARTITION OF {TABELA} DEFAULT"
+            )
+        )
+
+        atual = _mes(hoje or date.today())
+        mes = _mes(desde) if desde else atual
+        ultimo = _somar_meses(atual, meses_a_frente)
+
+        criadas = []
+        while mes <= ultimo:
+            if ParticionamentoService.criar_particao(db, mes):
+                criadas.append(nome_particao(mes))
+            mes = _somar_meses(mes, 1)
+
+        db.commit()
+        return criadas
+
+    @staticmethod
+    def criar_indices_brin(
+        db: Session, meses: int = MESES_BRIN, hoje: Optional[date] = None
+    ) -> List[str]:
+        """Cria índice BRIN em dataEvento nas partições com mais de `meses` meses"""
+        limite = _somar_meses(_mes(hoje or date.today()), -meses)
+        criados = []
+        for nome in ParticionamentoService.listar_particoes(db):
+            mes = mes_da_particao(nome)
+            if mes is None or mes >= limite:
+                continue
+            db.execute(
+                text(
+                    f'CREATE INDEX IF NOT EXISTS {nome}_data_brin '
+                    f'ON {nome} USING brin ("dataEvento")'
+                )
+            )
+            criados.append(f"{nome}_data_brin")
+        db.commit()
+        return criados
+
+    @staticmethod
+    def arquivar_particao(
+        db: Session, mes: date, diretorio: Path = DIRETORIO_ARQUIVO
+    ) -> Path:
+        """
+        Desanexa a partição do mês, exporta as linhas para CSV gzip e remove
+        a tabela. O arquivo é escrito antes do DROP, na mesma transação.
+        """
+        mes = _mes(mes)
+        nome = nome_particao(mes)
+        if nome not in ParticionamentoService.listar_particoes(db):
+            raise ValueError(f"Partição {nome} não encontrada")
+
+        destino = arquivo_particao(mes, diretorio)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporario = destino.with_suffix(".tmp")
+
+        db.execute(text(f"ALTER TABLE {TABELA} DETACH PARTITION {nome}"))
+
+        cursor = db.connection().connection.cursor()
+        with gzip.open(temporario, "wt", encoding="utf-8", newline="") as arquivo:
+            cursor.copy_expert(f"COPY {nome} TO STDOUT WITH (FORMAT csv, HEADER)", arquivo)
+        cursor.close()
+
+        db.execute(text(f"DROP TABLE {nome}"))
+        temporario.replace(destino)
+        db.commit()
+
+        logger.info("Partição %s arquivada em %s", nome, destino)
+        return destino
+
+    @staticmethod
+    def arquivar_antigas(
+        db: Session,
+        meses_retencao: int,
+        diretorio: Path = DIRETORIO_ARQUIVO,
+        hoje: Optional[date] = None,
+    ) -> List[Path]:
+        """Arquiva todas as partições mais antigas que `meses_retencao` meses"""
+        limite = _somar_meses(_mes(hoje or date.today()), -meses_retencao)
+        arquivos = []
+        for nome in ParticionamentoService.listar_particoes(db):
+            mes = mes_da_particao(nome)
+            if mes is not None and mes < limite:
+                arquivos.append(
+                    ParticionamentoService.arquivar_particao(db, mes, diretorio)
+                )
+        return arquivos
+
+    @staticmethod
+    def consultar_arquivo(
+        mes: date,
+        paciente_id: Optional[int] = None,
+        diretorio: Path = DIRETORIO_ARQUIVO,
+    ) -> Iterator[dict]:
+        """
+        Lê sob demanda os eventos de um mês arquivado, sem restaurá-lo,
+        opcionalmente filtrando por paciente
+        """
+        caminho = arquivo_particao(_mes(mes), diretorio)
+        if not caminho.exists():
+            raise ValueError(f"Arquivo {caminho.name} não encontrado")
+
+        filtro = str(paciente_id) if paciente_id is not None else None
+        with gzip.open(caminho, "rt", encoding="utf-8", newline="") as arquivo:
+            for linha in csv.DictReader(arquivo):
+                if filtro is None or linha["pacienteId"] == filtro:
+                    yield linha
+
+    @staticmethod
+    def restaurar_particao(
+        db: Session, mes: date, diretorio: Path = DIRETORIO_ARQUIVO
+    ) -> str:
+        """Recria a partição do mês a partir do arquivo e a anexa de volta"""
+        mes = _mes(mes)
+        nome = nome_particao(mes)
+        caminho = arquivo_particao(mes, diretorio)
+        if not caminho.exists():
+            raise ValueError(f"Arquivo {caminho.name} não encontrado")
+
+        _bloquear(db)
+        db.execute(
+            text(
+                f"CREATE TABLE {nome} "
+                f"(LIKE {TABELA} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+        cursor = db.connection().connection.cursor()
+        with gzip.open(caminho, "rt", encoding="utf-8", newline="") as arquivo:
+            cursor.copy_expert(f"COPY {nome} FROM STDIN WITH (FORMAT csv, HEADER)", arquivo)
+        cursor.close()
+
+        inicio, fim = mes.isoformat(), _somar_meses(mes, 1).isoformat()
+        db.execute(
+            text(
+                f"ALTER TABLE {TABELA} ATTACH PARTITION {nome} "
+                f"FOR VALUES FROM ('{inicio}') TO ('{fim}')"
+            )
+        )
+        db.commit()
+        return nome
+
+    @staticmethod
+    def converter_tabela_existente(db: Session) -> bool:
+        """
+        Migra uma logs_prontuario comum (criada antes do particionamento)
+        para a versão particionada, preservando ids. Retorna True se migrou.
+        """
+        from app.gestao_consultas.models.log_prontuario import LogProntuario
+
+        _bloquear(db)
+        existe = db.execute(
+            text("SELECT to_regclass(:tabela) IS NOT NULL"), {"tabela": TABELA}
+        ).scalar()
+        if not existe or ParticionamentoService.esta_particionada(db):
+            return False
+
+        legado = f"{TABELA}_legado"
+        # Libera os nomes de índices, constraint e sequence para a nova tabela
+        for indice in LogProntuario.__table__.indexes:
+            db.execute(text(f"DROP INDEX IF EXISTS {indice.name}"))
+        db.execute(text("DROP INDEX IF EXISTS ix_logs_prontuario_paciente_data"))
+        db.execute(text(f"ALTER TABLE {TABELA} RENAME TO {legado}"))
+        db.execute(
+            text(f"ALTER TABLE {legado} RENAME CONSTRAINT {TABELA}_pkey TO {legado}_pkey")
+        )
+        db.execute(text(f"ALTER SEQUENCE IF EXISTS {TABELA}_id_seq RENAME TO {legado}_id_seq"))
+        db.execute(text(f'UPDATE {legado} SET "dataEvento" = now() WHERE "dataEvento" IS NULL'))
+
+        LogProntuario.__table__.create(bind=db.connection(), checkfirst=True)
+        db.execute(
+            text(f"CREATE TABLE {PARTICAO_PADRAO} PARTITION OF {TABELA} DEFAULT")
+        )
+
+        primeiro = db.execute(text(f'SELECT min("dataEvento") FROM {legado}')).scalar()
+        if primeiro is not None:
+            mes = _mes(primeiro.date())
+            ultimo = _somar_meses(_mes(date.today()), MESES_A_FRENTE)
+            while mes <= ultimo:
+                ParticionamentoService.criar_particao(db, mes)
+                mes = _somar_meses(mes, 1)
+
+        db.execute(
+            text(
+                f"""
+                INSERT INTO {TABELA}
+                    (id, "pacienteId", "tipoEvento", "dataEvento", descricao, "referenciaId")
+                OVERRIDING SYSTEM VALUE
+                SELECT id, "pacienteId", "tipoEvento", "dataEvento", descricao, "referenciaId"
+                FROM {legado}
+                """
+            )
+        )
+        db.execute(
+            text(
+                f"""
+                SELECT setval(
+                    pg_get_serial_sequence('{TABELA}', 'id'),
+                    COALESCE((SELECT max(id) FROM {TABELA}), 0) + 1,
+                    false
+                )
+                """
+            )
+        )
+        db.execute(text(f"DROP TABLE {legado}"))
+        db.commit()
+        return True
+
+    @staticmethod
+    def atualizar_indice_timeline(db: Session) -> bool:
+        """
+        Recria ix_logs_prontuario_timeline se ainda tiver descricao no
+        INCLUDE (versão anterior). Retorna True se recriou.
+        """
+        from app.gestao_consultas.models.log_prontuario import LogProntuario
+
+        definicao = db.execute(
+            text("SELECT indexdef FROM pg_indexes WHERE indexname = :nome"),
+            {"nome": "ix_logs_prontuario_timeline"},
+        ).scalar()
+        if definicao is None or "descricao" not in definicao:
+            return False
+
+        indice = next(
+            i for i in LogProntuario.__table__.indexes
+            if i.name == "ix_logs_prontuario_timeline"
+        )
+        db.execute(text("DROP INDEX ix_logs_prontuario_timeline"))
+        indice.create(bind=db.connection())
+        db.commit()
+        return True
+
+    @staticmethod
+    def instalar(db: Session):
+        """Ponto de entrada do create_tables/startup: migra e cria partições"""
+        ParticionamentoService.converter_tabela_existente(db)
+        ParticionamentoService.atualizar_indice_timeline(db)
+        ParticionamentoService.garantir_particoes(db)
@@ -2,10 +2,12 @@
 Service para Visualização de Prontuário
 Feature 2 - Épico 3: Gestão de Exames e Documentação Clínica
 """
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.core.paginacao import aplicar_cursor, limitar, paginar
 from app.gestao_consultas.models.log_prontuario import LogProntuario, TipoEvento
 
 
@@ -18,14 +20,65 @@ class ProntuarioService:
         paciente_id: int,
         tipo_evento: Optional[TipoEvento] = None,
         data_inicio: Optional[datetime] = None,
-        data_fim: Optional[datetime] = None
-    ) -> List[LogProntuario]:
+        data_fim: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limite: int = 50
+    ) -> Tuple[List, Optional[str]]:
         """
         História 2.1: Visualizar prontuário
-        Retorna linha do tempo cronológica com eventos de saúde
-        com filtros por tipo e data
+        Retorna uma página da linha do tempo (mais recente primeiro) com
+        filtros por tipo e data, e o cursor da página seguinte
         """
-        query = db.query(LogProntuario).filter(
+        query = ProntuarioService._query_timeline(
+            db, paciente_id, tipo_evento, data_inicio, data_fim
+        )
+        query = aplicar_cursor(query, (LogProntuario.dataEvento, LogProntuario.id), cursor)
+        
+        return paginar(query, limitar(limite), lambda e: (e.dataEvento, e.id))
+    
+    @staticmethod
+    def exportar_prontuario(
+        db: Session,
+        paciente_id: int,
+        tipo_evento: Optional[TipoEvento] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        tamanho_lote: int = 1000
+    ) -> Iterator:
+        """
+        Percorre a linha do tempo inteira em lotes keyset, sem manter
+        cursor no servidor nem a lista completa em memória
+        """
+        cursor = None
+        while True:
+            query = ProntuarioService._query_timeline(
+                db, paciente_id, tipo_evento, data_inicio, data_fim
+            )
+            query = aplicar_cursor(
+                query, (LogProntuario.dataEvento, LogProntuario.id), cursor
+            )
+            eventos, cursor = paginar(
+                query, tamanho_lote, lambda e: (e.dataEvento, e.id)
+            )
+            yield from eventos
+            if cursor is None:
+                return
+    
+    @staticmethod
+    def _query_timeline(
+        db: Session,
+        paciente_id: int,
+        tipo_evento: Optional[TipoEvento],
+        data_inicio: Optional[datetime],
+        data_fim: Optional[datetime]
+    ):
+        """Projeção da linha do tempo, na ordem de ix_logs_prontuario_timeline"""
+        query = db.query(
+            LogProntuario.id,
+            LogProntuario.tipoEvento,
+            LogProntuario.dataEvento,
+            LogProntuario.descricao
+        ).filter(
             LogProntuario.pacienteId == paciente_id
         )
         
@@ -40,59 +93,63 @@ class ProntuarioService:
             query = query.filter(LogProntuario.dataEvento <= data_fim)
         
         # Ordena por data (mais recente primeiro)
-        return query.order_by(LogProntuario.dataEvento.desc()).all()
+        return query.order_by(LogProntuario.dataEvento.desc(), LogProntuario.id.desc())
     
     @staticmethod
     def obter_historico_completo(db: Session, paciente_id: int) -> dict:
         """
-        Retorna histórico completo organizado por tipo
+        Retorna o resumo do histórico do paciente em uma única consulta:
+        totais de consultas, exames e laudos, contagem de eventos do
+        prontuário por tipo e datas do primeiro/último evento
         """
         from app.gestao_consultas.models.consulta import Consulta
         from app.gestao_exames.models.solicitacao_exame import SolicitacaoExame
         from app.gestao_exames.models.laudo import Laudo
         
-        historico = {
-            "consultas": [],
-            "exames": [],
-            "laudos": [],
-            "timeline": []
-        }
-        
-        # Busca consultas
-        consultas = db.query(Consulta).filter(
-            Consulta.pacienteId == paciente_id
-        ).order_by(Consulta.dataHora.desc()).all()
-        historico["consultas"] = consultas
+        def total(coluna):
+            return select(func.count()).where(coluna == paciente_id).scalar_subquery()
         
-        # Busca solicitações de exame
-        exames = db.query(SolicitacaoExame).filter(
-            SolicitacaoExame.pacienteId == paciente_id
-        ).order_by(SolicitacaoExame.dataSolicitacao.desc()).all()
-        historico["exames"] = exames
+        por_tipo = [
+            func.count().filter(LogProntuario.tipoEvento == tipo).label(tipo.name)
+            for tipo in TipoEvento
+        ]
         
-        # Busca todos os logs para timeline
-        timeline = db.query(LogProntuario).filter(
-            LogProntuario.pacienteId == paciente_id
-        ).order_by(LogProntuario.dataEvento.desc()).all()
-        historico["timeline"] = timeline
+        linha = db.execute(
+            select(
+                total(Consulta.pacienteId).label("total_consultas"),
+                total(SolicitacaoExame.pacienteId).label("total_exames"),
+                total(Laudo.pacienteId).label("total_laudos"),
+                func.count().label("total_eventos"),
+                func.min(LogProntuario.dataEvento).label("primeiro_evento"),
+                func.max(LogProntuario.dataEvento).label("ultimo_evento"),
+                *por_tipo
+            ).where(LogProntuario.pacienteId == paciente_id)
+        ).one()
         
-        return historico
+        return {
+            "total_consultas": linha.total_consultas,
+            "total_exames": linha.total_exames,
+            "total_laudos": linha.total_laudos,
+            "total_eventos": linha.total_eventos,
+            "eventos_por_tipo": {
+                tipo: getattr(linha, tipo.name) for tipo in TipoEvento
+            },
+            "primeiro_evento": linha.primeiro_evento,
+            "ultimo_evento": linha.ultimo_evento,
+        }
     
     @staticmethod
     def contar_eventos_por_tipo(db: Session, paciente_id: int) -> dict:
         """Retorna contagem de eventos por tipo"""
-        eventos = db.query(LogProntuario).filter(
-            LogProntuario.pacienteId == paciente_id
-        ).all()
+        contagem = {tipo: 0 for tipo in TipoEvento}
         
-        contagem = {
-            TipoEvento.CONSULTA: 0,
-            TipoEvento.EXAME: 0,
-            TipoEvento.LAUDO: 0,
-            TipoEvento.SOLICITACAO_EXAME: 0
-        }
+        linhas = db.query(
+            LogProntuario.tipoEvento, func.count()
+        ).filter(
+            LogProntuario.pacienteId == paciente_id
+        ).group_by(LogProntuario.tipoEvento).all()
         
-        for evento in eventos:
-            contagem[evento.tipoEvento] += 1
+        for tipo_evento, quantidade in linhas:
+            contagem[tipo_evento] = quantidade
         
         return contagem
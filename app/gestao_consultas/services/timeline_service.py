@@ -0,0 +1,273 @@
+"""
+Service para a Linha do Tempo do Paciente
+Feature 2 - Épico 3: Gestão de Exames e Documentação Clínica
+
+Mantém timeline_paciente, o read model da tela de prontuário: cada evento
+já carrega nome do exame, médico, status e link do arquivo, de modo que a
+tela é servida por uma varredura do índice (pacienteId, dataEvento, id)
+sem joins. As funções de registro participam da transação de quem chama
+(não fazem commit), como no EstatisticaService.
+"""
+
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.paginacao import aplicar_cursor, limitar, paginar
+from app.gestao_consultas.models.log_prontuario import TipoEvento
+from app.gestao_consultas.models.timeline_paciente import EventoTimeline
+from app.gestao_perfis.models.usuario import Usuario
+
+# Recria a timeline a partir das tabelas de origem. Os enums são gravados
+# pelo nome; o status da timeline guarda o valor exibido (consultas em
+# minúsculas, demais iguais ao nome). Laudos entram só quando finalizados.
+RECONSTRUIR_SQL = [
+    """
+    INSERT INTO timeline_paciente ("pacienteId", "tipoEvento", "referenciaId",
+        "dataEvento", titulo, status, "medicoId", "medicoNome", descricao)
+    SELECT c."pacienteId", CAST('CONSULTA' AS tipoevento), c.id, c."dataHora",
+           'Consulta', lower(CAST(c.status AS text)), c."medicoId", u.nome,
+           c."motivoConsulta"
+    FROM consultas c
+    LEFT JOIN usuarios u ON u.id = c."medicoId"
+    WHERE CAST(:paciente_id AS integer) IS NULL OR c."pacienteId" = :paciente_id
+    """,
+    """
+    INSERT INTO timeline_paciente ("pacienteId", "tipoEvento", "referenciaId",
+        "dataEvento", titulo, status, "medicoId", "medicoNome", descricao)
+    SELECT s."pacienteId", CAST('SOLICITACAO_EXAME' AS tipoevento), s.id,
+           s."dataSolicitacao", s."nomeExame", CAST(s.status AS text),
+           s."medicoSolicitante", u.nome, s."hipoteseDiagnostica"
+    FROM solicitacoes_exame s
+    LEFT JOIN usuarios u ON u.id = s."medicoSolicitante"
+    WHERE CAST(:paciente_id AS integer) IS NULL OR s."pacienteId" = :paciente_id
+    """,
+    """
+    INSERT INTO timeline_paciente ("pacienteId", "tipoEvento", "referenciaId",
+        "dataEvento", titulo, status, "medicoId", "medicoNome", "nomeLaboratorio",
+        "arquivoUrl", descricao)
+    SELECT s."pacienteId", CAST('EXAME' AS tipoevento), r.id, r."dataUpload",
+           s."nomeExame", CAST(s.status AS text), s."medicoSolicitante", u.nome,
+           r."nomeLaboratorio", r."arquivoUrl", r.observacoes
+    FROM resultados_exame r
+    JOIN solicitacoes_exame s ON s.id = r."solicitacaoId"
+    LEFT JOIN usuarios u ON u.id = s."medicoSolicitante"
+    WHERE CAST(:paciente_id AS integer) IS NULL OR s."pacienteId" = :paciente_id
+    """,
+    """
+    INSERT INTO timeline_paciente ("pacienteId", "tipoEvento", "referenciaId",
+        "dataEvento", titulo, status, "medicoId", "medicoNome", descricao)
+    SELECT l."pacienteId", CAST('LAUDO' AS tipoevento), l.id, l."dataEmissao",
+           l.titulo, CAST(l.status AS text), l."medicoId", u.nome, l.descricao
+    FROM laudos l
+    LEFT JOIN usuarios u ON u.id = l."medicoId"
+    WHERE l.status = 'FINALIZADO'
+      AND (CAST(:paciente_id AS integer) IS NULL OR l."pacienteId" = :paciente_id)
+    """,
+]
+
+
+class TimelineService:
+    """Service para manter e consultar a linha do tempo do paciente"""
+
+    @staticmethod
+    def _registrar(
+        db: Session,
+        paciente_id: int,
+        tipo_evento: TipoEvento,
+        referencia_id: int,
+        data_evento: datetime,
+        titulo: str,
+        status: Optional[str] = None,
+        medico_id: Optional[int] = None,
+        nome_laboratorio: Optional[str] = None,
+        arquivo_url: Optional[str] = None,
+        descricao: Optional[str] = None,
+    ):
+        """Insere ou atualiza o evento da entidade de origem"""
+        medico_nome = (
+            select(Usuario.nome).where(Usuario.id == medico_id).scalar_subquery()
+            if medico_id is not None
+            else None
+        )
+        valores = {
+            "pacienteId": paciente_id,
+            "tipoEvento": tipo_evento,
+            "referenciaId": referencia_id,
+            "dataEvento": data_evento,
+            "titulo": titulo,
+            "status": status,
+            "medicoId": medico_id,
+            "medicoNome": medico_nome,
+            "nomeLaboratorio": nome_laboratorio,
+            "arquivoUrl": arquivo_url,
+            "descricao": descricao,
+        }
+        stmt = insert(EventoTimeline).values(**valores)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_timeline_paciente_referencia",
+            set_={
+                coluna: stmt.excluded[coluna]
+                for coluna in valores
+                if coluna not in ("tipoEvento", "referenciaId")
+            },
+        )
+        db.execute(stmt)
+
+    @staticmethod
+    def registrar_consulta(db: Session, consulta):
+        TimelineService._registrar(
+            db,
+            consulta.pacienteId,
+            TipoEvento.CONSULTA,
+            consulta.id,
+            consulta.dataHora,
+            "Consulta",
+            status=consulta.status.value,
+            medico_id=consulta.medicoId,
+            descricao=consulta.motivoConsulta,
+        )
+
+    @staticmethod
+    def registrar_solicitacao(db: Session, solicitacao):
+        TimelineService._registrar(
+            db,
+            solicitacao.pacienteId,
+            TipoEvento.SOLICITACAO_EXAME,
+            solicitacao.id,
+            solicitacao.dataSolicitacao,
+            solicitacao.nomeExame,
+            status=solicitacao.status.value,
+            medico_id=solicitacao.medicoSolicitante,
+            descricao=solicitacao.hipoteseDiagnostica,
+        )
+
+    @staticmethod
+    def registrar_resultado(db: Session, resultado, solicitacao):
+        TimelineService._registrar(
+            db,
+            solicitacao.pacienteId,
+            TipoEvento.EXAME,
+            resultado.id,
+            resultado.dataUpload,
+            solicitacao.nomeExame,
+            status=solicitacao.status.value,
+            medico_id=solicitacao.medicoSolicitante,
+            nome_laboratorio=resultado.nomeLaboratorio,
+            arquivo_url=resultado.arquivoUrl,
+            descricao=resultado.observacoes,
+        )
+
+    @staticmethod
+    def registrar_laudo(db: Session, laudo):
+        TimelineService._registrar(
+            db,
+            laudo.pacienteId,
+            TipoEvento.LAUDO,
+            laudo.id,
+            laudo.dataEmissao,
+            laudo.titulo,
+            status=laudo.status.value,
+            medico_id=laudo.medicoId,
+            descricao=laudo.descricao,
+        )
+
+    @staticmethod
+    def atualizar_status(
+        db: Session, tipo_evento: TipoEvento, referencia_id: int, status: str
+    ):
+        """Propaga a mudança de status da entidade de origem"""
+        db.execute(
+            update(EventoTimeline)
+            .where(
+                EventoTimeline.tipoEvento == tipo_evento,
+                EventoTimeline.referenciaId == referencia_id,
+            )
+            .values(status=status)
+        )
+
+    @staticmethod
+    def atualizar_status_solicitacao(db: Session, solicitacao_id: int, status: str):
+        """Status da solicitação e dos eventos dos seus resultados"""
+        from app.gestao_exames.models.resultado_exame import ResultadoExame
+
+        TimelineService.atualizar_status(
+            db, TipoEvento.SOLICITACAO_EXAME, solicitacao_id, status
+        )
+        db.execute(
+            update(EventoTimeline)
+            .where(
+                EventoTimeline.tipoEvento == TipoEvento.EXAME,
+                EventoTimeline.referenciaId.in_(
+                    select(ResultadoExame.id).where(
+                        ResultadoExame.solicitacaoId == solicitacao_id
+                    )
+                ),
+            )
+            .values(status=status)
+        )
+
+    @staticmethod
+    def remover(db: Session, tipo_evento: TipoEvento, referencias_ids: Iterable[int]):
+        """Remove os eventos de entidades excluídas"""
+        referencias_ids = list(referencias_ids)
+        if not referencias_ids:
+            return
+        db.execute(
+            delete(EventoTimeline).where(
+                EventoTimeline.tipoEvento == tipo_evento,
+                EventoTimeline.referenciaId.in_(referencias_ids),
+            )
+        )
+
+    @staticmethod
+    def listar(
+        db: Session,
+        paciente_id: int,
+        tipo_evento: Optional[TipoEvento] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limite: int = 50,
+    ) -> Tuple[List[EventoTimeline], Optional[str]]:
+        """Página da linha do tempo (mais recente primeiro) e próximo cursor"""
+        query = db.query(EventoTimeline).filter(
+            EventoTimeline.pacienteId == paciente_id
+        )
+
+        if tipo_evento:
+            query = query.filter(EventoTimeline.tipoEvento == tipo_evento)
+        if data_inicio:
+            query = query.filter(EventoTimeline.dataEvento >= data_inicio)
+        if data_fim:
+            query = query.filter(EventoTimeline.dataEvento <= data_fim)
+
+        query = aplicar_cursor(
+            query, (EventoTimeline.dataEvento, EventoTimeline.id), cursor
+        )
+        query = query.order_by(
+            EventoTimeline.dataEvento.desc(), EventoTimeline.id.desc()
+        )
+
+        return paginar(query, limitar(limite), lambda e: (e.dataEvento, e.id))
+
+    @staticmethod
+    def reconstruir(db: Session, paciente_id: Optional[int] = None):
+        """Recalcula a timeline (de um paciente ou de todos) a partir das origens"""
+        params = {"paciente_id": paciente_id}
+        db.execute(
+            text(
+                """
+                DELETE FROM timeline_paciente
+                WHERE CAST(:paciente_id AS integer) IS NULL
+                   OR "pacienteId" = :paciente_id
+                """
+            ),
+            params,
+        )
+        for sql in RECONSTRUIR_SQL:
+            db.execute(text(sql), params)
+        db.commit()
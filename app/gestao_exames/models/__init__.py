@@ -5,6 +5,9 @@ from .solicitacao_exame import SolicitacaoExame, StatusSolicitacao
 from .resultado_exame import ResultadoExame
 from .laudo import Laudo, StatusLaudo
 from .laudo_resultado import LaudoResultado
+from .estatistica_diaria import EstatisticaDiariaMedico, PacienteDiarioMedico
+from .fila_laudo import ItemFilaLaudo
+from .tempo_resposta import TempoRespostaDiario, EtapaExame
 
 __all__ = [
     "SolicitacaoExame",
@@ -13,4 +16,9 @@ __all__ = [
     "Laudo",
     "StatusLaudo",
     "LaudoResultado",
+    "EstatisticaDiariaMedico",
+    "PacienteDiarioMedico",
+    "ItemFilaLaudo",
+    "TempoRespostaDiario",
+    "EtapaExame",
 ]
@@ -0,0 +1,35 @@
+"""
+Modelos de Estatísticas Diárias (rollup do dashboard)
+"""
+
+from sqlalchemy import Column, Integer, Date, ForeignKey
+
+from app.core.database import Base
+
+
+class EstatisticaDiariaMedico(Base):
+    """Contadores diários por médico, mantidos incrementalmente"""
+
+    __tablename__ = "estatisticas_diarias_medico"
+
+    medicoId = Column(Integer, ForeignKey("medicos.usuarioId"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    solicitacoes = Column(Integer, nullable=False, default=0, server_default="0")
+    resultados = Column(Integer, nullable=False, default=0, server_default="0")
+    laudos = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<EstatisticaDiariaMedico(medico={self.medicoId}, dia={self.dia})>"
+
+
+class PacienteDiarioMedico(Base):
+    """Conjunto exato de pacientes com solicitação por médico e dia"""
+
+    __tablename__ = "pacientes_diarios_medico"
+
+    medicoId = Column(Integer, ForeignKey("medicos.usuarioId"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    pacienteId = Column(Integer, ForeignKey("pacientes.usuarioId"), primary_key=True)
+
+    def __repr__(self):
+        return f"<PacienteDiarioMedico(medico={self.medicoId}, dia={self.dia}, paciente={self.pacienteId})>"
@@ -0,0 +1,44 @@
+"""
+Modelo da Fila de Laudos (resultados aguardando laudo)
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
+
+from app.core.database import Base
+
+
+class ItemFilaLaudo(Base):
+    """
+    Resultado de exame ainda sem laudo. Entra no upload e sai quando um
+    laudo o associa. reservadoPor/reservadoEm marcam o médico que puxou o
+    item da fila; reservas vencidas voltam a ficar livres.
+    """
+
+    __tablename__ = "fila_laudos"
+    __table_args__ = (
+        # Próximos itens livres, do upload mais antigo ao mais novo
+        Index(
+            "ix_fila_laudos_livres",
+            "dataUpload",
+            "resultadoExameId",
+            postgresql_where=text('"reservadoPor" IS NULL'),
+        ),
+        # Reservas em andamento (poucas linhas): minhas reservas e expiração
+        Index(
+            "ix_fila_laudos_reservadas",
+            "reservadoEm",
+            postgresql_where=text('"reservadoPor" IS NOT NULL'),
+        ),
+    )
+
+    resultadoExameId = Column(
+        Integer, ForeignKey("resultados_exame.id", ondelete="CASCADE"), primary_key=True
+    )
+    pacienteId = Column(Integer, ForeignKey("pacientes.usuarioId"), nullable=False)
+    medicoSolicitante = Column(Integer, ForeignKey("medicos.usuarioId"), nullable=False)
+    nomeExame = Column(String, nullable=False)
+    dataUpload = Column(DateTime, nullable=False)
+    reservadoPor = Column(Integer, ForeignKey("medicos.usuarioId"), nullable=True)
+    reservadoEm = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ItemFilaLaudo(resultado={self.resultadoExameId}, reservadoPor={self.reservadoPor})>"
@@ -11,8 +11,10 @@ from sqlalchemy import (
     ForeignKey,
     Enum as SQLEnum,
     Text,
+    Index,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 
 from app.core.database import Base
@@ -27,14 +29,23 @@ class StatusLaudo(str, Enum):
 
 class Laudo(Base):
     __tablename__ = "laudos"
+    __table_args__ = (
+        # Dashboard e listagens do médico filtram por médico + período
+        Index("ix_laudos_medico_data", "medicoId", "dataEmissao"),
+        Index("ix_laudos_busca", "buscaVetor", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True)
     medicoId = Column(Integer, ForeignKey("medicos.usuarioId"), nullable=False)
-    pacienteId = Column(Integer, ForeignKey("pacientes.usuarioId"), nullable=False)
+    pacienteId = Column(Integer, ForeignKey("pacientes.usuarioId"), nullable=False, index=True)
     titulo = Column(String, nullable=False)
     descricao = Column(Text, nullable=False)
     status = Column(SQLEnum(StatusLaudo), default=StatusLaudo.RASCUNHO)
     dataEmissao = Column(DateTime, default=datetime.utcnow)
+    # Versão da linha para os ETags das listagens (app.core.etag)
+    atualizadoEm = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Mantido por trigger (ver BuscaService.instalar)
+    buscaVetor = deferred(Column(TSVECTOR))
 
     # Relacionamentos
     resultados = relationship(
@@ -14,7 +14,7 @@ class LaudoResultado(Base):
     id = Column(Integer, primary_key=True)
     laudoId = Column(Integer, ForeignKey("laudos.id"), nullable=False)
     resultadoExameId = Column(
-        Integer, ForeignKey("resultados_exame.id"), nullable=False
+        Integer, ForeignKey("resultados_exame.id"), nullable=False, index=True
     )
 
     # Relacionamentos
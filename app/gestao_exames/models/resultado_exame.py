@@ -13,13 +13,18 @@ class ResultadoExame(Base):
     __tablename__ = "resultados_exame"
 
     id = Column(Integer, primary_key=True)
-    solicitacaoId = Column(Integer, ForeignKey("solicitacoes_exame.id"), nullable=False)
+    solicitacaoId = Column(
+        Integer, ForeignKey("solicitacoes_exame.id"), nullable=False, index=True
+    )
     dataRealizacao = Column(DateTime, nullable=False)
     nomeLaboratorio = Column(String, nullable=False)
     arquivoUrl = Column(String, nullable=False)  # URL/path do arquivo PDF, imagem, etc
     nomeArquivo = Column(String)
     dataUpload = Column(DateTime, default=datetime.utcnow)
     observacoes = Column(Text)
+    # Versão da linha para os ETags das listagens (app.core.etag); também
+    # muda quando o resultado ganha ou perde laudo (tem_laudo)
+    atualizadoEm = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relacionamentos
     solicitacao = relationship("SolicitacaoExame", back_populates="resultados")
@@ -2,8 +2,9 @@
 Modelo de Solicitação de Exame
 """
 from enum import Enum
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from nanoid import generate
 
@@ -24,17 +25,32 @@ def gerar_codigo_solicitacao():
 
 class SolicitacaoExame(Base):
     __tablename__ = "solicitacoes_exame"
+    __table_args__ = (
+        # Dashboard e listagens do médico filtram por médico + período
+        Index("ix_solicitacoes_exame_medico_data", "medicoSolicitante", "dataSolicitacao"),
+        Index("ix_solicitacoes_exame_busca", "buscaVetor", postgresql_using="gin"),
+        # Backlog de solicitações sem resultado (dashboard de operações)
+        Index(
+            "ix_solicitacoes_exame_pendentes",
+            "dataSolicitacao",
+            postgresql_where=text("status = 'AGUARDANDO_RESULTADO'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     codigoSolicitacao = Column(String, unique=True, nullable=False, default=gerar_codigo_solicitacao)
     consultaId = Column(Integer, ForeignKey("consultas.id"), nullable=True)  # Pode ser opcional
-    pacienteId = Column(Integer, ForeignKey("pacientes.usuarioId"), nullable=False)
+    pacienteId = Column(Integer, ForeignKey("pacientes.usuarioId"), nullable=False, index=True)
     medicoSolicitante = Column(Integer, ForeignKey("medicos.usuarioId"), nullable=False)
     nomeExame = Column(String, nullable=False)
     hipoteseDiagnostica = Column(Text)
     detalhesPreparo = Column(Text)
     status = Column(SQLEnum(StatusSolicitacao), default=StatusSolicitacao.AGUARDANDO_RESULTADO)
     dataSolicitacao = Column(DateTime, default=datetime.utcnow)
+    # Versão da linha para os ETags das listagens (app.core.etag)
+    atualizadoEm = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Mantido por trigger (ver BuscaService.instalar)
+    buscaVetor = deferred(Column(TSVECTOR))
     
     # Relacionamentos
     consulta = relationship("Consulta", foreign_keys=[consultaId])
@@ -0,0 +1,38 @@
+"""
+Modelo de Tempos de Resposta Diários (histograma de turnaround)
+"""
+
+from enum import Enum
+from sqlalchemy import Column, Integer, String, Date, Enum as SQLEnum
+
+from app.core.database import Base
+
+
+class EtapaExame(str, Enum):
+    """Intervalo medido no ciclo do exame"""
+
+    RESULTADO = "resultado"  # solicitação -> upload do resultado
+    LAUDO = "laudo"  # upload do resultado -> emissão do laudo
+    TOTAL = "total"  # solicitação -> emissão do laudo
+
+
+class TempoRespostaDiario(Base):
+    """
+    Histograma diário dos tempos de resposta por laboratório, exame e médico.
+    Cada faixa cobre um intervalo logarítmico de minutos (ver
+    TempoRespostaService); somar as faixas de um período e acumular dá os
+    percentis sem reler as tabelas de origem.
+    """
+
+    __tablename__ = "tempos_resposta_diarios"
+
+    etapa = Column(SQLEnum(EtapaExame), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    nomeLaboratorio = Column(String, primary_key=True)
+    nomeExame = Column(String, primary_key=True)
+    medicoId = Column(Integer, primary_key=True)
+    faixa = Column(Integer, primary_key=True)
+    quantidade = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<TempoRespostaDiario(etapa={self.etapa}, dia={self.dia}, faixa={self.faixa})>"
@@ -130,15 +130,37 @@ class ExameResponse(BaseModel):
         from_attributes = True
 
 
+class ResultadoExameResponse(BaseModel):
+    """Resultado de exame na listagem /exames"""
+
+    id: int
+    solicitacao_id: int
+    codigo_solicitacao: str
+    paciente_id: int
+    paciente_nome: Optional[str]
+    paciente_cpf: Optional[str]
+    medico_id: int
+    medico_nome: Optional[str]
+    medico_crm: Optional[str]
+    nome_exame: str
+    data_realizacao: datetime
+    data_upload: datetime
+    nome_laboratorio: str
+    nome_arquivo: Optional[str]
+    url_arquivo: str
+    observacoes: Optional[str]
+    tem_laudo: bool
+
+
 class SolicitacaoExameResponse(BaseModel):
     id: int
     codigo_solicitacao: str
     paciente_id: int
-    paciente_nome: str
-    paciente_cpf: str
+    paciente_nome: Optional[str]
+    paciente_cpf: Optional[str]
     medico_id: int
-    medico_nome: str
-    medico_crm: str
+    medico_nome: Optional[str]
+    medico_crm: Optional[str]
     nome_exame: str
     hipotese_diagnostica: Optional[str]
     detalhes_preparo: Optional[str]
@@ -155,8 +177,8 @@ class LaudoResponse(BaseModel):
     paciente_nome: str
     paciente_cpf: str
     medico_id: int
-    medico_nome: str
-    medico_crm: str
+    medico_nome: Optional[str]
+    medico_crm: Optional[str]
     titulo: str
     descricao: str
     status: str
@@ -0,0 +1,271 @@
+"""
+Service para Estatísticas do Dashboard
+Épico 3: Gestão de Exames e Documentação Clínica
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.cache import em_cache
+
+
+# Agrupamento -> (unidade do date_trunc, passo do generate_series, formato do rótulo)
+AGRUPAMENTOS = {
+    "dia": ("day", "1 day", "YYYY-MM-DD"),
+    "semana": ("week", "1 week", "IYYY-IW"),
+    "mes": ("month", "1 month", "YYYY-MM"),
+}
+
+# Todas as métricas em uma única ida ao banco, lidas dos rollups diários
+# (estatisticas_diarias_medico / pacientes_diarios_medico): o custo depende
+# do número de dias do período, não do volume de solicitações do médico.
+# Os buckets vazios são preenchidos pelo generate_series.
+ESTATISTICAS_SQL = text(
+    """
+    WITH est AS (
+        SELECT e.dia, e.solicitacoes, e.resultados, e.laudos
+        FROM estatisticas_diarias_medico e
+        WHERE e."medicoId" = :medico_id
+          AND e.dia >= CAST(:data_inicio AS date)
+    ),
+    buckets AS (
+        SELECT generate_series(
+            date_trunc(:unidade, CAST(GREATEST(
+                CAST(:data_inicio AS date),
+                LEAST(
+                    (SELECT min(dia) FROM est WHERE solicitacoes > 0 OR laudos > 0),
+                    CAST(:data_fim AS date)
+                )
+            ) AS timestamp)),
+            date_trunc(:unidade, CAST(:data_fim AS timestamp)),
+            CAST(:passo AS interval)
+        ) AS bucket
+    ),
+    est_b AS (
+        SELECT date_trunc(:unidade, CAST(dia AS timestamp)) AS bucket,
+               sum(solicitacoes) AS solicitacoes,
+               sum(laudos) AS laudos
+        FROM est
+        GROUP BY 1
+    )
+    SELECT
+        (SELECT sum(solicitacoes) FROM est) AS total_solicitacoes,
+        (SELECT sum(resultados) FROM est) AS exames_recebidos,
+        (SELECT sum(laudos) FROM est) AS laudos_emitidos,
+        (
+            SELECT count(DISTINCT p."pacienteId")
+            FROM pacientes_diarios_medico p
+            WHERE p."medicoId" = :medico_id
+              AND p.dia >= CAST(:data_inicio AS date)
+        ) AS total_pacientes,
+        (
+            SELECT coalesce(json_agg(json_build_object(
+                'data_ponto', to_char(b.bucket, :formato),
+                'total', coalesce(eb.solicitacoes, 0)
+            ) ORDER BY b.bucket), '[]'::json)
+            FROM buckets b LEFT JOIN est_b eb ON eb.bucket = b.bucket
+        ) AS solicitacoes_por_agrupamento,
+        (
+            SELECT coalesce(json_agg(json_build_object(
+                'data_ponto', to_char(b.bucket, :formato),
+                'total', coalesce(eb.laudos, 0)
+            ) ORDER BY b.bucket), '[]'::json)
+            FROM buckets b LEFT JOIN est_b eb ON eb.bucket = b.bucket
+        ) AS laudos_por_agrupamento
+    """
+)
+
+
+# Visão da clínica para funcionários, também só sobre estruturas pequenas:
+# backlog pelo índice parcial de solicitações pendentes, fila_laudos,
+# uploads por laboratório do histograma de tempos de resposta (etapa
+# RESULTADO) e desfecho das consultas do rollup consultas_diarias.
+OPERACOES_SQL = text(
+    """
+    WITH uploads AS (
+        SELECT dia, "nomeLaboratorio" AS laboratorio, sum(quantidade) AS total
+        FROM tempos_resposta_diarios
+        WHERE etapa = 'RESULTADO'
+          AND dia >= CAST(:data_inicio AS date) AND dia <= CAST(:data_fim AS date)
+        GROUP BY 1, 2
+        HAVING sum(quantidade) > 0
+    ),
+    desfechos AS (
+        SELECT dia, sum(total) AS total, sum(realizadas) AS realizadas,
+               sum(canceladas) AS canceladas, sum(faltas) AS faltas
+        FROM consultas_diarias
+        WHERE dia >= CAST(:data_inicio AS date) AND dia <= CAST(:data_fim AS date)
+        GROUP BY 1
+    ),
+    pendentes AS (
+        SELECT "dataSolicitacao" FROM solicitacoes_exame
+        WHERE status = 'AGUARDANDO_RESULTADO'
+    )
+    SELECT
+        (SELECT count(*) FROM pendentes) AS solicitacoes_pendentes,
+        (SELECT min("dataSolicitacao") FROM pendentes) AS pendente_mais_antiga,
+        (SELECT count(*) FROM pendentes WHERE "dataSolicitacao" < :limite_7_dias)
+            AS pendentes_7_dias,
+        (SELECT count(*) FROM pendentes WHERE "dataSolicitacao" < :limite_30_dias)
+            AS pendentes_30_dias,
+        (SELECT count(*) FROM fila_laudos WHERE "reservadoPor" IS NULL) AS laudos_livres,
+        (SELECT count(*) FROM fila_laudos WHERE "reservadoPor" IS NOT NULL)
+            AS laudos_reservados,
+        (
+            SELECT coalesce(json_agg(json_build_object(
+                'dia', to_char(dia, 'YYYY-MM-DD'),
+                'laboratorio', laboratorio,
+                'total', total
+            ) ORDER BY dia, laboratorio), '[]'::json)
+            FROM uploads
+        ) AS uploads_por_laboratorio,
+        (SELECT coalesce(sum(total), 0) FROM desfechos) AS consultas_total,
+        (SELECT coalesce(sum(realizadas), 0) FROM desfechos) AS consultas_realizadas,
+        (SELECT coalesce(sum(canceladas), 0) FROM desfechos) AS consultas_canceladas,
+        (SELECT coalesce(sum(faltas), 0) FROM desfechos) AS consultas_faltas,
+        (
+            SELECT coalesce(json_agg(json_build_object(
+                'dia', to_char(dia, 'YYYY-MM-DD'),
+                'total', total,
+                'realizadas', realizadas,
+                'canceladas', canceladas,
+                'faltas', faltas
+            ) ORDER BY dia), '[]'::json)
+            FROM desfechos
+        ) AS consultas_por_dia
+    """
+)
+
+
+def _taxa(parte: int, total: int) -> Optional[float]:
+    return round(parte / total, 4) if total else None
+
+
+class DashboardService:
+    """Service para calcular as estatísticas do dashboard do médico"""
+
+    @staticmethod
+    def calcular_periodo(
+        periodo: Optional[str], agora: Optional[datetime] = None
+    ) -> tuple[datetime, datetime]:
+        """Converte o período ("7d", "30d", "90d", "1y", "all") em datas"""
+        data_fim = agora or datetime.utcnow()
+        if periodo == "7d":
+            data_inicio = data_fim - timedelta(days=7)
+        elif periodo == "90d":
+            data_inicio = data_fim - timedelta(days=90)
+        elif periodo == "1y":
+            data_inicio = data_fim - timedelta(days=365)
+        elif periodo == "all":
+            data_inicio = datetime(2000, 1, 1)
+        else:  # 30d (default)
+            data_inicio = data_fim - timedelta(days=30)
+
+        return data_inicio, data_fim
+
+    @staticmethod
+    @em_cache("dashboard", ttl=30, max_itens=4096)
+    def obter_estatisticas(
+        db: Session,
+        medico_id: int,
+        periodo: Optional[str] = "30d",
+        agrupamento: Optional[str] = "mes",
+    ) -> dict:
+        """
+        Retorna resumo e séries temporais do médico em uma única query
+        sobre os rollups diários (granularidade de dia).
+        As séries não têm buracos: períodos sem eventos vêm com total 0.
+        Cache por (médico, período, agrupamento), invalidado a cada escrita
+        nos rollups do médico.
+        """
+        data_inicio, data_fim = DashboardService.calcular_periodo(periodo)
+        unidade, passo, formato = AGRUPAMENTOS.get(agrupamento, AGRUPAMENTOS["mes"])
+
+        row = (
+            db.execute(
+                ESTATISTICAS_SQL,
+                {
+                    "medico_id": medico_id,
+                    "data_inicio": data_inicio,
+                    "data_fim": data_fim,
+                    "unidade": unidade,
+                    "passo": passo,
+                    "formato": formato,
+                },
+            )
+            .mappings()
+            .one()
+        )
+
+        return {
+            "resumo": {
+                "total_solicitacoes": row["total_solicitacoes"] or 0,
+                "exames_recebidos": row["exames_recebidos"] or 0,
+                "laudos_emitidos": row["laudos_emitidos"] or 0,
+                "total_pacientes": row["total_pacientes"] or 0,
+            },
+            "solicitacoes_por_agrupamento": row["solicitacoes_por_agrupamento"],
+            "laudos_por_agrupamento": row["laudos_por_agrupamento"],
+        }
+
+    @staticmethod
+    @em_cache("operacoes", ttl=30, max_itens=64)
+    def obter_operacoes(db: Session, periodo: Optional[str] = "30d") -> dict:
+        """
+        Dashboard de operações da clínica (funcionários): backlog atual de
+        solicitações e laudos, uploads por laboratório por dia e desfecho das
+        consultas (taxa de faltas) no período. Consolida antes os dias de
+        consultas encerrados desde a última atualização.
+        """
+        from app.gestao_consultas.services.consulta_diaria_service import (
+            ConsultaDiariaService,
+        )
+
+        ConsultaDiariaService.atualizar(db)
+
+        agora = datetime.utcnow()
+        data_inicio, data_fim = DashboardService.calcular_periodo(periodo, agora)
+        row = (
+            db.execute(
+                OPERACOES_SQL,
+                {
+                    "data_inicio": data_inicio,
+                    "data_fim": data_fim,
+                    "limite_7_dias": agora - timedelta(days=7),
+                    "limite_30_dias": agora - timedelta(days=30),
+                },
+            )
+            .mappings()
+            .one()
+        )
+
+        # Faltas e realizadas sobre as consultas não canceladas
+        efetivas = row["consultas_total"] - row["consultas_canceladas"]
+        mais_antiga = row["pendente_mais_antiga"]
+        return {
+            "solicitacoes_pendentes": {
+                "total": row["solicitacoes_pendentes"],
+                "acima_7_dias": row["pendentes_7_dias"],
+                "acima_30_dias": row["pendentes_30_dias"],
+                "mais_antiga": mais_antiga.isoformat() if mais_antiga else None,
+            },
+            "laudos_pendentes": {
+                "livres": row["laudos_livres"],
+                "reservados": row["laudos_reservados"],
+                "total": row["laudos_livres"] + row["laudos_reservados"],
+            },
+            "uploads_por_laboratorio": row["uploads_por_laboratorio"],
+            "consultas": {
+                "total": int(row["consultas_total"]),
+                "realizadas": int(row["consultas_realizadas"]),
+                "canceladas": int(row["consultas_canceladas"]),
+                "faltas": int(row["consultas_faltas"]),
+                "taxa_faltas": _taxa(int(row["consultas_faltas"]), int(efetivas)),
+                "taxa_cancelamento": _taxa(
+                    int(row["consultas_canceladas"]), int(row["consultas_total"])
+                ),
+                "por_dia": row["consultas_por_dia"],
+            },
+        }
@@ -0,0 +1,190 @@
+"""
+Service para Estatísticas Diárias do Dashboard
+Mantém as tabelas de rollup usadas por /dashboard/stats
+"""
+
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import Date, cast, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidar_apos_commit
+from app.gestao_exames.models.estatistica_diaria import (
+    EstatisticaDiariaMedico,
+    PacienteDiarioMedico,
+)
+from app.gestao_exames.models.solicitacao_exame import SolicitacaoExame
+
+
+class EstatisticaService:
+    """
+    Service para manter os contadores diários por médico.
+    As funções de registro devem ser chamadas dentro da mesma transação
+    da escrita original (antes do commit) para que o rollup fique consistente.
+    """
+
+    @staticmethod
+    def _incrementar(
+        db: Session,
+        medico_id: int,
+        quando: datetime,
+        solicitacoes: int = 0,
+        resultados: int = 0,
+        laudos: int = 0,
+    ):
+        """Soma (ou subtrai) os deltas no contador do dia via upsert"""
+        stmt = insert(EstatisticaDiariaMedico).values(
+            medicoId=medico_id,
+            dia=quando.date(),
+            solicitacoes=solicitacoes,
+            resultados=resultados,
+            laudos=laudos,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["medicoId", "dia"],
+            set_={
+                "solicitacoes": EstatisticaDiariaMedico.solicitacoes
+                + stmt.excluded.solicitacoes,
+                "resultados": EstatisticaDiariaMedico.resultados
+                + stmt.excluded.resultados,
+                "laudos": EstatisticaDiariaMedico.laudos + stmt.excluded.laudos,
+            },
+        )
+        db.execute(stmt)
+        invalidar_apos_commit(db, "dashboard", medico_id)
+
+    @staticmethod
+    def registrar_solicitacao(db: Session, solicitacao: SolicitacaoExame):
+        """Contabiliza uma nova solicitação e o paciente atendido no dia"""
+        EstatisticaService._incrementar(
+            db,
+            solicitacao.medicoSolicitante,
+            solicitacao.dataSolicitacao,
+            solicitacoes=1,
+        )
+        db.execute(
+            insert(PacienteDiarioMedico)
+            .values(
+                medicoId=solicitacao.medicoSolicitante,
+                dia=solicitacao.dataSolicitacao.date(),
+                pacienteId=solicitacao.pacienteId,
+            )
+            .on_conflict_do_nothing()
+        )
+
+    @staticmethod
+    def remover_solicitacao(db: Session, solicitacao: SolicitacaoExame):
+        """Desfaz a contagem de uma solicitação excluída"""
+        EstatisticaService._incrementar(
+            db,
+            solicitacao.medicoSolicitante,
+            solicitacao.dataSolicitacao,
+            solicitacoes=-1,
+        )
+
+        # Só remove o paciente do dia se não restar outra solicitação dele
+        dia = solicitacao.dataSolicitacao.date()
+        outras = (
+            db.query(SolicitacaoExame.id)
+            .filter(
+                SolicitacaoExame.medicoSolicitante == solicitacao.medicoSolicitante,
+                SolicitacaoExame.pacienteId == solicitacao.pacienteId,
+                SolicitacaoExame.id != solicitacao.id,
+                cast(SolicitacaoExame.dataSolicitacao, Date) == dia,
+            )
+            .first()
+        )
+        if not outras:
+            db.query(PacienteDiarioMedico).filter(
+                PacienteDiarioMedico.medicoId == solicitacao.medicoSolicitante,
+                PacienteDiarioMedico.dia == dia,
+                PacienteDiarioMedico.pacienteId == solicitacao.pacienteId,
+            ).delete(synchronize_session=False)
+
+    @staticmethod
+    def registrar_resultado(
+        db: Session, medico_id: int, data_upload: datetime, delta: int = 1
+    ):
+        """Contabiliza um resultado recebido para o médico solicitante"""
+        EstatisticaService._incrementar(db, medico_id, data_upload, resultados=delta)
+
+    @staticmethod
+    def registrar_laudo(
+        db: Session, medico_id: int, data_emissao: datetime, delta: int = 1
+    ):
+        """Contabiliza um laudo emitido pelo médico"""
+        EstatisticaService._incrementar(db, medico_id, data_emissao, laudos=delta)
+
+    @staticmethod
+    def reconstruir(
+        db: Session, desde: Optional[date] = None, medico_id: Optional[int] = None
+    ):
+        """
+        Job de recuperação: recalcula os rollups a partir das tabelas de origem.
+        Pode ser agendado periodicamente para corrigir qualquer divergência.
+        """
+        params = {"desde": desde or date(1900, 1, 1), "medico_id": medico_id}
+        filtro_medico = "AND (CAST(:medico_id AS integer) IS NULL OR {col} = :medico_id)"
+
+        db.execute(
+            text(
+                'DELETE FROM estatisticas_diarias_medico WHERE dia >= :desde '
+                + filtro_medico.format(col='"medicoId"')
+            ),
+            params,
+        )
+        db.execute(
+            text(
+                'DELETE FROM pacientes_diarios_medico WHERE dia >= :desde '
+                + filtro_medico.format(col='"medicoId"')
+            ),
+            params,
+        )
+        db.execute(
+            text(
+                f"""
+                INSERT INTO estatisticas_diarias_medico
+                    ("medicoId", dia, solicitacoes, resultados, laudos)
+                SELECT medico, dia, sum(sol), sum(res), sum(lau)
+                FROM (
+                    SELECT s."medicoSolicitante" AS medico,
+                           s."dataSolicitacao"::date AS dia,
+                           1 AS sol, 0 AS res, 0 AS lau
+                    FROM solicitacoes_exame s
+                    WHERE s."dataSolicitacao" >= :desde
+                      {filtro_medico.format(col='s."medicoSolicitante"')}
+                    UNION ALL
+                    SELECT s."medicoSolicitante", r."dataUpload"::date, 0, 1, 0
+                    FROM resultados_exame r
+                    JOIN solicitacoes_exame s ON s.id = r."solicitacaoId"
+                    WHERE r."dataUpload" >= :desde
+                      {filtro_medico.format(col='s."medicoSolicitante"')}
+                    UNION ALL
+                    SELECT l."medicoId", l."dataEmissao"::date, 0, 0, 1
+                    FROM laudos l
+                    WHERE l."dataEmissao" >= :desde
+                      {filtro_medico.format(col='l."medicoId"')}
+                ) eventos
+                GROUP BY medico, dia
+                """
+            ),
+            params,
+        )
+        db.execute(
+            text(
+                f"""
+                INSERT INTO pacientes_diarios_medico ("medicoId", dia, "pacienteId")
+                SELECT DISTINCT s."medicoSolicitante", s."dataSolicitacao"::date, s."pacienteId"
+                FROM solicitacoes_exame s
+                WHERE s."dataSolicitacao" >= :desde
+                  {filtro_medico.format(col='s."medicoSolicitante"')}
+                """
+            ),
+            params,
+        )
+        if medico_id is None:
+            invalidar_apos_commit(db, "dashboard")
+        else:
+            invalidar_apos_commit(db, "dashboard", medico_id)
+        db.commit()
@@ -7,12 +7,22 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
 
+from app.core import etag
+
 from app.gestao_exames.models.solicitacao_exame import (
     SolicitacaoExame,
     StatusSolicitacao,
 )
 from app.gestao_exames.models.resultado_exame import ResultadoExame
+from app.gestao_perfis.models.medico import Medico
+from app.gestao_perfis.models.usuario import Usuario
 from app.gestao_consultas.models.log_prontuario import LogProntuario, TipoEvento
+from app.gestao_consultas.services.timeline_service import TimelineService
+from app.gestao_exames.services.estatistica_service import EstatisticaService
+from app.gestao_exames.services.fila_laudo_service import FilaLaudoService
+from app.gestao_exames.services.tempo_resposta_service import TempoRespostaService
+from app.gestao_perfis.services.medico_paciente_service import MedicoPacienteService
+from app.notificacoes.services.eventos_service import EventosService
 
 
 class ExameService:
@@ -43,6 +53,12 @@ class ExameService:
         )
 
         db.add(nova_solicitacao)
+        db.flush()  # Para obter ID e data de solicitação
+
+        EstatisticaService.registrar_solicitacao(db, nova_solicitacao)
+        TimelineService.registrar_solicitacao(db, nova_solicitacao)
+        MedicoPacienteService.registrar_solicitacao(db, nova_solicitacao)
+
         db.commit()
         db.refresh(nova_solicitacao)
 
@@ -97,6 +113,17 @@ class ExameService:
         # Atualiza status da solicitação
         solicitacao.status = StatusSolicitacao.RESULTADO_ENVIADO
 
+        db.flush()  # Para obter a data de upload
+        EstatisticaService.registrar_resultado(
+            db, solicitacao.medicoSolicitante, novo_resultado.dataUpload
+        )
+        TimelineService.registrar_resultado(db, novo_resultado, solicitacao)
+        FilaLaudoService.adicionar(db, novo_resultado, solicitacao)
+        TempoRespostaService.registrar_resultado(db, novo_resultado, solicitacao)
+        TimelineService.atualizar_status_solicitacao(
+            db, solicitacao.id, solicitacao.status.value
+        )
+
         db.commit()
         db.refresh(novo_resultado)
 
@@ -110,6 +137,17 @@ class ExameService:
         db.add(log)
         db.commit()
 
+        EventosService.publicar(
+            [solicitacao.medicoSolicitante, solicitacao.pacienteId],
+            "resultado_exame_enviado",
+            {
+                "resultado_id": novo_resultado.id,
+                "solicitacao_id": solicitacao.id,
+                "codigo_solicitacao": solicitacao.codigoSolicitacao,
+                "nome_exame": solicitacao.nomeExame,
+            },
+        )
+
         return novo_resultado
 
     @staticmethod
@@ -180,11 +218,71 @@ class ExameService:
             raise ValueError("Solicitação não encontrada")
 
         solicitacao.status = novo_status
+        TimelineService.atualizar_status_solicitacao(
+            db, solicitacao.id, novo_status.value
+        )
         db.commit()
         db.refresh(solicitacao)
 
+        EventosService.publicar(
+            [solicitacao.medicoSolicitante, solicitacao.pacienteId],
+            "status_solicitacao_atualizado",
+            {
+                "solicitacao_id": solicitacao.id,
+                "codigo_solicitacao": solicitacao.codigoSolicitacao,
+                "status": solicitacao.status.value,
+            },
+        )
+
         return solicitacao
 
+    @staticmethod
+    def marcadores_solicitacao() -> tuple:
+        """
+        Marcadores de ETag (app.core.etag) dos campos que as respostas de
+        solicitação trazem de outras tabelas: nome/CPF do paciente, nome do
+        médico e CRM
+        """
+        return (
+            etag.marcador(
+                SolicitacaoExame,
+                Usuario.atualizadoEm,
+                Usuario.id.in_(
+                    [SolicitacaoExame.pacienteId, SolicitacaoExame.medicoSolicitante]
+                ),
+            ),
+            etag.marcador(
+                SolicitacaoExame,
+                Medico.atualizadoEm,
+                Medico.usuarioId == SolicitacaoExame.medicoSolicitante,
+            ),
+        )
+
+    @staticmethod
+    def marcadores_resultado() -> tuple:
+        """
+        Marcadores de ETag dos campos que as respostas de exame trazem da
+        solicitação, do paciente e do médico solicitante
+        """
+        da_solicitacao = SolicitacaoExame.id == ResultadoExame.solicitacaoId
+        return (
+            etag.marcador(ResultadoExame, SolicitacaoExame.atualizadoEm, da_solicitacao),
+            etag.marcador(
+                ResultadoExame,
+                Usuario.atualizadoEm,
+                da_solicitacao,
+                Usuario.id.in_(
+                    [SolicitacaoExame.pacienteId, SolicitacaoExame.medicoSolicitante]
+                ),
+            ),
+            etag.marcador(
+                ResultadoExame,
+                Medico.atualizadoEm,
+                da_solicitacao,
+                Medico.usuarioId == SolicitacaoExame.medicoSolicitante,
+            ),
+        )
+
     @staticmethod
     def buscar_resultados_solicitacao(
         db: Session, solicitacao_id: int
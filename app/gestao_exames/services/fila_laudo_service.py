@@ -0,0 +1,175 @@
+"""
+Service para a Fila de Laudos
+Épico 4: resultados de exame aguardando laudo
+
+Vários médicos puxam itens da mesma fila. A reserva usa
+SELECT ... FOR UPDATE SKIP LOCKED: cada médico pega os itens livres mais
+antigos que ninguém está reservando naquele instante, sem esperar pelos
+outros e sem receber o mesmo item. adicionar/remover/devolver participam
+da transação de quem chama (não fazem commit).
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.gestao_exames.models.fila_laudo import ItemFilaLaudo
+
+# Tempo até uma reserva sem laudo voltar para a fila
+RESERVA_MINUTOS = 30
+
+# Itens por reserva
+LOTE_MAXIMO = 20
+
+# Resultados sem laudo, a partir das tabelas de origem
+PENDENTES_SQL = """
+INSERT INTO fila_laudos ("resultadoExameId", "pacienteId", "medicoSolicitante",
+    "nomeExame", "dataUpload")
+SELECT r.id, s."pacienteId", s."medicoSolicitante", s."nomeExame",
+       COALESCE(r."dataUpload", now())
+FROM resultados_exame r
+JOIN solicitacoes_exame s ON s.id = r."solicitacaoId"
+WHERE NOT EXISTS (
+    SELECT 1 FROM laudo_resultado lr WHERE lr."resultadoExameId" = r.id
+)
+{filtro}
+ON CONFLICT ("resultadoExameId") DO NOTHING
+"""
+
+
+class FilaLaudoService:
+    """Service para manter e consumir a fila de laudos"""
+
+    @staticmethod
+    def adicionar(db: Session, resultado, solicitacao):
+        """Coloca um resultado recém-enviado na fila"""
+        db.execute(
+            insert(ItemFilaLaudo)
+            .values(
+                resultadoExameId=resultado.id,
+                pacienteId=solicitacao.pacienteId,
+                medicoSolicitante=solicitacao.medicoSolicitante,
+                nomeExame=solicitacao.nomeExame,
+                dataUpload=resultado.dataUpload,
+            )
+            .on_conflict_do_nothing()
+        )
+
+    @staticmethod
+    def remover(db: Session, resultados_ids: Iterable[int]):
+        """Tira da fila os resultados que acabaram de ganhar laudo"""
+        resultados_ids = list(resultados_ids)
+        if not resultados_ids:
+            return
+        db.query(ItemFilaLaudo).filter(
+            ItemFilaLaudo.resultadoExameId.in_(resultados_ids)
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def devolver(db: Session, resultados_ids: Iterable[int]):
+        """Recoloca na fila resultados que ficaram sem laudo (laudo excluído)"""
+        resultados_ids = list(resultados_ids)
+        if not resultados_ids:
+            return
+        db.execute(
+            text(PENDENTES_SQL.format(filtro="AND r.id = ANY(:ids)")),
+            {"ids": resultados_ids},
+        )
+
+    @staticmethod
+    def reservar(
+        db: Session,
+        medico_id: int,
+        quantidade: int = 1,
+        agora: Optional[datetime] = None,
+    ) -> List[ItemFilaLaudo]:
+        """
+        Reserva para o médico os `quantidade` itens livres mais antigos.
+        Itens travados por outra reserva em andamento são pulados.
+        """
+        agora = agora or datetime.utcnow()
+        quantidade = max(1, min(quantidade, LOTE_MAXIMO))
+        FilaLaudoService._liberar_vencidas(db, agora)
+
+        candidatos = (
+            select(ItemFilaLaudo.resultadoExameId)
+            .where(ItemFilaLaudo.reservadoPor.is_(None))
+            .order_by(ItemFilaLaudo.dataUpload, ItemFilaLaudo.resultadoExameId)
+            .limit(quantidade)
+            .with_for_update(skip_locked=True)
+            .cte("candidatos")
+        )
+        itens = db.scalars(
+            update(ItemFilaLaudo)
+            .where(ItemFilaLaudo.resultadoExameId == candidatos.c.resultadoExameId)
+            .values(reservadoPor=medico_id, reservadoEm=agora)
+            .returning(ItemFilaLaudo),
+            execution_options={"synchronize_session": False},
+        ).all()
+        db.commit()
+        return sorted(itens, key=lambda i: (i.dataUpload, i.resultadoExameId))
+
+    @staticmethod
+    def _liberar_vencidas(db: Session, agora: datetime):
+        """Devolve à fila as reservas mais antigas que RESERVA_MINUTOS"""
+        vencidas = (
+            select(ItemFilaLaudo.resultadoExameId)
+            .where(
+                ItemFilaLaudo.reservadoPor.isnot(None),
+                ItemFilaLaudo.reservadoEm < agora - timedelta(minutes=RESERVA_MINUTOS),
+            )
+            .with_for_update(skip_locked=True)
+            .cte("vencidas")
+        )
+        db.execute(
+            update(ItemFilaLaudo)
+            .where(ItemFilaLaudo.resultadoExameId == vencidas.c.resultadoExameId)
+            .values(reservadoPor=None, reservadoEm=None),
+            execution_options={"synchronize_session": False},
+        )
+
+    @staticmethod
+    def liberar(db: Session, medico_id: int, resultado_id: int) -> bool:
+        """Devolve à fila um item reservado pelo médico"""
+        liberados = (
+            db.query(ItemFilaLaudo)
+            .filter(
+                ItemFilaLaudo.resultadoExameId == resultado_id,
+                ItemFilaLaudo.reservadoPor == medico_id,
+            )
+            .update(
+                {ItemFilaLaudo.reservadoPor: None, ItemFilaLaudo.reservadoEm: None},
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return liberados > 0
+
+    @staticmethod
+    def listar_reservas(db: Session, medico_id: int) -> List[ItemFilaLaudo]:
+        """Itens reservados pelo médico e ainda sem laudo"""
+        return (
+            db.query(ItemFilaLaudo)
+            .filter(ItemFilaLaudo.reservadoPor == medico_id)
+            .order_by(ItemFilaLaudo.reservadoEm, ItemFilaLaudo.resultadoExameId)
+            .all()
+        )
+
+    @staticmethod
+    def contar_livres(db: Session) -> int:
+        return (
+            db.query(func.count())
+            .select_from(ItemFilaLaudo)
+            .filter(ItemFilaLaudo.reservadoPor.is_(None))
+            .scalar()
+        )
+
+    @staticmethod
+    def reconstruir(db: Session):
+        """Recalcula a fila a partir dos resultados sem laudo (reservas são perdidas)"""
+        db.execute(text("DELETE FROM fila_laudos"))
+        db.execute(text(PENDENTES_SQL.format(filtro="")))
+        db.commit()
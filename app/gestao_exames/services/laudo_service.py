@@ -3,9 +3,13 @@ Service para Gestão de Laudos
 Épico 4: Análise, Diagnóstico e Laudos
 """
 
+from datetime import datetime
 from typing import List, Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core import etag
+
 from app.gestao_exames.models.laudo import Laudo, StatusLaudo
 from app.gestao_exames.models.resultado_exame import ResultadoExame
 from app.gestao_exames.models.solicitacao_exame import (
@@ -13,7 +17,15 @@ from app.gestao_exames.models.solicitacao_exame import (
     StatusSolicitacao,
 )
 from app.gestao_exames.models.laudo_resultado import LaudoResultado
+from app.gestao_perfis.models.medico import Medico
+from app.gestao_perfis.models.usuario import Usuario
 from app.gestao_consultas.models.log_prontuario import LogProntuario, TipoEvento
+from app.gestao_consultas.services.timeline_service import TimelineService
+from app.gestao_exames.services.estatistica_service import EstatisticaService
+from app.gestao_exames.services.fila_laudo_service import FilaLaudoService
+from app.gestao_exames.services.tempo_resposta_service import TempoRespostaService
+from app.gestao_perfis.services.medico_paciente_service import MedicoPacienteService
+from app.notificacoes.services.eventos_service import EventosService
 
 
 class LaudoService:
@@ -57,6 +69,13 @@ class LaudoService:
                 laudoId=novo_laudo.id, resultadoExameId=exame_id
             )
             db.add(laudo_resultado)
+            TempoRespostaService.registrar_laudo(db, novo_laudo, resultado)
+            # tem_laudo mudou: nova versão do resultado para os ETags
+            resultado.atualizadoEm = datetime.utcnow()
+
+        EstatisticaService.registrar_laudo(db, medico_id, novo_laudo.dataEmissao)
+        MedicoPacienteService.registrar_laudo(db, novo_laudo)
+        FilaLaudoService.remover(db, exames_ids)
 
         db.commit()
         db.refresh(novo_laudo)
@@ -101,6 +120,7 @@ class LaudoService:
             raise ValueError("Laudo não encontrado")
 
         laudo.status = StatusLaudo.FINALIZADO
+        TimelineService.registrar_laudo(db, laudo)
         db.commit()
         db.refresh(laudo)
 
@@ -126,8 +146,43 @@ class LaudoService:
                 db.add(log)
                 db.commit()
 
+        EventosService.publicar(
+            [laudo.pacienteId, laudo.medicoId],
+            "laudo_finalizado",
+            {
+                "laudo_id": laudo.id,
+                "titulo": laudo.titulo,
+                "status": laudo.status.value,
+            },
+        )
+
         return laudo
 
+    @staticmethod
+    def marcadores_laudo() -> tuple:
+        """
+        Marcadores de ETag (app.core.etag) dos campos que as respostas de
+        laudo trazem de outras tabelas: exames e solicitações associados,
+        nome/CPF do paciente, nome do médico e CRM
+        """
+        return (
+            etag.marcador(
+                Laudo,
+                func.greatest(ResultadoExame.atualizadoEm, SolicitacaoExame.atualizadoEm),
+                LaudoResultado.laudoId == Laudo.id,
+                ResultadoExame.id == LaudoResultado.resultadoExameId,
+                SolicitacaoExame.id == ResultadoExame.solicitacaoId,
+            ),
+            etag.marcador(
+                Laudo,
+                Usuario.atualizadoEm,
+                Usuario.id.in_([Laudo.pacienteId, Laudo.medicoId]),
+            ),
+            etag.marcador(
+                Laudo, Medico.atualizadoEm, Medico.usuarioId == Laudo.medicoId
+            ),
+        )
+
     @staticmethod
     def buscar_laudo_por_id(db: Session, laudo_id: int) -> Optional[Laudo]:
         """Busca laudo por ID"""
@@ -0,0 +1,194 @@
+"""
+Service de Projeção das listagens de exames e laudos (?fields=)
+
+Clientes que só precisam de alguns campos (ex.: id,nome_exame,data_realizacao
+no app) pedem `fields` e a query passa a selecionar apenas as colunas
+correspondentes, em vez de carregar ResultadoExame/SolicitacaoExame/Paciente/
+Usuario/Medico inteiros. Os joins com usuários e médicos só entram quando um
+campo deles é pedido, e o texto do laudo (descricao) só é lido se pedido.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Query, Session, aliased
+
+from app.gestao_exames.models.laudo import Laudo
+from app.gestao_exames.models.laudo_resultado import LaudoResultado
+from app.gestao_exames.models.resultado_exame import ResultadoExame
+from app.gestao_exames.models.solicitacao_exame import SolicitacaoExame
+from app.gestao_perfis.models.medico import Medico
+from app.gestao_perfis.models.usuario import Usuario
+
+UsuarioPaciente = aliased(Usuario, name="usuario_paciente")
+UsuarioMedico = aliased(Usuario, name="usuario_medico")
+
+# Campo da resposta -> (coluna, join necessário)
+CAMPOS_EXAME = {
+    "id": (ResultadoExame.id, None),
+    "solicitacao_id": (ResultadoExame.solicitacaoId, None),
+    "codigo_solicitacao": (SolicitacaoExame.codigoSolicitacao, None),
+    "paciente_id": (SolicitacaoExame.pacienteId, None),
+    "paciente_nome": (UsuarioPaciente.nome, "paciente"),
+    "paciente_cpf": (UsuarioPaciente.cpf, "paciente"),
+    "medico_id": (SolicitacaoExame.medicoSolicitante, None),
+    "medico_nome": (UsuarioMedico.nome, "usuario_medico"),
+    "medico_crm": (Medico.crm, "medico"),
+    "nome_exame": (SolicitacaoExame.nomeExame, None),
+    "data_realizacao": (ResultadoExame.dataRealizacao, None),
+    "data_upload": (ResultadoExame.dataUpload, None),
+    "nome_laboratorio": (ResultadoExame.nomeLaboratorio, None),
+    "nome_arquivo": (ResultadoExame.nomeArquivo, None),
+    "url_arquivo": (ResultadoExame.arquivoUrl, None),
+    "observacoes": (ResultadoExame.observacoes, None),
+    "tem_laudo": (
+        exists().where(LaudoResultado.resultadoExameId == ResultadoExame.id),
+        None,
+    ),
+}
+
+CAMPOS_LAUDO = {
+    "id": (Laudo.id, None),
+    "paciente_id": (Laudo.pacienteId, None),
+    "paciente_nome": (UsuarioPaciente.nome, "paciente"),
+    "paciente_cpf": (UsuarioPaciente.cpf, "paciente"),
+    "medico_id": (Laudo.medicoId, None),
+    "medico_nome": (UsuarioMedico.nome, "usuario_medico"),
+    "medico_crm": (Medico.crm, "medico"),
+    "titulo": (Laudo.titulo, None),
+    "descricao": (Laudo.descricao, None),
+    "status": (Laudo.status, None),
+    "data_emissao": (Laudo.dataEmissao, None),
+    # Preenchido depois, numa query para a página inteira
+    "exames": (None, None),
+}
+
+# Colunas dos exames aninhados em cada laudo (ExameResponse)
+COLUNAS_EXAME_LAUDO = {
+    "id": ResultadoExame.id,
+    "solicitacao_id": ResultadoExame.solicitacaoId,
+    "codigo_solicitacao": SolicitacaoExame.codigoSolicitacao,
+    "nome_exame": SolicitacaoExame.nomeExame,
+    "data_realizacao": ResultadoExame.dataRealizacao,
+    "nome_laboratorio": ResultadoExame.nomeLaboratorio,
+    "nome_arquivo": ResultadoExame.nomeArquivo,
+    "url_arquivo": ResultadoExame.arquivoUrl,
+}
+
+
+def escolher_campos(fields: Optional[str], disponiveis: Dict) -> Optional[List[str]]:
+    """
+    Interpreta `fields` ("id,nome_exame,..."). None quando não informado
+    (resposta completa); ValueError para campos desconhecidos.
+    """
+    if not fields:
+        return None
+    campos = list(dict.fromkeys(c.strip() for c in fields.split(",") if c.strip()))
+    invalidos = [c for c in campos if c not in disponiveis]
+    if invalidos:
+        raise ValueError(
+            f"Campos inválidos: {', '.join(invalidos)}. "
+            f"Disponíveis: {', '.join(disponiveis)}"
+        )
+    return campos or None
+
+
+def _projetar(
+    query: Query, campos: List[str], mapa: Dict, chave_paciente, chave_medico, extras: Dict
+):
+    """Troca as entidades da query pelas colunas pedidas e junta só o necessário"""
+    joins = {mapa[c][1] for c in campos}
+    colunas = [mapa[c][0].label(c) for c in campos if mapa[c][0] is not None]
+    colunas += [coluna.label(nome) for nome, coluna in extras.items()]
+
+    query = query.with_entities(*colunas)
+    if "paciente" in joins:
+        query = query.outerjoin(UsuarioPaciente, UsuarioPaciente.id == chave_paciente)
+    if "usuario_medico" in joins:
+        query = query.outerjoin(UsuarioMedico, UsuarioMedico.id == chave_medico)
+    if "medico" in joins:
+        query = query.outerjoin(Medico, Medico.usuarioId == chave_medico)
+    return query
+
+
+class ProjecaoService:
+    """Service para listagens parciais de exames e laudos"""
+
+    @staticmethod
+    def exames(query: Query, campos: List[str], offset: int, limite: int) -> List[Dict]:
+        """
+        Página de exames só com `campos`. `query` é a query da listagem
+        (ResultadoExame com SolicitacaoExame já no join, filtrada e ordenada).
+        """
+        linhas = (
+            _projetar(
+                query,
+                campos,
+                CAMPOS_EXAME,
+                SolicitacaoExame.pacienteId,
+                SolicitacaoExame.medicoSolicitante,
+                {},
+            )
+            .offset(offset)
+            .limit(limite)
+            .all()
+        )
+        return [{c: getattr(linha, c) for c in campos} for linha in linhas]
+
+    @staticmethod
+    def laudos(
+        db: Session, query: Query, campos: List[str], offset: int, limite: int
+    ) -> List[Dict]:
+        """Página de laudos só com `campos` (query da listagem de Laudo, ordenada)"""
+        linhas = (
+            _projetar(
+                query,
+                campos,
+                CAMPOS_LAUDO,
+                Laudo.pacienteId,
+                Laudo.medicoId,
+                # A ordenação precisa estar no SELECT quando a query é DISTINCT
+                {"_ordem": Laudo.dataEmissao, "_laudo_id": Laudo.id},
+            )
+            .offset(offset)
+            .limit(limite)
+            .all()
+        )
+
+        exames = {}
+        if "exames" in campos:
+            exames = ProjecaoService.exames_dos_laudos(
+                db, [linha._laudo_id for linha in linhas]
+            )
+
+        return [
+            {
+                c: exames.get(linha._laudo_id, []) if c == "exames" else getattr(linha, c)
+                for c in campos
+            }
+            for linha in linhas
+        ]
+
+    @staticmethod
+    def exames_dos_laudos(db: Session, laudos_ids: List[int]) -> Dict[int, List[Dict]]:
+        """Exames de vários laudos numa única query, agrupados por laudo"""
+        if not laudos_ids:
+            return {}
+        linhas = (
+            db.query(
+                LaudoResultado.laudoId,
+                *(coluna.label(nome) for nome, coluna in COLUNAS_EXAME_LAUDO.items()),
+            )
+            .join(ResultadoExame, ResultadoExame.id == LaudoResultado.resultadoExameId)
+            .join(SolicitacaoExame, SolicitacaoExame.id == ResultadoExame.solicitacaoId)
+            .filter(LaudoResultado.laudoId.in_(laudos_ids))
+            .order_by(LaudoResultado.laudoId, ResultadoExame.id)
+            .all()
+        )
+        exames = defaultdict(list)
+        for linha in linhas:
+            exames[linha.laudoId].append(
+                {nome: getattr(linha, nome) for nome in COLUNAS_EXAME_LAUDO}
+            )
+        return exames
@@ -0,0 +1,231 @@
+"""
+Service para Tempos de Resposta dos Exames (turnaround)
+Épico 3/4: solicitação -> resultado -> laudo
+
+Percentis não podem ser somados entre dias, então o rollup guarda um
+histograma: cada tempo (em minutos) cai na faixa floor(log_BASE(min + 1)).
+Com BASE = 1.2 o erro relativo do percentil fica abaixo de ~10% e anos de
+dados cabem em poucas dezenas de faixas por dia e grupo. As funções de
+registro participam da transação de quem chama (não fazem commit).
+"""
+
+import math
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.gestao_exames.models.tempo_resposta import EtapaExame, TempoRespostaDiario
+
+BASE_FAIXA = 1.2
+
+PERCENTIS = (50, 90, 99)
+
+# Coluna do rollup usada em cada agrupamento do relatório
+AGRUPAMENTOS = {
+    "laboratorio": '"nomeLaboratorio"',
+    "exame": '"nomeExame"',
+    "medico": '"medicoId"',
+}
+
+# Faixa de um intervalo em SQL; precisa bater com faixa() abaixo
+FAIXA_SQL = (
+    "CAST(floor(ln(greatest(extract(epoch FROM ({fim}) - ({inicio})) / 60, 0) + 1)"
+    f" / ln({BASE_FAIXA})) AS integer)"
+)
+
+RECONSTRUIR_SQL = f"""
+INSERT INTO tempos_resposta_diarios
+    (etapa, dia, "nomeLaboratorio", "nomeExame", "medicoId", faixa, quantidade)
+SELECT CAST(etapa AS etapaexame), dia, laboratorio, exame, medico, faixa, count(*)
+FROM (
+    SELECT 'RESULTADO' AS etapa, CAST(r."dataUpload" AS date) AS dia,
+           r."nomeLaboratorio" AS laboratorio, s."nomeExame" AS exame,
+           s."medicoSolicitante" AS medico,
+           {FAIXA_SQL.format(inicio='s."dataSolicitacao"', fim='r."dataUpload"')} AS faixa
+    FROM resultados_exame r
+    JOIN solicitacoes_exame s ON s.id = r."solicitacaoId"
+    WHERE r."dataUpload" >= :desde
+    UNION ALL
+    SELECT 'LAUDO', CAST(l."dataEmissao" AS date), r."nomeLaboratorio",
+           s."nomeExame", l."medicoId",
+           {FAIXA_SQL.format(inicio='r."dataUpload"', fim='l."dataEmissao"')}
+    FROM laudo_resultado lr
+    JOIN laudos l ON l.id = lr."laudoId"
+    JOIN resultados_exame r ON r.id = lr."resultadoExameId"
+    JOIN solicitacoes_exame s ON s.id = r."solicitacaoId"
+    WHERE l."dataEmissao" >= :desde
+    UNION ALL
+    SELECT 'TOTAL', CAST(l."dataEmissao" AS date), r."nomeLaboratorio",
+           s."nomeExame", l."medicoId",
+           {FAIXA_SQL.format(inicio='s."dataSolicitacao"', fim='l."dataEmissao"')}
+    FROM laudo_resultado lr
+    JOIN laudos l ON l.id = lr."laudoId"
+    JOIN resultados_exame r ON r.id = lr."resultadoExameId"
+    JOIN solicitacoes_exame s ON s.id = r."solicitacaoId"
+    WHERE l."dataEmissao" >= :desde
+) tempos
+WHERE dia IS NOT NULL AND faixa IS NOT NULL
+GROUP BY etapa, dia, laboratorio, exame, medico, faixa
+"""
+
+# Percentis por grupo: soma o histograma do período, acumula por faixa
+# (window) e pega a primeira faixa cujo acumulado atinge cada percentil
+PERCENTIS_SQL = """
+WITH histograma AS (
+    SELECT {grupo} AS grupo, faixa, sum(quantidade) AS n
+    FROM tempos_resposta_diarios
+    WHERE etapa = CAST(:etapa AS etapaexame)
+      AND dia >= :inicio AND dia <= :fim
+    GROUP BY 1, 2
+    HAVING sum(quantidade) > 0
+),
+acumulado AS (
+    SELECT grupo, faixa,
+           sum(n) OVER (PARTITION BY grupo ORDER BY faixa) AS acumulado,
+           sum(n) OVER (PARTITION BY grupo) AS total
+    FROM histograma
+)
+SELECT grupo, max(total) AS total,
+       min(faixa) FILTER (WHERE acumulado >= 0.50 * total) AS p50,
+       min(faixa) FILTER (WHERE acumulado >= 0.90 * total) AS p90,
+       min(faixa) FILTER (WHERE acumulado >= 0.99 * total) AS p99
+FROM acumulado
+GROUP BY grupo
+ORDER BY total DESC, grupo
+LIMIT :limite
+"""
+
+
+def faixa(inicio: datetime, fim: datetime) -> int:
+    """Faixa do histograma para o intervalo entre duas datas"""
+    minutos = max((fim - inicio).total_seconds() / 60, 0)
+    return math.floor(math.log(minutos + 1) / math.log(BASE_FAIXA))
+
+
+def minutos_da_faixa(f: int) -> float:
+    """Valor representativo da faixa (média geométrica dos limites)"""
+    return BASE_FAIXA ** (f + 0.5) - 1
+
+
+class TempoRespostaService:
+    """Service para manter e consultar os histogramas de tempo de resposta"""
+
+    @staticmethod
+    def _registrar(
+        db: Session,
+        etapa: EtapaExame,
+        inicio: datetime,
+        fim: datetime,
+        laboratorio: str,
+        exame: str,
+        medico_id: int,
+        delta: int = 1,
+    ):
+        if inicio is None or fim is None:
+            return
+        stmt = insert(TempoRespostaDiario).values(
+            etapa=etapa,
+            dia=fim.date(),
+            nomeLaboratorio=laboratorio,
+            nomeExame=exame,
+            medicoId=medico_id,
+            faixa=faixa(inicio, fim),
+            quantidade=delta,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                "etapa",
+                "dia",
+                "nomeLaboratorio",
+                "nomeExame",
+                "medicoId",
+                "faixa",
+            ],
+            set_={
+                "quantidade": TempoRespostaDiario.quantidade + stmt.excluded.quantidade
+            },
+        )
+        db.execute(stmt)
+
+    @staticmethod
+    def registrar_resultado(db: Session, resultado, solicitacao, delta: int = 1):
+        """Tempo da solicitação até o upload do resultado"""
+        TempoRespostaService._registrar(
+            db,
+            EtapaExame.RESULTADO,
+            solicitacao.dataSolicitacao,
+            resultado.dataUpload,
+            resultado.nomeLaboratorio,
+            solicitacao.nomeExame,
+            solicitacao.medicoSolicitante,
+            delta,
+        )
+
+    @staticmethod
+    def registrar_laudo(db: Session, laudo, resultado, delta: int = 1):
+        """Tempos até a emissão do laudo de um dos resultados laudados"""
+        solicitacao = resultado.solicitacao
+        for etapa, inicio in (
+            (EtapaExame.LAUDO, resultado.dataUpload),
+            (EtapaExame.TOTAL, solicitacao.dataSolicitacao),
+        ):
+            TempoRespostaService._registrar(
+                db,
+                etapa,
+                inicio,
+                laudo.dataEmissao,
+                resultado.nomeLaboratorio,
+                solicitacao.nomeExame,
+                laudo.medicoId,
+                delta,
+            )
+
+    @staticmethod
+    def percentis(
+        db: Session,
+        etapa: EtapaExame,
+        agrupar_por: str,
+        data_inicio: date,
+        data_fim: date,
+        limite: int = 50,
+    ) -> List[Dict]:
+        """p50/p90/p99 (em minutos) por grupo no período, dos grupos com mais exames"""
+        if agrupar_por not in AGRUPAMENTOS:
+            raise ValueError(
+                f"agrupar_por deve ser um de: {', '.join(AGRUPAMENTOS)}"
+            )
+
+        linhas = db.execute(
+            text(PERCENTIS_SQL.format(grupo=AGRUPAMENTOS[agrupar_por])),
+            {
+                "etapa": etapa.name,
+                "inicio": data_inicio,
+                "fim": data_fim,
+                "limite": limite,
+            },
+        ).all()
+
+        return [
+            {
+                agrupar_por: linha.grupo,
+                "total": int(linha.total),
+                **{
+                    f"p{p}_minutos": round(minutos_da_faixa(getattr(linha, f"p{p}")), 1)
+                    for p in PERCENTIS
+                },
+            }
+            for linha in linhas
+        ]
+
+    @staticmethod
+    def reconstruir(db: Session, desde: Optional[date] = None):
+        """Recalcula os histogramas a partir das tabelas de origem"""
+        params = {"desde": desde or date(1900, 1, 1)}
+        db.execute(
+            text("DELETE FROM tempos_resposta_diarios WHERE dia >= :desde"), params
+        )
+        db.execute(text(RECONSTRUIR_SQL), params)
+        db.commit()
@@ -8,6 +8,7 @@ from .especialidade import Especialidade
 from .medico import Medico
 from .medico_especialidade import MedicoEspecialidade
 from .agenda import Agenda, DiaSemana
+from .medico_paciente import MedicoPaciente
 
 __all__ = [
     "Usuario",
@@ -19,4 +20,5 @@ __all__ = [
     "MedicoEspecialidade",
     "Agenda",
     "DiaSemana",
+    "MedicoPaciente",
 ]
@@ -23,7 +23,7 @@ class Agenda(Base):
     __tablename__ = "agendas"
 
     id = Column(Integer, primary_key=True)
-    medicoId = Column(Integer, ForeignKey("medicos.usuarioId"))
+    medicoId = Column(Integer, ForeignKey("medicos.usuarioId"), index=True)
     diaSemana = Column(SQLEnum(DiaSemana))
     hora = Column(Time)
 
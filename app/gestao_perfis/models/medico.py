@@ -1,7 +1,9 @@
 """
 Modelo de Médico
 """
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String, Float, ForeignKey
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -15,6 +17,8 @@ class Medico(Base):
     biografia = Column(String)
     duracaoConsulta = Column(Float)
     linkSalaVirtual = Column(String)
+    # O CRM aparece nas listagens de exames e laudos (app.core.etag)
+    atualizadoEm = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relacionamentos
     usuario = relationship("Usuario", back_populates="medico")
@@ -11,7 +11,7 @@ class MedicoEspecialidade(Base):
     __tablename__ = "medico_especialidades"
 
     medicoId = Column(Integer, ForeignKey("medicos.usuarioId"), primary_key=True)
-    especialidadeId = Column(Integer, ForeignKey("especialidades.id"), primary_key=True)
+    especialidadeId = Column(Integer, ForeignKey("especialidades.id"), primary_key=True, index=True)
 
     # Relacionamentos
     medico = relationship("Medico", back_populates="especialidades")
@@ -0,0 +1,35 @@
+"""
+Modelo de Relacionamento Médico-Paciente
+"""
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+
+from app.core.database import Base
+
+
+class MedicoPaciente(Base):
+    """
+    Pacientes atendidos por cada médico, mantido incrementalmente a cada
+    solicitação, consulta e laudo. Serve a listagem "meus pacientes"
+    ordenada por interação mais recente sem varrer as tabelas de origem.
+    """
+
+    __tablename__ = "medico_paciente"
+    __table_args__ = (
+        Index(
+            "ix_medico_paciente_recencia", "medicoId", "ultimaInteracao", "pacienteId"
+        ),
+    )
+
+    medicoId = Column(Integer, ForeignKey("medicos.usuarioId"), primary_key=True)
+    pacienteId = Column(
+        Integer, ForeignKey("pacientes.usuarioId"), primary_key=True, index=True
+    )
+    primeiraInteracao = Column(DateTime, nullable=False)
+    ultimaInteracao = Column(DateTime, nullable=False)
+    solicitacoes = Column(Integer, nullable=False, default=0, server_default="0")
+    consultas = Column(Integer, nullable=False, default=0, server_default="0")
+    laudos = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<MedicoPaciente(medico={self.medicoId}, paciente={self.pacienteId})>"
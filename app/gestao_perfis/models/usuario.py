@@ -2,9 +2,11 @@
 Modelo de Usuario
 """
 
+from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, Integer, String, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, DateTime, Integer, String, Enum as SQLEnum, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from hashlib import md5
 
 from app.core.database import Base
@@ -22,6 +24,12 @@ class Usuario(Base):
     """Modelo de banco de dados para Usuario"""
 
     __tablename__ = "usuarios"
+    __table_args__ = (
+        Index("ix_usuarios_busca", "buscaVetor", postgresql_using="gin"),
+        # Autocomplete por prefixo: a collation "C" permite que o mesmo
+        # btree atenda LIKE 'prefixo%' e a ordenação por nome
+        Index("ix_usuarios_nome_normalizado", "nomeNormalizado"),
+    )
 
     id = Column(Integer, primary_key=True)
     nome = Column(String, nullable=False)
@@ -30,6 +38,12 @@ class Usuario(Base):
     cpf = Column(String, unique=True)
     hashPassword = Column(String, nullable=False)
     tipo = Column(SQLEnum(TipoUsuario), nullable=False)
+    # Nome e CPF aparecem nas listagens de exames e laudos (app.core.etag)
+    atualizadoEm = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Mantidos por trigger (ver BuscaService.instalar)
+    buscaVetor = deferred(Column(TSVECTOR))
+    nomeNormalizado = deferred(Column(String(collation="C")))
+    telefoneDigitos = deferred(Column(String, index=True))
 
     # Relacionamentos
     paciente = relationship("Paciente", back_populates="usuario", uselist=False)
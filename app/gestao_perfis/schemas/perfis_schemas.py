@@ -5,6 +5,7 @@ Schemas Pydantic para Gestão de Perfis
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List, Any, Generic, TypeVar
 from enum import Enum
+from datetime import datetime
 
 
 # ========== Enums para validação ==========
@@ -229,6 +230,26 @@ class MedicoResponse(BaseModel):
         from_attributes = True
 
 
+class PacienteResponse(BaseModel):
+    id: int
+    nome: Optional[str]
+    email: Optional[str]
+    cpf: Optional[str]
+    telefone: Optional[str]
+    data_nascimento: Optional[str]
+    endereco: Optional[str]
+
+
+class PacienteMedicoResponse(PacienteResponse):
+    """Paciente na listagem do médico, com o resumo do relacionamento"""
+
+    primeira_interacao: datetime
+    ultima_interacao: datetime
+    total_solicitacoes: int
+    total_consultas: int
+    total_laudos: int
+
+
 # ========== Schemas de Paginação ==========
 
 T = TypeVar("T")
@@ -265,3 +286,20 @@ class PaginatedResponse(BaseModel, Generic[T]):
             has_next=page < pages,
             has_prev=page > 1,
         )
+
+    @classmethod
+    def construir(cls, items: List[T], total: int, page: int, limit: int):
+        """
+        Como create, mas sem validar os itens (model_construct). Para itens
+        já tipados montados a partir do banco e devolvidos com RespostaORJSON.
+        """
+        pages = (total + limit - 1) // limit
+        return cls.model_construct(
+            items=items,
+            total=total,
+            page=page,
+            limit=limit,
+            pages=pages,
+            has_next=page < pages,
+            has_prev=page > 1,
+        )
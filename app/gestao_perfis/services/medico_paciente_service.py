@@ -0,0 +1,181 @@
+"""
+Service para o Relacionamento Médico-Paciente
+Mantém medico_paciente, usada por /pacientes ("meus pacientes")
+
+As funções de registro participam da transação de quem chama (não fazem
+commit), como no EstatisticaService.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.gestao_perfis.models.medico_paciente import MedicoPaciente
+from app.gestao_perfis.models.paciente import Paciente
+
+# Recria os relacionamentos a partir das solicitações, consultas e laudos.
+# Consultas canceladas não contam; consultas futuras contam como interação
+# de agora (momento do agendamento), não da data marcada
+RECONSTRUIR_SQL = """
+INSERT INTO medico_paciente ("medicoId", "pacienteId", "primeiraInteracao",
+    "ultimaInteracao", solicitacoes, consultas, laudos)
+SELECT medico, paciente, min(quando), max(quando), sum(sol), sum(con), sum(lau)
+FROM (
+    SELECT "medicoSolicitante" AS medico, "pacienteId" AS paciente,
+           "dataSolicitacao" AS quando, 1 AS sol, 0 AS con, 0 AS lau
+    FROM solicitacoes_exame
+    UNION ALL
+    SELECT "medicoId", "pacienteId",
+           LEAST("dataHora", CAST(now() AT TIME ZONE 'UTC' AS timestamp)), 0, 1, 0
+    FROM consultas
+    WHERE status <> 'CANCELADA'
+    UNION ALL
+    SELECT "medicoId", "pacienteId", "dataEmissao", 0, 0, 1
+    FROM laudos
+) interacoes
+WHERE quando IS NOT NULL
+  AND (CAST(:medico_id AS integer) IS NULL OR medico = :medico_id)
+GROUP BY medico, paciente
+"""
+
+
+class MedicoPacienteService:
+    """Service para manter e consultar os pacientes de cada médico"""
+
+    @staticmethod
+    def _registrar(
+        db: Session,
+        medico_id: int,
+        paciente_id: int,
+        quando: Optional[datetime],
+        solicitacoes: int = 0,
+        consultas: int = 0,
+        laudos: int = 0,
+    ):
+        """Cria o relacionamento ou soma a interação (upsert)"""
+        quando = quando or datetime.utcnow()
+        stmt = insert(MedicoPaciente).values(
+            medicoId=medico_id,
+            pacienteId=paciente_id,
+            primeiraInteracao=quando,
+            ultimaInteracao=quando,
+            solicitacoes=solicitacoes,
+            consultas=consultas,
+            laudos=laudos,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["medicoId", "pacienteId"],
+            set_={
+                "primeiraInteracao": func.least(
+                    MedicoPaciente.primeiraInteracao, stmt.excluded.primeiraInteracao
+                ),
+                "ultimaInteracao": func.greatest(
+                    MedicoPaciente.ultimaInteracao, stmt.excluded.ultimaInteracao
+                ),
+                "solicitacoes": MedicoPaciente.solicitacoes
+                + stmt.excluded.solicitacoes,
+                "consultas": MedicoPaciente.consultas + stmt.excluded.consultas,
+                "laudos": MedicoPaciente.laudos + stmt.excluded.laudos,
+            },
+        )
+        db.execute(stmt)
+
+    @staticmethod
+    def registrar_solicitacao(db: Session, solicitacao):
+        MedicoPacienteService._registrar(
+            db,
+            solicitacao.medicoSolicitante,
+            solicitacao.pacienteId,
+            solicitacao.dataSolicitacao,
+            solicitacoes=1,
+        )
+
+    @staticmethod
+    def registrar_consulta(db: Session, consulta):
+        # A interação é o agendamento (agora), não a data futura da consulta
+        MedicoPacienteService._registrar(
+            db, consulta.medicoId, consulta.pacienteId, None, consultas=1
+        )
+
+    @staticmethod
+    def registrar_laudo(db: Session, laudo):
+        MedicoPacienteService._registrar(
+            db, laudo.medicoId, laudo.pacienteId, laudo.dataEmissao, laudos=1
+        )
+
+    @staticmethod
+    def remover_interacao(
+        db: Session,
+        medico_id: int,
+        paciente_id: int,
+        solicitacoes: int = 0,
+        consultas: int = 0,
+        laudos: int = 0,
+    ):
+        """
+        Desconta uma solicitação ou laudo excluído ou uma consulta cancelada.
+        O relacionamento some quando não resta nenhuma interação; as datas
+        só são corrigidas pelo reconstruir.
+        """
+        filtro = (
+            MedicoPaciente.medicoId == medico_id,
+            MedicoPaciente.pacienteId == paciente_id,
+        )
+        db.query(MedicoPaciente).filter(*filtro).update(
+            {
+                MedicoPaciente.solicitacoes: func.greatest(
+                    MedicoPaciente.solicitacoes - solicitacoes, 0
+                ),
+                MedicoPaciente.consultas: func.greatest(
+                    MedicoPaciente.consultas - consultas, 0
+                ),
+                MedicoPaciente.laudos: func.greatest(
+                    MedicoPaciente.laudos - laudos, 0
+                ),
+            },
+            synchronize_session=False,
+        )
+        db.query(MedicoPaciente).filter(
+            *filtro,
+            MedicoPaciente.solicitacoes == 0,
+            MedicoPaciente.consultas == 0,
+            MedicoPaciente.laudos == 0,
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def query_pacientes(db: Session, medico_id: int):
+        """(Paciente, MedicoPaciente) do médico, da interação mais recente à mais antiga"""
+        return (
+            db.query(Paciente, MedicoPaciente)
+            .join(MedicoPaciente, MedicoPaciente.pacienteId == Paciente.usuarioId)
+            .filter(MedicoPaciente.medicoId == medico_id)
+            .order_by(
+                MedicoPaciente.ultimaInteracao.desc(), MedicoPaciente.pacienteId.desc()
+            )
+        )
+
+    @staticmethod
+    def listar_pacientes(db: Session, medico_id: int) -> List[Paciente]:
+        return [
+            paciente
+            for paciente, _ in MedicoPacienteService.query_pacientes(db, medico_id)
+        ]
+
+    @staticmethod
+    def reconstruir(db: Session, medico_id: Optional[int] = None):
+        """Recalcula os relacionamentos (de um médico ou de todos) a partir das origens"""
+        params = {"medico_id": medico_id}
+        db.execute(
+            text(
+                """
+                DELETE FROM medico_paciente
+                WHERE CAST(:medico_id AS integer) IS NULL OR "medicoId" = :medico_id
+                """
+            ),
+            params,
+        )
+        db.execute(text(RECONSTRUIR_SQL), params)
+        db.commit()
@@ -5,6 +5,7 @@ Feature 2 - Épico 1: Gestão de Perfis
 from typing import List, Optional
 from sqlalchemy.orm import Session
 
+from app.core.cache import em_cache, invalidar_apos_commit
 from app.gestao_perfis.models.medico import Medico
 from app.gestao_perfis.models.especialidade import Especialidade
 from app.gestao_perfis.models.medico_especialidade import MedicoEspecialidade
@@ -66,7 +67,11 @@ class MedicoService:
         if biografia is not None:
             medico.biografia = biografia
         if duracao_consulta is not None:
+            from app.gestao_consultas.services.cache_disponibilidade import (
+                invalidar_medico_apos_commit,
+            )
             medico.duracaoConsulta = duracao_consulta
+            invalidar_medico_apos_commit(db, usuario_id)
         if link_sala_virtual is not None:
             medico.linkSalaVirtual = link_sala_virtual
         
@@ -101,6 +106,7 @@ class MedicoService:
         )
         
         db.add(nova_associacao)
+        invalidar_apos_commit(db, "medicos_por_especialidade", especialidade_id)
         db.commit()
         db.refresh(nova_associacao)
         
@@ -122,6 +128,7 @@ class MedicoService:
             return False
         
         db.delete(associacao)
+        invalidar_apos_commit(db, "medicos_por_especialidade", especialidade_id)
         db.commit()
         
         return True
@@ -140,17 +147,26 @@ class MedicoService:
         História 2.1: Buscar médicos por especialidade
         Permite pacientes encontrarem médicos pela especialidade
         """
-        medicos_especialidade = db.query(MedicoEspecialidade).filter(
+        return db.query(Medico).join(
+            MedicoEspecialidade, MedicoEspecialidade.medicoId == Medico.usuarioId
+        ).filter(
+            MedicoEspecialidade.especialidadeId == especialidade_id
+        ).all()
+    
+    @staticmethod
+    @em_cache("medicos_por_especialidade", ttl=300)
+    def resumo_medicos_por_especialidade(
+        db: Session,
+        especialidade_id: int
+    ) -> List[dict]:
+        """Versão em cache da busca por especialidade (apenas id e CRM)"""
+        rows = db.query(Medico.usuarioId, Medico.crm).join(
+            MedicoEspecialidade, MedicoEspecialidade.medicoId == Medico.usuarioId
+        ).filter(
             MedicoEspecialidade.especialidadeId == especialidade_id
         ).all()
         
-        medicos = []
-        for me in medicos_especialidade:
-            medico = db.query(Medico).filter(Medico.usuarioId == me.medicoId).first()
-            if medico:
-                medicos.append(medico)
-        
-        return medicos
+        return [{"id": usuario_id, "crm": crm} for usuario_id, crm in rows]
     
     @staticmethod
     def listar_todos_medicos(db: Session) -> List[Medico]:
@@ -173,6 +189,7 @@ class EspecialidadeService:
         
         nova_especialidade = Especialidade(nome=nome)
         db.add(nova_especialidade)
+        invalidar_apos_commit(db, "especialidades")
         db.commit()
         db.refresh(nova_especialidade)
         
@@ -183,6 +200,21 @@ class EspecialidadeService:
         """Lista todas as especialidades"""
         return db.query(Especialidade).all()
     
+    @staticmethod
+    @em_cache("especialidades", ttl=600)
+    def listar_especialidades_paginado(
+        db: Session,
+        page: int,
+        limit: int
+    ) -> tuple[List[dict], int]:
+        """Lista especialidades paginadas (id e nome), com cache"""
+        total = db.query(Especialidade).count()
+        items = db.query(Especialidade.id, Especialidade.nome).order_by(
+            Especialidade.id
+        ).offset((page - 1) * limit).limit(limit).all()
+        
+        return [{"id": e_id, "nome": nome} for e_id, nome in items], total
+    
     @staticmethod
     def buscar_especialidade_por_id(db: Session, especialidade_id: int) -> Optional[Especialidade]:
         """Busca especialidade por ID"""
@@ -2,14 +2,35 @@
 Service para Sumário de Saúde do Paciente
 Feature 3 - Épico 1: Gestão de Perfis
 """
+import re
 from typing import Optional, List
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from app.gestao_perfis.models.paciente import Paciente
 from app.gestao_perfis.models.sumario_saude import SumarioSaude
-from app.gestao_perfis.models.usuario import TipoUsuario
+from app.gestao_perfis.models.usuario import TipoUsuario, Usuario
 from app.gestao_perfis.services.auth_service import AuthService
 
+# Autocomplete: itens por resposta e tamanho mínimo do prefixo
+LIMITE_AUTOCOMPLETE = 10
+LIMITE_AUTOCOMPLETE_MAXIMO = 20
+PREFIXO_MINIMO = 2
+
+# Entrada numérica com ao menos tantos dígitos é tratada como telefone
+DIGITOS_TELEFONE = 8
+
+
+def mascarar_cpf(cpf: Optional[str]) -> Optional[str]:
+    """Mostra só os dígitos centrais do CPF: ***.456.789-**"""
+    if not cpf or len(cpf) != 11:
+        return None
+    return f"***.{cpf[3:6]}.{cpf[6:9]}-**"
+
+
+def _escapar_like(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 
 class PacienteService:
     """Service para gerenciar perfil de pacientes"""
@@ -125,23 +146,53 @@ class PacienteService:
     
     @staticmethod
     def listar_pacientes_medico(db: Session, medico_id: int) -> List[Paciente]:
-        """Lista pacientes que têm relação com o médico através de solicitações de exame"""
-        from app.gestao_exames.models.solicitacao_exame import SolicitacaoExame
-        from sqlalchemy import distinct
-        
-        # Busca pacientes distintos que têm solicitações feitas pelo médico
-        pacientes_ids = db.query(distinct(SolicitacaoExame.pacienteId)).filter(
-            SolicitacaoExame.medicoSolicitante == medico_id
-        ).all()
-        
-        # Extrai os IDs da tupla
-        ids = [pid[0] for pid in pacientes_ids]
-        
-        if not ids:
-            return []
-        
-        # Busca os pacientes completos
-        return db.query(Paciente).filter(Paciente.usuarioId.in_(ids)).all()
+        """Lista pacientes que têm relação com o médico (mais recentes primeiro)"""
+        from app.gestao_perfis.services.medico_paciente_service import (
+            MedicoPacienteService,
+        )
+
+        return MedicoPacienteService.listar_pacientes(db, medico_id)
+
+    @staticmethod
+    def autocompletar(
+        db: Session, termo: str, limite: int = LIMITE_AUTOCOMPLETE
+    ) -> List[dict]:
+        """
+        Sugestões de pacientes enquanto o médico digita.
+        Texto: prefixo do nome normalizado (sem acentos), pelo índice em
+        nomeNormalizado. Números: busca exata por CPF ou telefone.
+        """
+        from app.busca.services.busca_service import normalizar_nome
+
+        limite = max(1, min(limite, LIMITE_AUTOCOMPLETE_MAXIMO))
+        termo = (termo or "").strip()
+
+        query = db.query(Usuario.id, Usuario.nome, Usuario.cpf).join(
+            Paciente, Paciente.usuarioId == Usuario.id
+        )
+
+        if not re.search(r"[^\d\s().+-]", termo):
+            digitos = re.sub(r"\D", "", termo)
+            if len(digitos) == 11:
+                query = query.filter(
+                    or_(Usuario.cpf == digitos, Usuario.telefoneDigitos == digitos)
+                )
+            elif len(digitos) >= DIGITOS_TELEFONE:
+                query = query.filter(Usuario.telefoneDigitos == digitos)
+            else:
+                return []
+        else:
+            prefixo = normalizar_nome(termo)
+            if len(prefixo) < PREFIXO_MINIMO:
+                return []
+            query = query.filter(
+                Usuario.nomeNormalizado.like(_escapar_like(prefixo) + "%")
+            ).order_by(Usuario.nomeNormalizado, Usuario.id)
+
+        return [
+            {"id": r.id, "nome": r.nome, "cpf": mascarar_cpf(r.cpf)}
+            for r in query.limit(limite)
+        ]
 
 
 class SumarioSaudeService:
@@ -0,0 +1,6 @@
+"""
+Models - Idempotência
+"""
+from .chave_idempotencia import ChaveIdempotencia
+
+__all__ = ["ChaveIdempotencia"]
@@ -0,0 +1,31 @@
+"""
+Modelo de Chave de Idempotência
+Resposta guardada de um POST enviado com o cabeçalho Idempotency-Key
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.database import Base
+
+
+class ChaveIdempotencia(Base):
+    __tablename__ = "chaves_idempotencia"
+
+    # A mesma chave pode ser usada por usuários e rotas diferentes
+    usuarioId = Column(
+        Integer, ForeignKey("usuarios.id", ondelete="CASCADE"), primary_key=True
+    )
+    rota = Column(String, primary_key=True)
+    chave = Column(String(255), primary_key=True)
+    # sha256 do corpo da requisição, para recusar a chave com outro conteúdo
+    hashRequisicao = Column(String(64), nullable=False)
+    codigoStatus = Column(Integer)
+    resposta = Column(JSONB)
+    criadoEm = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expiraEm = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ChaveIdempotencia(rota={self.rota}, chave={self.chave})>"
@@ -0,0 +1,227 @@
+"""
+Service de Idempotência (cabeçalho Idempotency-Key)
+
+Integrações de laboratório e o app repetem o POST quando dá timeout. Com a
+chave, a primeira execução grava a resposta em chaves_idempotencia e as
+repetições recebem essa resposta sem refazer upload, e-mail ou inserts.
+
+A chave é reservada com INSERT numa sessão própria, cuja transação só é
+confirmada junto com a resposta. Enquanto isso, um duplicado concorrente
+fica bloqueado no próprio INSERT (conflito com linha não confirmada) e, ao
+ser liberado, lê a resposta gravada. Se a primeira execução falhar, a
+reserva é desfeita e o duplicado executa no lugar dela. A espera é limitada
+por ESPERA_SEGUNDOS (depois disso, 409).
+
+Só respostas de sucesso são guardadas: erros podem ser transitórios e a
+repetição deve tentar de novo.
+"""
+
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.idempotencia.models.chave_idempotencia import ChaveIdempotencia
+
+# Tempo que uma resposta fica disponível para repetições
+TTL_HORAS = 24
+
+# Espera máxima de um duplicado pela execução em andamento
+ESPERA_SEGUNDOS = 30
+
+TAMANHO_MAXIMO_CHAVE = 255
+
+# SQLSTATE de lock_timeout esgotado
+LOCK_NAO_DISPONIVEL = "55P03"
+
+
+def hash_requisicao(*partes) -> str:
+    """sha256 das partes da requisição (str ou bytes)"""
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(parte if isinstance(parte, bytes) else str(parte).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def hash_arquivo(arquivo) -> str:
+    """sha256 de um arquivo aberto (volta ao início para quem for ler depois)"""
+    h = hashlib.sha256()
+    for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+        h.update(bloco)
+    arquivo.seek(0)
+    return h.hexdigest()
+
+
+class Execucao:
+    """
+    Execução de um POST idempotente. Se `resposta` vier preenchida, é uma
+    repetição e a rota deve apenas devolvê-la; senão a rota executa e
+    devolve `concluir(conteudo)`.
+    """
+
+    def __init__(self, sessao: Optional[Session] = None, registro=None, resposta=None):
+        self.sessao = sessao
+        self.registro = registro
+        self.resposta = resposta
+        self.concluida = False
+
+    def concluir(self, conteudo: Any, codigo_status: int = 200) -> Any:
+        """Grava a resposta da primeira execução (confirmada ao sair do bloco)"""
+        if self.sessao is not None:
+            self.registro.codigoStatus = codigo_status
+            self.registro.resposta = conteudo
+            self.concluida = True
+        return conteudo
+
+
+class _Bloco:
+    """async with de IdempotenciaService.executar"""
+
+    def __init__(self, chave, usuario_id, rota, hash_req):
+        self.chave = chave
+        self.usuario_id = usuario_id
+        self.rota = rota
+        self.hash_req = hash_req
+        self.execucao = Execucao()
+
+    async def __aenter__(self) -> Execucao:
+        if self.chave:
+            self.execucao = await asyncio.to_thread(
+                IdempotenciaService.reservar,
+                self.usuario_id,
+                self.rota,
+                self.chave,
+                self.hash_req,
+            )
+        return self.execucao
+
+    async def __aexit__(self, tipo_erro, erro, tb):
+        sessao = self.execucao.sessao
+        if sessao is None:
+            return False
+        try:
+            if erro is None and self.execucao.concluida:
+                await asyncio.to_thread(sessao.commit)
+            else:
+                # Desfaz a reserva: repetições (e duplicados à espera) executam
+                await asyncio.to_thread(sessao.rollback)
+        finally:
+            sessao.close()
+        return False
+
+
+class IdempotenciaService:
+    """Service para reservar chaves e guardar/repetir respostas"""
+
+    @staticmethod
+    def executar(
+        chave: Optional[str], usuario_id: int, rota: str, hash_req: str
+    ) -> _Bloco:
+        """
+        Uso na rota:
+
+            async with IdempotenciaService.executar(chave, usuario.id, "POST /x", h) as ex:
+                if ex.resposta is not None:
+                    return ex.resposta
+                ...
+                return ex.concluir({...})
+
+        Sem chave, o bloco não faz nada e a rota executa normalmente.
+        """
+        if chave is not None and not 0 < len(chave) <= TAMANHO_MAXIMO_CHAVE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Idempotency-Key deve ter de 1 a {TAMANHO_MAXIMO_CHAVE} caracteres",
+            )
+        return _Bloco(chave, usuario_id, rota, hash_req)
+
+    @staticmethod
+    def reservar(usuario_id: int, rota: str, chave: str, hash_req: str) -> Execucao:
+        """
+        Reserva a chave (transação fica aberta até a resposta ser gravada)
+        ou devolve a resposta já gravada. Bloqueante: chamar fora do loop.
+        """
+        sessao = SessionLocal()
+        try:
+            sessao.execute(text(f"SET LOCAL lock_timeout = '{ESPERA_SEGUNDOS}s'"))
+            agora = datetime.utcnow()
+            stmt = insert(ChaveIdempotencia).values(
+                usuarioId=usuario_id,
+                rota=rota,
+                chave=chave,
+                hashRequisicao=hash_req,
+                criadoEm=agora,
+                expiraEm=agora + timedelta(hours=TTL_HORAS),
+            )
+            # Chave expirada ainda não limpa é reaproveitada
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["usuarioId", "rota", "chave"],
+                set_={
+                    "hashRequisicao": stmt.excluded.hashRequisicao,
+                    "codigoStatus": None,
+                    "resposta": None,
+                    "criadoEm": stmt.excluded.criadoEm,
+                    "expiraEm": stmt.excluded.expiraEm,
+                },
+                where=ChaveIdempotencia.expiraEm < agora,
+            )
+            reservada = sessao.execute(
+                stmt.returning(ChaveIdempotencia.chave)
+            ).first()
+
+            if reservada:
+                registro = sessao.get(ChaveIdempotencia, (usuario_id, rota, chave))
+                return Execucao(sessao=sessao, registro=registro)
+
+            # Já executada (a espera, se havia, terminou no INSERT acima)
+            registro = sessao.get(ChaveIdempotencia, (usuario_id, rota, chave))
+            gravado = (registro.hashRequisicao, registro.codigoStatus, registro.resposta)
+            sessao.rollback()
+            sessao.close()
+        except OperationalError as e:
+            sessao.rollback()
+            sessao.close()
+            if getattr(e.orig, "pgcode", None) == LOCK_NAO_DISPONIVEL:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Requisição com esta Idempotency-Key ainda em andamento",
+                )
+            raise
+        except Exception:
+            sessao.rollback()
+            sessao.close()
+            raise
+
+        hash_gravado, codigo_status, conteudo = gravado
+        if hash_gravado != hash_req:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key já usada com outra requisição",
+            )
+        return Execucao(
+            resposta=JSONResponse(
+                conteudo,
+                status_code=codigo_status,
+                headers={"Idempotency-Replayed": "true"},
+            )
+        )
+
+    @staticmethod
+    def limpar_expiradas(db: Session) -> int:
+        """Apaga as respostas vencidas; retorna quantas"""
+        apagadas = (
+            db.query(ChaveIdempotencia)
+            .filter(ChaveIdempotencia.expiraEm < datetime.utcnow())
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return apagadas
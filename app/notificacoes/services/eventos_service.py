@@ -0,0 +1,87 @@
+"""
+Service para Eventos em Tempo Real
+Entrega eventos de exames e laudos aos usuários conectados via SSE/WebSocket
+"""
+
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional, Set
+
+from app.core.barramento import barramento
+
+logger = logging.getLogger(__name__)
+
+CANAL_EVENTOS = "eventos_usuario"
+
+# Eventos acumulados por conexão antes de descartar os mais antigos
+TAMANHO_FILA = 100
+
+
+class HubEventos:
+    """
+    Registro das conexões abertas neste worker.
+    Cada conexão é só uma fila asyncio em memória: não há assinatura no
+    broker nem sessão de banco por cliente, apenas a assinatura única do
+    worker no barramento.
+    """
+
+    def __init__(self):
+        self._conexoes: Dict[int, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def vincular_loop(self, loop: asyncio.AbstractEventLoop):
+        """Define o event loop que atende as conexões deste worker"""
+        self._loop = loop
+
+    @property
+    def total_conexoes(self) -> int:
+        return sum(len(filas) for filas in self._conexoes.values())
+
+    def conectar(self, usuario_id: int) -> asyncio.Queue:
+        fila: asyncio.Queue = asyncio.Queue(maxsize=TAMANHO_FILA)
+        self._conexoes.setdefault(usuario_id, set()).add(fila)
+        return fila
+
+    def desconectar(self, usuario_id: int, fila: asyncio.Queue):
+        filas = self._conexoes.get(usuario_id)
+        if filas is None:
+            return
+        filas.discard(fila)
+        if not filas:
+            del self._conexoes[usuario_id]
+
+    def receber(self, dados: dict):
+        """Callback do barramento; pode ser chamado de qualquer thread"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._entregar, dados)
+
+    def _entregar(self, dados: dict):
+        evento = {"tipo": dados.get("tipo"), "dados": dados.get("dados", {})}
+        for usuario_id in dados.get("usuarios", []):
+            for fila in self._conexoes.get(usuario_id, ()):
+                if fila.full():
+                    # Cliente lento: descarta o evento mais antigo
+                    fila.get_nowait()
+                fila.put_nowait(evento)
+
+
+hub = HubEventos()
+barramento.assinar(CANAL_EVENTOS, hub.receber)
+
+
+class EventosService:
+    """Service para publicar eventos destinados a usuários específicos"""
+
+    @staticmethod
+    def publicar(usuarios_ids: Iterable[int], tipo: str, dados: dict):
+        """
+        Publica um evento para os usuários em todos os workers.
+        Deve ser chamado após o commit da escrita que originou o evento.
+        """
+        usuarios = sorted({u for u in usuarios_ids if u is not None})
+        if not usuarios:
+            return
+        barramento.publicar(
+            CANAL_EVENTOS, {"usuarios": usuarios, "tipo": tipo, "dados": dados}
+        )
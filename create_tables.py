@@ -13,7 +13,7 @@ load_dotenv()
 sys.path.insert(0, str(Path(__file__).parent))
 
 # Importa o Base e engine
-from app.core.database import Base, engine
+from app.core.database import Base, SessionLocal, engine
 
 # Importa todos os modelos para que sejam registrados no Base.metadata
 from app.gestao_perfis.models import (
@@ -23,14 +23,40 @@ from app.gestao_perfis.models import (
     Especialidade, 
     MedicoEspecialidade, 
     Agenda, 
-    SumarioSaude
+    SumarioSaude,
+    MedicoPaciente,
 )
 
 # Importar modelos de gestão de consultas
-from app.gestao_consultas.models import Consulta, LogProntuario
+from app.gestao_consultas.models import (
+    Consulta,
+    LogProntuario,
+    EventoTimeline,
+    ConsultaDiaria,
+    MarcaRollup,
+)
 
 # Importar modelos de gestão de exames
-from app.gestao_exames.models import SolicitacaoExame, ResultadoExame, Laudo, LaudoResultado
+from app.gestao_exames.models import (
+    SolicitacaoExame,
+    ResultadoExame,
+    Laudo,
+    LaudoResultado,
+    EstatisticaDiariaMedico,
+    PacienteDiarioMedico,
+    ItemFilaLaudo,
+    TempoRespostaDiario,
+)
+
+# Respostas guardadas de Idempotency-Key
+from app.idempotencia.models import ChaveIdempotencia
+
+from sqlalchemy import text
+
+from app.gestao_consultas.services.consulta_service import ConsultaService
+from app.gestao_consultas.services.particionamento_service import ParticionamentoService
+from app.busca.services.busca_service import BuscaService
+from app.core import etag
 
 
 def main():
@@ -42,6 +68,33 @@ def main():
         Base.metadata.create_all(bind=engine)
         print("\n✅ Tabelas criadas com sucesso!")
         
+        db = SessionLocal()
+        try:
+            # Índices de consultas, inclusive o único parcial de consultas ativas
+            ConsultaService.instalar(db)
+            print("✅ Índices de consultas verificados")
+
+            # Partições mensais de logs_prontuario (migra a tabela antiga, se houver)
+            ParticionamentoService.instalar(db)
+            print("✅ Partições de logs_prontuario verificadas")
+
+            # Busca textual: configuração pt_unaccent, triggers e carga inicial
+            BuscaService.instalar(db)
+            print("✅ Índices de busca textual instalados")
+
+            # Coluna "atualizadoEm" (ETags) em tabelas criadas antes dela
+            etag.instalar(
+                db,
+                ["solicitacoes_exame", "resultados_exame", "laudos", "usuarios", "medicos"],
+            )
+            print("✅ Colunas de versão para ETags verificadas")
+
+            # Agenda materializada substituída pelo índice único parcial de consultas
+            db.execute(text("DROP TABLE IF EXISTS slots_agenda"))
+            db.commit()
+        finally:
+            db.close()
+        
         # Lista as tabelas criadas
         print("\n📋 Tabelas criadas:")
         for table in Base.metadata.sorted_tables:
@@ -25,21 +25,37 @@ load_dotenv()
 
 # ========== Imports Padrão ==========
 import uvicorn
+import asyncio
+import json
+import logging
 import os
 import shutil
-from datetime import datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
 from typing import Optional
 
 # ========== Imports FastAPI/SQLAlchemy ==========
-from fastapi import FastAPI, Depends, File, Form, HTTPException, UploadFile
+from fastapi import (
+    FastAPI,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, or_
+from sqlalchemy import func, extract
 from fastapi.middleware.cors import CORSMiddleware
 
 # ========== Imports Core ==========
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.core.auth_dependencies import (
     get_current_user,
     get_current_active_user,
@@ -47,7 +63,13 @@ from app.core.auth_dependencies import (
     require_paciente,
     require_admin,
     require_funcionario,
+    autenticar_token,
 )
+from app.core.barramento import barramento
+from app.core.cache import metricas as metricas_cache
+from app.core.respostas import RespostaORJSON
+from app.core.compressao import CompressaoMiddleware
+from app.core import etag
 from app.rabbit.broker import rabbit_router
 
 # ========== Imports Schemas ==========
@@ -66,9 +88,12 @@ from app.gestao_perfis.schemas.perfis_schemas import (
     AdicionarEspecialidadeRequest,
     PaginationParams,
     PaginatedResponse,
+    PacienteResponse,
+    PacienteMedicoResponse,
 )
 from app.gestao_consultas.schemas.consultas_schemas import (
     DefinirHorarioAtendimentoRequest,
+    DefinirSemanaAtendimentoRequest,
     AgendarConsultaRequest,
     FinalizarConsultaRequest,
     DiaSemanaEnum,
@@ -81,6 +106,10 @@ from app.gestao_exames.schemas.exames_schemas import (
     AtualizarLaudoRequest,
     AtualizarStatusSolicitacaoRequest,
     GetExamesRequest,
+    ExameResponse,
+    ResultadoExameResponse,
+    SolicitacaoExameResponse,
+    LaudoResponse,
 )
 
 # ========== Imports Services ==========
@@ -93,11 +122,34 @@ from app.gestao_perfis.services.paciente_service import (
     PacienteService,
     SumarioSaudeService,
 )
+from app.gestao_perfis.services.medico_paciente_service import MedicoPacienteService
 from app.gestao_consultas.services.agenda_service import AgendaService
 from app.gestao_consultas.services.consulta_service import ConsultaService
 from app.gestao_consultas.services.prontuario_service import ProntuarioService
+from app.gestao_consultas.services.particionamento_service import (
+    ParticionamentoService,
+)
+from app.gestao_consultas.services.timeline_service import TimelineService
 from app.gestao_exames.services.exame_service import ExameService
 from app.gestao_exames.services.laudo_service import LaudoService
+from app.gestao_exames.services.dashboard_service import DashboardService
+from app.gestao_exames.services.estatistica_service import EstatisticaService
+from app.gestao_exames.services.fila_laudo_service import FilaLaudoService
+from app.gestao_exames.services.tempo_resposta_service import TempoRespostaService
+from app.gestao_exames.services.projecao_service import (
+    ProjecaoService,
+    escolher_campos,
+    CAMPOS_EXAME,
+    CAMPOS_LAUDO,
+)
+from app.gestao_exames.models.tempo_resposta import EtapaExame
+from app.notificacoes.services.eventos_service import hub as hub_eventos
+from app.busca.services.busca_service import BuscaService, TIPOS as TIPOS_BUSCA
+from app.idempotencia.services.idempotencia_service import (
+    IdempotenciaService,
+    hash_requisicao,
+    hash_arquivo,
+)
 
 # ========== Imports Models ==========
 from app.gestao_perfis.models.usuario import (
@@ -117,6 +169,8 @@ from app.gestao_exames.models.resultado_exame import ResultadoExame
 from app.gestao_exames.models.laudo import Laudo, StatusLaudo
 from app.gestao_exames.models.laudo_resultado import LaudoResultado
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="Sistema de Telemedicina",
     version="1.0.0",
@@ -125,6 +179,53 @@ app = FastAPI(
 
 app.include_router(rabbit_router)
 
+
+@app.on_event("startup")
+async def iniciar_barramento():
+    """Escuta os eventos publicados pelos outros workers (cache, push de eventos)"""
+    hub_eventos.vincular_loop(asyncio.get_running_loop())
+    barramento.iniciar()
+
+
+@app.on_event("startup")
+async def garantir_particoes_prontuario():
+    """Cria com antecedência as partições mensais de logs_prontuario"""
+
+    def garantir():
+        db = SessionLocal()
+        try:
+            ParticionamentoService.garantir_particoes(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning("Não foi possível verificar as partições do prontuário: %s", e)
+        finally:
+            db.close()
+
+    await asyncio.to_thread(garantir)
+
+
+@app.on_event("startup")
+async def limpar_chaves_idempotencia():
+    """Remove as respostas de Idempotency-Key vencidas"""
+
+    def limpar():
+        db = SessionLocal()
+        try:
+            IdempotenciaService.limpar_expiradas(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning("Não foi possível limpar as chaves de idempotência: %s", e)
+        finally:
+            db.close()
+
+    await asyncio.to_thread(limpar)
+
+
+@app.on_event("shutdown")
+def parar_barramento():
+    barramento.parar()
+
+
 # Configurar segurança JWT no Swagger
 security = HTTPBearer()
 
@@ -139,6 +240,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão brotli/gzip das respostas JSON acima do tamanho mínimo
+app.add_middleware(
+    CompressaoMiddleware,
+    minimo_bytes=int(os.environ.get("COMPRESSAO_MINIMO_BYTES") or 1024),
+)
+
 
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 UPLOAD_DIRECTORY_LOCAL = os.path.join(PROJECT_ROOT, "uploads_locais", "resultados")
@@ -157,10 +264,11 @@ app.mount(
 # ==========================================
 
 
-def apply_pagination(query, page: int, limit: int):
-    """Aplica paginação a uma query SQLAlchemy"""
+def apply_pagination(query, page: int, limit: int, total: Optional[int] = None):
+    """Aplica paginação a uma query SQLAlchemy (total já calculado é reaproveitado)"""
     offset = (page - 1) * limit
-    total = query.count()
+    if total is None:
+        total = query.count()
     items = query.offset(offset).limit(limit).all()
     return items, total
 
@@ -296,8 +404,8 @@ def buscar_medicos_por_especialidade(
     especialidade_id: int, db: Session = Depends(get_db)
 ):
     """História 2.1: Buscar médicos por especialidade"""
-    medicos = MedicoService.buscar_medicos_por_especialidade(db, especialidade_id)
-    return {"medicos": [{"id": m.usuarioId, "crm": m.crm} for m in medicos]}
+    medicos = MedicoService.resumo_medicos_por_especialidade(db, especialidade_id)
+    return {"medicos": medicos}
 
 
 @app.post("/especialidades", tags=["Especialidades"])
@@ -320,16 +428,39 @@ def listar_especialidades(
 ):
     """Listar todas especialidades com paginação"""
 
-    query = db.query(Especialidade)
-    items, total = apply_pagination(query, page, limit)
-
-    especialidades_data = [{"id": e.id, "nome": e.nome} for e in items]
+    especialidades_data, total = EspecialidadeService.listar_especialidades_paginado(
+        db, page, limit
+    )
 
     return PaginatedResponse.create(
         items=especialidades_data, total=total, page=page, limit=limit
     )
 
 
+@app.get("/especialidades/{especialidade_id}/horarios-disponiveis", tags=["Agendas"])
+def obter_horarios_disponiveis_especialidade(
+    especialidade_id: int,
+    data_inicio: str,  # Formato "YYYY-MM-DD"
+    data_fim: str,
+    limite: int = 20,
+    db: Session = Depends(get_db),
+):
+    """Primeiros horários livres entre todos os médicos da especialidade"""
+    try:
+        dt_inicio = datetime.fromisoformat(data_inicio)
+        dt_fim = datetime.fromisoformat(data_fim)
+        horarios = AgendaService.obter_horarios_disponiveis_especialidade(
+            db, especialidade_id, dt_inicio, dt_fim, max(1, min(limite, 100))
+        )
+        return {
+            "horarios_disponiveis": [
+                {**h, "data_hora": h["data_hora"].isoformat()} for h in horarios
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # Feature 3: Sumário de Saúde do Paciente
 @app.post("/pacientes", tags=["Pacientes"])
 async def criar_paciente_completo(
@@ -442,7 +573,11 @@ def buscar_sumario_paciente(paciente_id: int, db: Session = Depends(get_db)):
     }
 
 
-@app.get("/pacientes", tags=["Pacientes"], response_model=PaginatedResponse[dict])
+@app.get(
+    "/pacientes",
+    tags=["Pacientes"],
+    response_model=PaginatedResponse[PacienteMedicoResponse],
+)
 def listar_pacientes(
     search: Optional[str] = None,
     page: int = 1,
@@ -450,50 +585,50 @@ def listar_pacientes(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(require_medico),  # Apenas médicos têm acesso
 ):
-    """Listar pacientes relacionados com o médico através de solicitações de exame"""
+    """Listar pacientes do médico, da interação mais recente à mais antiga"""
     try:
-        # Query para pacientes do médico através de solicitações
-        query = (
-            db.query(Paciente)
-            .join(UsuarioModel, Paciente.usuarioId == UsuarioModel.id)
-            .join(SolicitacaoExame, SolicitacaoExame.pacienteId == Paciente.usuarioId)
-            .filter(SolicitacaoExame.medicoSolicitante == current_user.id)
-            .distinct()
-        )
+        # medico_paciente já tem um registro por par médico-paciente
+        query = MedicoPacienteService.query_pacientes(db, current_user.id)
 
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Usuario.nome.ilike(search_term),
-                    Usuario.email.ilike(search_term),
-                    Usuario.cpf.ilike(search_term),
-                )
-            )
+            query = query.join(
+                UsuarioModel, Paciente.usuarioId == UsuarioModel.id
+            ).filter(BuscaService.filtro(UsuarioModel.buscaVetor, search))
 
         items, total = apply_pagination(query, page, limit)
 
         pacientes_data = [
-            {
-                "id": p.usuarioId,
-                "nome": p.usuario.nome if p.usuario else None,
-                "email": p.usuario.email if p.usuario else None,
-                "cpf": p.usuario.cpf if p.usuario else None,
-                "telefone": p.usuario.telefone if p.usuario else None,
-                "data_nascimento": p.dataNascimento,
-                "endereco": p.endereco,
-            }
-            for p in items
+            PacienteMedicoResponse.model_construct(
+                id=p.usuarioId,
+                nome=p.usuario.nome if p.usuario else None,
+                email=p.usuario.email if p.usuario else None,
+                cpf=p.usuario.cpf if p.usuario else None,
+                telefone=p.usuario.telefone if p.usuario else None,
+                data_nascimento=p.dataNascimento,
+                endereco=p.endereco,
+                primeira_interacao=rel.primeiraInteracao,
+                ultima_interacao=rel.ultimaInteracao,
+                total_solicitacoes=rel.solicitacoes,
+                total_consultas=rel.consultas,
+                total_laudos=rel.laudos,
+            )
+            for p, rel in items
         ]
 
-        return PaginatedResponse.create(
-            items=pacientes_data, total=total, page=page, limit=limit
+        return RespostaORJSON(
+            PaginatedResponse.construir(
+                items=pacientes_data, total=total, page=page, limit=limit
+            )
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/pacientes/all", tags=["Pacientes"], response_model=PaginatedResponse[dict])
+@app.get(
+    "/pacientes/all",
+    tags=["Pacientes"],
+    response_model=PaginatedResponse[PacienteResponse],
+)
 def listar_todos_pacientes(
     search: Optional[str] = None,
     page: int = 1,
@@ -507,38 +642,46 @@ def listar_todos_pacientes(
             Paciente, Usuario.id == Paciente.usuarioId
         )
         if search:
-            search_term = f"%{search}%"
             base_query = base_query.filter(
-                or_(
-                    Usuario.nome.ilike(search_term),
-                    Usuario.email.ilike(search_term),
-                    Usuario.cpf.ilike(search_term),
-                )
+                BuscaService.filtro(Usuario.buscaVetor, search)
             )
 
         items, total = apply_pagination(base_query, page, limit)
 
         pacientes_data = [
-            {
-                "id": p.usuarioId,
-                "nome": p.usuario.nome if p.usuario else None,
-                "email": p.usuario.email if p.usuario else None,
-                "cpf": p.usuario.cpf if p.usuario else None,
-                "telefone": p.usuario.telefone if p.usuario else None,
-                "data_nascimento": p.dataNascimento,
-                "endereco": p.endereco,
-            }
-            for _, p in items
+            PacienteResponse.model_construct(
+                id=p.usuarioId,
+                nome=u.nome,
+                email=u.email,
+                cpf=u.cpf,
+                telefone=u.telefone,
+                data_nascimento=p.dataNascimento,
+                endereco=p.endereco,
+            )
+            for u, p in items
         ]
 
-        return PaginatedResponse.create(
-            items=pacientes_data, total=total, page=page, limit=limit
+        return RespostaORJSON(
+            PaginatedResponse.construir(
+                items=pacientes_data, total=total, page=page, limit=limit
+            )
         )
     except Exception as e:
         print(e)
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.get("/pacientes/autocomplete", tags=["Pacientes"])
+def autocompletar_pacientes(
+    q: str,
+    limite: int = 10,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_medico),
+):
+    """Sugestões de pacientes por prefixo do nome ou CPF/telefone exato"""
+    return PacienteService.autocompletar(db, q, limite)
+
+
 @app.get("/pacientes/{paciente_id}", tags=["Pacientes"])
 def obter_paciente(
     paciente_id: int,
@@ -595,6 +738,42 @@ def definir_horario_atendimento(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.put("/agendas/medico/{medico_id}/semana", tags=["Agendas"])
+def definir_semana_atendimento(
+    medico_id: int,
+    request: DefinirSemanaAtendimentoRequest,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_medico),
+):
+    """História 1.1: Definir a agenda semanal completa de uma vez"""
+    # Substitui a agenda inteira: só o próprio médico pode fazê-lo
+    if medico_id != current_user.id:  # type: ignore
+        raise HTTPException(
+            status_code=403, detail="Você só pode definir a sua própria agenda"
+        )
+
+    try:
+        semana = {}
+        for dia in request.dias:
+            intervalos = semana.setdefault(DiaSemana(dia.dia_semana.value), [])
+            for intervalo in dia.intervalos:
+                intervalos.append(
+                    (time.fromisoformat(intervalo.inicio.zfill(5)),
+                     time.fromisoformat(intervalo.fim.zfill(5)))
+                )
+
+        inseridos, removidos = AgendaService.definir_semana_atendimento(
+            db, medico_id, semana, request.duracao_slot_minutos
+        )
+        return {
+            "message": "Agenda semanal definida",
+            "inseridos": inseridos,
+            "removidos": removidos,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/agendas/medico/{medico_id}", tags=["Agendas"])
 def listar_horarios_medico(
     medico_id: int,
@@ -654,31 +833,106 @@ def agendar_consulta(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _periodo_consultas(data_inicio: Optional[str], data_fim: Optional[str]):
+    """Converte o período das listagens; data_fim é inclusiva (dia inteiro)"""
+    inicio = datetime.fromisoformat(data_inicio) if data_inicio else None
+    fim = None
+    if data_fim:
+        fim = datetime.fromisoformat(data_fim)
+        if len(data_fim) == 10:
+            fim += timedelta(days=1)
+    return inicio, fim
+
+
 @app.get("/consultas/paciente/{paciente_id}", tags=["Consultas"])
 def listar_consultas_paciente(
-    paciente_id: int, apenas_futuras: bool = False, db: Session = Depends(get_db)
+    paciente_id: int,
+    apenas_futuras: bool = False,
+    data_inicio: Optional[str] = None,  # Formato "YYYY-MM-DD"
+    data_fim: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limite: int = 50,
+    db: Session = Depends(get_db),
 ):
-    """História 1.3: Visualizar consultas do paciente"""
-    consultas = ConsultaService.listar_consultas_paciente(
-        db, paciente_id, apenas_futuras
-    )
+    """História 1.3: Visualizar consultas do paciente (paginado por cursor)"""
+    try:
+        inicio, fim = _periodo_consultas(data_inicio, data_fim)
+        consultas, proximo_cursor = ConsultaService.listar_consultas_paciente(
+            db, paciente_id, apenas_futuras, inicio, fim, cursor, limite
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
         "consultas": [
-            {"id": c.id, "data_hora": c.dataHora.isoformat(), "status": c.status.value}
+            {
+                "id": c.id,
+                "medico_id": c.medicoId,
+                "data_hora": c.dataHora.isoformat(),
+                "status": c.status.value,
+            }
             for c in consultas
-        ]
+        ],
+        "proximo_cursor": proximo_cursor,
     }
 
 
 @app.get("/consultas/medico/{medico_id}", tags=["Consultas"])
 def listar_consultas_medico(
-    medico_id: int, apenas_futuras: bool = False, db: Session = Depends(get_db)
+    medico_id: int,
+    apenas_futuras: bool = False,
+    data_inicio: Optional[str] = None,  # Formato "YYYY-MM-DD"
+    data_fim: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limite: int = 50,
+    db: Session = Depends(get_db),
+):
+    """História 1.3: Visualizar consultas do médico (paginado por cursor)"""
+    try:
+        inicio, fim = _periodo_consultas(data_inicio, data_fim)
+        consultas, proximo_cursor = ConsultaService.listar_consultas_medico(
+            db, medico_id, apenas_futuras, inicio, fim, cursor, limite
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "consultas": [
+            {
+                "id": c.id,
+                "paciente_id": c.pacienteId,
+                "data_hora": c.dataHora.isoformat(),
+                "status": c.status.value,
+            }
+            for c in consultas
+        ],
+        "proximo_cursor": proximo_cursor,
+    }
+
+
+@app.get("/consultas/medico/{medico_id}/proximas", tags=["Consultas"])
+def proximas_consultas_medico(
+    medico_id: int,
+    limite: int = 10,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_medico),
 ):
-    """História 1.3: Visualizar consultas do médico"""
-    consultas = ConsultaService.listar_consultas_medico(db, medico_id, apenas_futuras)
+    """Próximas consultas ativas do médico (visão do dia)"""
+    # Traz nomes e motivos dos pacientes: só o próprio médico consulta
+    if medico_id != current_user.id:  # type: ignore
+        raise HTTPException(
+            status_code=403, detail="Você só pode ver as suas próximas consultas"
+        )
+
+    consultas = ConsultaService.proximas_consultas_medico(db, medico_id, limite)
     return {
         "consultas": [
-            {"id": c.id, "data_hora": c.dataHora.isoformat(), "status": c.status.value}
+            {
+                "id": c.id,
+                "paciente_id": c.pacienteId,
+                "paciente_nome": c.pacienteNome,
+                "data_hora": c.dataHora.isoformat(),
+                "status": c.status.value,
+                "motivo_consulta": c.motivoConsulta,
+            }
             for c in consultas
         ]
     }
@@ -724,45 +978,62 @@ def finalizar_consulta(
 @app.post("/solicitacoes", tags=["Exames"])
 async def criar_solicitacao_exame(
     request: CriarSolicitacaoExameRequest,
+    idempotency_key: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(require_medico),
 ):
     """História 1.1: Criar solicitação de exame"""
-    try:
-        solicitacao = ExameService.criar_solicitacao_exame(
-            db,
-            request.paciente_id,
-            current_user.id,
-            request.nome_exame,
-            request.hipotese_diagnostica,
-            request.detalhes_preparo,
-        )
+    async with IdempotenciaService.executar(
+        idempotency_key,
+        current_user.id,
+        "POST /solicitacoes",
+        hash_requisicao(request.model_dump_json()),
+    ) as execucao:
+        if execucao.resposta is not None:
+            return execucao.resposta
 
-        paciente: Paciente = PacienteService.buscar_paciente_por_id(
-            db, request.paciente_id
-        )
+        try:
+            solicitacao = ExameService.criar_solicitacao_exame(
+                db,
+                request.paciente_id,
+                current_user.id,
+                request.nome_exame,
+                request.hipotese_diagnostica,
+                request.detalhes_preparo,
+            )
 
-        await enviar_email_solicitacao_exame(
-            nome_paciente=paciente.usuario.nome,
-            email_paciente=paciente.usuario.email,
-            nome_exame=request.nome_exame,
-            nome_medico=current_user.nome,
-            codigo_solicitacao=solicitacao.codigoSolicitacao,
-            detalhes_preparo=request.detalhes_preparo,
-        )
+            paciente: Paciente = PacienteService.buscar_paciente_por_id(
+                db, request.paciente_id
+            )
 
-        return {
-            "id": solicitacao.id,
-            "codigo_solicitacao": solicitacao.codigoSolicitacao,
-            "status": solicitacao.status.value,
-        }
-    except Exception as e:
-        print(e)
-        raise HTTPException(status_code=400, detail=str(e))
+            await enviar_email_solicitacao_exame(
+                nome_paciente=paciente.usuario.nome,
+                email_paciente=paciente.usuario.email,
+                nome_exame=request.nome_exame,
+                nome_medico=current_user.nome,
+                codigo_solicitacao=solicitacao.codigoSolicitacao,
+                detalhes_preparo=request.detalhes_preparo,
+            )
+
+            return execucao.concluir(
+                {
+                    "id": solicitacao.id,
+                    "codigo_solicitacao": solicitacao.codigoSolicitacao,
+                    "status": solicitacao.status.value,
+                }
+            )
+        except Exception as e:
+            print(e)
+            raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/solicitacoes", tags=["Exames"], response_model=PaginatedResponse[dict])
+@app.get(
+    "/solicitacoes",
+    tags=["Exames"],
+    response_model=PaginatedResponse[SolicitacaoExameResponse],
+)
 def listar_solicitacoes(
+    request: Request,
     page: int = 1,
     limit: int = 10,
     status: Optional[str] = None,
@@ -804,34 +1075,49 @@ def listar_solicitacoes(
             query = query.filter(SolicitacaoExame.dataSolicitacao <= dt_fim)
 
         if search:
-            query = query.filter(SolicitacaoExame.nomeExame.ilike(f"%{search}%"))
+            query = query.filter(
+                BuscaService.filtro(SolicitacaoExame.buscaVetor, search)
+            )
 
         # Ordenar por data mais recente
         query = query.order_by(SolicitacaoExame.dataSolicitacao.desc())
 
-        items, total = apply_pagination(query, page, limit)
+        total, versao = etag.versao_da_listagem(
+            query,
+            SolicitacaoExame.id,
+            SolicitacaoExame.atualizadoEm,
+            *ExameService.marcadores_solicitacao(),
+        )
+        tag = etag.gerar_etag(current_user.id, request.url.query, versao)
+        if etag.nao_modificado(request, tag):
+            return etag.resposta_304(tag)
+
+        items, total = apply_pagination(query, page, limit, total)
 
         solicitacoes_data = [
-            {
-                "id": s.id,
-                "codigo_solicitacao": s.codigoSolicitacao,
-                "paciente_id": s.pacienteId,
-                "paciente_nome": s.paciente.usuario.nome if s.paciente else None,
-                "paciente_cpf": s.paciente.usuario.cpf if s.paciente else None,
-                "medico_id": s.medicoSolicitante,
-                "medico_nome": s.medico.usuario.nome if s.medico else None,
-                "medico_crm": s.medico.crm if s.medico else None,
-                "nome_exame": s.nomeExame,
-                "hipotese_diagnostica": s.hipoteseDiagnostica,
-                "detalhes_preparo": s.detalhesPreparo,
-                "status": s.status.value,
-                "data_solicitacao": s.dataSolicitacao.isoformat(),
-            }
+            SolicitacaoExameResponse.model_construct(
+                id=s.id,
+                codigo_solicitacao=s.codigoSolicitacao,
+                paciente_id=s.pacienteId,
+                paciente_nome=s.paciente.usuario.nome if s.paciente else None,
+                paciente_cpf=s.paciente.usuario.cpf if s.paciente else None,
+                medico_id=s.medicoSolicitante,
+                medico_nome=s.medico.usuario.nome if s.medico else None,
+                medico_crm=s.medico.crm if s.medico else None,
+                nome_exame=s.nomeExame,
+                hipotese_diagnostica=s.hipoteseDiagnostica,
+                detalhes_preparo=s.detalhesPreparo,
+                status=s.status.value,
+                data_solicitacao=s.dataSolicitacao,
+            )
             for s in items
         ]
 
-        return PaginatedResponse.create(
-            items=solicitacoes_data, total=total, page=page, limit=limit
+        return RespostaORJSON(
+            PaginatedResponse.construir(
+                items=solicitacoes_data, total=total, page=page, limit=limit
+            ),
+            headers=etag.cabecalhos(tag),
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -840,10 +1126,26 @@ def listar_solicitacoes(
 @app.get("/solicitacoes/{solicitacao_id}", tags=["Exames"])
 def obter_solicitacao(
     solicitacao_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Obter detalhes de uma solicitação"""
+    versao = etag.versao_do_registro(
+        db,
+        SolicitacaoExame.id,
+        SolicitacaoExame.atualizadoEm,
+        solicitacao_id,
+        *ExameService.marcadores_solicitacao(),
+    )
+    if versao is None:
+        raise HTTPException(status_code=404, detail="Solicitação não encontrada")
+    tag = etag.gerar_etag(current_user.id, request.url.path, versao)
+    if etag.nao_modificado(request, tag):
+        return etag.resposta_304(tag)
+    response.headers.update(etag.cabecalhos(tag))
+
     solicitacao = ExameService.buscar_solicitacao_por_id(db, solicitacao_id)
 
     if not solicitacao:
@@ -934,6 +1236,11 @@ def delete_solicitacao_exame(
 
     # 4. Deletar do DB
     try:
+        EstatisticaService.remover_solicitacao(db, solicitacao)
+        MedicoPacienteService.remover_interacao(
+            db, solicitacao.medicoSolicitante, solicitacao.pacienteId, solicitacoes=1
+        )
+        TimelineService.remover(db, TipoEvento.SOLICITACAO_EXAME, [solicitacao.id])
         db.delete(solicitacao)
         db.commit()
     except Exception as e:
@@ -950,54 +1257,78 @@ async def enviar_resultado_exame(
     nome_laboratorio: str = Form(...),
     observacoes: str | None = Form(None),
     arquivo: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(require_funcionario),
 ):
     """História 1.2: Funcionário envia resultado de exame"""
+    chave_hash = (
+        hash_requisicao(
+            codigo_solicitacao,
+            data_realizacao.isoformat(),
+            nome_laboratorio,
+            observacoes,
+            arquivo.filename,
+            hash_arquivo(arquivo.file),
+        )
+        if idempotency_key
+        else ""
+    )
+    async with IdempotenciaService.executar(
+        idempotency_key, current_user.id, "POST /resultados", chave_hash
+    ) as execucao:
+        if execucao.resposta is not None:
+            # Repetição: o arquivo não é gravado de novo
+            arquivo.file.close()
+            return execucao.resposta
 
-    try:
-        nome_arquivo_original = arquivo.filename
-        if not nome_arquivo_original:
-            raise HTTPException(status_code=500, detail="Arquivo sem nome")
-        file_extension = nome_arquivo_original.split(".")[-1]
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
+        try:
+            nome_arquivo_original = arquivo.filename
+            if not nome_arquivo_original:
+                raise HTTPException(status_code=500, detail="Arquivo sem nome")
+            file_extension = nome_arquivo_original.split(".")[-1]
+            unique_filename = f"{uuid.uuid4()}.{file_extension}"
 
-        file_path = os.path.join(UPLOAD_DIRECTORY_LOCAL, unique_filename)
+            file_path = os.path.join(UPLOAD_DIRECTORY_LOCAL, unique_filename)
 
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(arquivo.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao salvar o arquivo: {e}")
-    finally:
-        arquivo.file.close()
+            with open(file_path, "wb") as buffer:
+                shutil.copyfileobj(arquivo.file, buffer)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Erro ao salvar o arquivo: {e}"
+            )
+        finally:
+            arquivo.file.close()
 
-    arquivo_url_publica = f"{BASE_URL_LOCAL}/{unique_filename}"
+        arquivo_url_publica = f"{BASE_URL_LOCAL}/{unique_filename}"
 
-    try:
-        resultado = ExameService.enviar_resultado_exame(
-            db,
-            codigo_solicitacao,
-            data_realizacao,
-            nome_laboratorio,
-            arquivo_url_publica,
-            nome_arquivo_original,
-            observacoes,
-        )
+        try:
+            resultado = ExameService.enviar_resultado_exame(
+                db,
+                codigo_solicitacao,
+                data_realizacao,
+                nome_laboratorio,
+                arquivo_url_publica,
+                nome_arquivo_original,
+                observacoes,
+            )
 
-        solicitacao = resultado.solicitacao
+            solicitacao = resultado.solicitacao
 
-        await enviar_notificacao_exame_disponivel(
-            data_realizacao=data_realizacao.isoformat(),
-            nome_medico=solicitacao.medico.usuario.nome,
-            nome_paciente=solicitacao.paciente.usuario.nome,
-            email_medico=solicitacao.medico.usuario.email,
-            nome_exame=solicitacao.nomeExame,
-            codigo_solicitacao=codigo_solicitacao,
-        )
-        return {"message": "Resultado enviado", "resultado_id": resultado.id}
-    except Exception as e:
-        os.remove(file_path)
-        raise HTTPException(status_code=400, detail=str(e))
+            await enviar_notificacao_exame_disponivel(
+                data_realizacao=data_realizacao.isoformat(),
+                nome_medico=solicitacao.medico.usuario.nome,
+                nome_paciente=solicitacao.paciente.usuario.nome,
+                email_medico=solicitacao.medico.usuario.email,
+                nome_exame=solicitacao.nomeExame,
+                codigo_solicitacao=codigo_solicitacao,
+            )
+            return execucao.concluir(
+                {"message": "Resultado enviado", "resultado_id": resultado.id}
+            )
+        except Exception as e:
+            os.remove(file_path)
+            raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.post("/exames/detalhes", tags=["Exames"])
@@ -1027,19 +1358,27 @@ def obter_arquivos_exames(
     ]
 
 
-@app.get("/exames", tags=["Exames"], response_model=PaginatedResponse[dict])
+@app.get(
+    "/exames",
+    tags=["Exames"],
+    response_model=PaginatedResponse[ResultadoExameResponse],
+)
 def listar_exames(
+    request: Request,
     page: int = 1,
     limit: int = 10,
     paciente_id: Optional[int] = None,
     data_inicio: Optional[str] = None,  # Formato "YYYY-MM-DD"
     data_fim: Optional[str] = None,
     search: Optional[str] = None,
+    fields: Optional[str] = None,  # Campos separados por vírgula, ex.: "id,nome_exame"
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Listar exames (resultados) com lógica baseada no tipo de usuário e paginação"""
     try:
+        campos = escolher_campos(fields, CAMPOS_EXAME)
+
         # Criar query base dependendo do tipo de usuário
         if current_user.tipo.value == "medico":
             # Médico vê exames das suas solicitações
@@ -1094,57 +1433,91 @@ def listar_exames(
             query = query.filter(ResultadoExame.dataRealizacao <= dt_fim)
 
         if search:
-            query = query.filter(SolicitacaoExame.nomeExame.ilike(f"%{search}%"))
+            query = query.filter(
+                BuscaService.filtro(SolicitacaoExame.buscaVetor, search)
+            )
 
         # Ordenar por data mais recente
         query = query.order_by(ResultadoExame.dataRealizacao.desc())
 
-        items, total = apply_pagination(query, page, limit)
+        total, versao = etag.versao_da_listagem(
+            query,
+            ResultadoExame.id,
+            ResultadoExame.atualizadoEm,
+            *ExameService.marcadores_resultado(),
+        )
+        tag = etag.gerar_etag(current_user.id, request.url.query, versao)
+        if etag.nao_modificado(request, tag):
+            return etag.resposta_304(tag)
+
+        if campos:
+            # Só as colunas pedidas, sem carregar as entidades relacionadas
+            return RespostaORJSON(
+                PaginatedResponse.construir(
+                    items=ProjecaoService.exames(
+                        query, campos, (page - 1) * limit, limit
+                    ),
+                    total=total,
+                    page=page,
+                    limit=limit,
+                ),
+                headers=etag.cabecalhos(tag),
+            )
+
+        items, total = apply_pagination(query, page, limit, total)
+
+        # Uma consulta para todos os exames da página
+        com_laudo = {
+            r[0]
+            for r in db.query(LaudoResultado.resultadoExameId)
+            .filter(LaudoResultado.resultadoExameId.in_([r.id for r in items]))
+            .distinct()
+        }
 
         exames_data = [
-            {
-                "id": resultado.id,
-                "solicitacao_id": resultado.solicitacao.id,
-                "codigo_solicitacao": resultado.solicitacao.codigoSolicitacao,
-                "paciente_id": resultado.solicitacao.pacienteId,
-                "paciente_nome": (
+            ResultadoExameResponse.model_construct(
+                id=resultado.id,
+                solicitacao_id=resultado.solicitacao.id,
+                codigo_solicitacao=resultado.solicitacao.codigoSolicitacao,
+                paciente_id=resultado.solicitacao.pacienteId,
+                paciente_nome=(
                     resultado.solicitacao.paciente.usuario.nome
                     if resultado.solicitacao.paciente
                     else None
                 ),
-                "paciente_cpf": (
+                paciente_cpf=(
                     resultado.solicitacao.paciente.usuario.cpf
                     if resultado.solicitacao.paciente
                     else None
                 ),
-                "medico_id": resultado.solicitacao.medicoSolicitante,
-                "medico_nome": (
+                medico_id=resultado.solicitacao.medicoSolicitante,
+                medico_nome=(
                     resultado.solicitacao.medico.usuario.nome
                     if resultado.solicitacao.medico
                     else None
                 ),
-                "medico_crm": (
+                medico_crm=(
                     resultado.solicitacao.medico.crm
                     if resultado.solicitacao.medico
                     else None
                 ),
-                "nome_exame": resultado.solicitacao.nomeExame,
-                "data_realizacao": resultado.dataRealizacao.isoformat(),
-                "data_upload": resultado.dataUpload.isoformat(),
-                "nome_laboratorio": resultado.nomeLaboratorio,
-                "nome_arquivo": resultado.nomeArquivo,
-                "url_arquivo": resultado.arquivoUrl,
-                "observacoes": resultado.observacoes,
-                "tem_laudo": db.query(LaudoResultado)
-                .filter_by(resultadoExameId=resultado.id)
-                .count()
-                > 0,
-            }
+                nome_exame=resultado.solicitacao.nomeExame,
+                data_realizacao=resultado.dataRealizacao,
+                data_upload=resultado.dataUpload,
+                nome_laboratorio=resultado.nomeLaboratorio,
+                nome_arquivo=resultado.nomeArquivo,
+                url_arquivo=resultado.arquivoUrl,
+                observacoes=resultado.observacoes,
+                tem_laudo=resultado.id in com_laudo,
+            )
             for resultado in items
         ]
 
-        return PaginatedResponse.create(
-            items=exames_data, total=total, page=page, limit=limit
+        return RespostaORJSON(
+            PaginatedResponse.construir(
+                items=exames_data, total=total, page=page, limit=limit
+            ),
+            headers=etag.cabecalhos(tag),
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1153,9 +1526,25 @@ def listar_exames(
 @app.get("/exames/{exame_id}", tags=["Exames"])
 def obter_exame(
     exame_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user),
 ):
+    versao = etag.versao_do_registro(
+        db,
+        ResultadoExame.id,
+        ResultadoExame.atualizadoEm,
+        exame_id,
+        *ExameService.marcadores_resultado(),
+    )
+    if versao is None:
+        raise HTTPException(status_code=404, detail="Solicitação não encontrada")
+    tag = etag.gerar_etag(current_user.id, request.url.path, versao)
+    if etag.nao_modificado(request, tag):
+        return etag.resposta_304(tag)
+    response.headers.update(etag.cabecalhos(tag))
+
     resultado = ExameService.buscar_resultado_por_id(db, exame_id)
 
     if not resultado:
@@ -1247,6 +1636,13 @@ def delete_resultado_exame(
 
     # 4. Deletar o registro do banco de dados (A Fonte da Verdade)
     try:
+        EstatisticaService.registrar_resultado(
+            db, resultado.solicitacao.medicoSolicitante, resultado.dataUpload, -1
+        )
+        TimelineService.remover(db, TipoEvento.EXAME, [resultado.id])
+        TempoRespostaService.registrar_resultado(
+            db, resultado, resultado.solicitacao, -1
+        )
         db.delete(resultado)
         db.commit()
     except Exception as e:
@@ -1283,41 +1679,138 @@ def visualizar_prontuario(
     tipo_evento: Optional[TipoEventoEnum] = None,
     data_inicio: Optional[str] = None,
     data_fim: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limite: int = 50,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(require_medico),  # Só médicos podem ver prontuários
 ):
-    """História 2.1: Visualizar prontuário com filtros"""
+    """História 2.1: Visualizar prontuário com filtros (paginado por cursor)"""
+    try:
+        tipo_enum = TipoEvento(tipo_evento.value) if tipo_evento else None
+        dt_inicio = datetime.fromisoformat(data_inicio) if data_inicio else None
+        dt_fim = datetime.fromisoformat(data_fim) if data_fim else None
+
+        logs, proximo_cursor = ProntuarioService.visualizar_prontuario(
+            db, paciente_id, tipo_enum, dt_inicio, dt_fim, cursor, limite
+        )
+        return {
+            "eventos": [_evento_prontuario(log) for log in logs],
+            "proximo_cursor": proximo_cursor,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/prontuario/{paciente_id}/timeline", tags=["Prontuário"])
+def timeline_prontuario(
+    paciente_id: int,
+    tipo_evento: Optional[TipoEventoEnum] = None,
+    data_inicio: Optional[str] = None,
+    data_fim: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limite: int = 50,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_medico),
+):
+    """Linha do tempo detalhada do prontuário (exame, médico, status, arquivo)"""
     try:
         tipo_enum = TipoEvento(tipo_evento.value) if tipo_evento else None
         dt_inicio = datetime.fromisoformat(data_inicio) if data_inicio else None
         dt_fim = datetime.fromisoformat(data_fim) if data_fim else None
 
-        logs = ProntuarioService.visualizar_prontuario(
-            db, paciente_id, tipo_enum, dt_inicio, dt_fim
+        eventos, proximo_cursor = TimelineService.listar(
+            db, paciente_id, tipo_enum, dt_inicio, dt_fim, cursor, limite
         )
         return {
             "eventos": [
                 {
-                    "id": log.id,
-                    "tipo": log.tipoEvento.value,
-                    "data": log.dataEvento.isoformat(),
-                    "descricao": log.descricao,
+                    "id": e.id,
+                    "tipo": e.tipoEvento.value,
+                    "referencia_id": e.referenciaId,
+                    "data": e.dataEvento.isoformat(),
+                    "titulo": e.titulo,
+                    "status": e.status,
+                    "medico_id": e.medicoId,
+                    "medico_nome": e.medicoNome,
+                    "nome_laboratorio": e.nomeLaboratorio,
+                    "arquivo_url": e.arquivoUrl,
+                    "descricao": e.descricao,
                 }
-                for log in logs
-            ]
+                for e in eventos
+            ],
+            "proximo_cursor": proximo_cursor,
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.get("/prontuario/{paciente_id}/exportar", tags=["Prontuário"])
+def exportar_prontuario(
+    paciente_id: int,
+    tipo_evento: Optional[TipoEventoEnum] = None,
+    data_inicio: Optional[str] = None,
+    data_fim: Optional[str] = None,
+    current_user: Usuario = Depends(require_medico),
+):
+    """Exporta a linha do tempo completa em NDJSON (um evento por linha)"""
+    try:
+        tipo_enum = TipoEvento(tipo_evento.value) if tipo_evento else None
+        dt_inicio = datetime.fromisoformat(data_inicio) if data_inicio else None
+        dt_fim = datetime.fromisoformat(data_fim) if data_fim else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def gerar():
+        # Sessão própria: a do Depends é fechada antes do fim do streaming
+        db = SessionLocal()
+        try:
+            for log in ProntuarioService.exportar_prontuario(
+                db, paciente_id, tipo_enum, dt_inicio, dt_fim
+            ):
+                yield json.dumps(_evento_prontuario(log), ensure_ascii=False) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        gerar(),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="prontuario_{paciente_id}.ndjson"'
+        },
+    )
+
+
+def _evento_prontuario(log) -> dict:
+    return {
+        "id": log.id,
+        "tipo": log.tipoEvento.value,
+        "data": log.dataEvento.isoformat(),
+        "descricao": log.descricao,
+    }
+
+
 @app.get("/prontuario/{paciente_id}/completo", tags=["Prontuário"])
 def obter_historico_completo(paciente_id: int, db: Session = Depends(get_db)):
     """História 2.1: Histórico completo do paciente"""
     historico = ProntuarioService.obter_historico_completo(db, paciente_id)
     return {
-        "total_consultas": len(historico["consultas"]),
-        "total_exames": len(historico["exames"]),
-        "total_eventos": len(historico["timeline"]),
+        "total_consultas": historico["total_consultas"],
+        "total_exames": historico["total_exames"],
+        "total_laudos": historico["total_laudos"],
+        "total_eventos": historico["total_eventos"],
+        "eventos_por_tipo": {
+            tipo.value: total for tipo, total in historico["eventos_por_tipo"].items()
+        },
+        "primeiro_evento": (
+            historico["primeiro_evento"].isoformat()
+            if historico["primeiro_evento"]
+            else None
+        ),
+        "ultimo_evento": (
+            historico["ultimo_evento"].isoformat()
+            if historico["ultimo_evento"]
+            else None
+        ),
     }
 
 
@@ -1330,27 +1823,40 @@ def obter_historico_completo(paciente_id: int, db: Session = Depends(get_db)):
 @app.post("/laudos", tags=["Laudos"])
 async def criar_laudo(
     request: CriarLaudoRequest,
+    idempotency_key: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(require_medico),
 ):
     """História 2.1: Emitir laudo médico"""
-    try:
-        laudo = LaudoService.criar_laudo(
-            db,
-            request.paciente_id,
-            current_user.id,
-            request.titulo,
-            request.descricao,
-            request.exames_ids,
-        )
+    async with IdempotenciaService.executar(
+        idempotency_key,
+        current_user.id,
+        "POST /laudos",
+        hash_requisicao(request.model_dump_json()),
+    ) as execucao:
+        if execucao.resposta is not None:
+            return execucao.resposta
 
-        return {"id": laudo.id, "status": laudo.status.value}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        try:
+            laudo = LaudoService.criar_laudo(
+                db,
+                request.paciente_id,
+                current_user.id,
+                request.titulo,
+                request.descricao,
+                request.exames_ids,
+            )
+
+            return execucao.concluir({"id": laudo.id, "status": laudo.status.value})
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/laudos", tags=["Laudos"], response_model=PaginatedResponse[dict])
+@app.get(
+    "/laudos", tags=["Laudos"], response_model=PaginatedResponse[LaudoResponse]
+)
 def listar_laudos(
+    request: Request,
     page: int = 1,
     limit: int = 10,
     paciente_id: Optional[int] = None,
@@ -1358,11 +1864,14 @@ def listar_laudos(
     data_inicio: Optional[str] = None,  # Formato "YYYY-MM-DD"
     data_fim: Optional[str] = None,
     search: Optional[str] = None,
+    fields: Optional[str] = None,  # Campos separados por vírgula, ex.: "id,titulo"
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Listar laudos com filtros avançados e paginação"""
     try:
+        campos = escolher_campos(fields, CAMPOS_LAUDO)
+
         # Criar query base dependendo do tipo de usuário
         if current_user.tipo.value == "paciente":
             # Paciente vê apenas seus próprios laudos
@@ -1448,12 +1957,32 @@ def listar_laudos(
             query = query.filter(Laudo.dataEmissao <= dt_fim)
 
         if search:
-            query = query.filter(Laudo.titulo.ilike(f"%{search}%"))
+            query = query.filter(BuscaService.filtro(Laudo.buscaVetor, search))
 
         # Ordenar por data mais recente
         query = query.order_by(Laudo.dataEmissao.desc())
 
-        items, total = apply_pagination(query, page, limit)
+        total, versao = etag.versao_da_listagem(
+            query, Laudo.id, Laudo.atualizadoEm, *LaudoService.marcadores_laudo()
+        )
+        tag = etag.gerar_etag(current_user.id, request.url.query, versao)
+        if etag.nao_modificado(request, tag):
+            return etag.resposta_304(tag)
+
+        if campos:
+            return RespostaORJSON(
+                PaginatedResponse.construir(
+                    items=ProjecaoService.laudos(
+                        db, query, campos, (page - 1) * limit, limit
+                    ),
+                    total=total,
+                    page=page,
+                    limit=limit,
+                ),
+                headers=etag.cabecalhos(tag),
+            )
+
+        items, total = apply_pagination(query, page, limit, total)
 
         # Montar dados dos laudos com exames associados
         laudos_data = []
@@ -1475,16 +2004,16 @@ def listar_laudos(
                 )
                 if resultado and resultado.solicitacao:
                     exames.append(
-                        {
-                            "id": resultado.id,
-                            "solicitacao_id": resultado.solicitacaoId,
-                            "codigo_solicitacao": resultado.solicitacao.codigoSolicitacao,
-                            "nome_exame": resultado.solicitacao.nomeExame,
-                            "data_realizacao": resultado.dataRealizacao.isoformat(),
-                            "nome_laboratorio": resultado.nomeLaboratorio,
-                            "nome_arquivo": resultado.nomeArquivo,
-                            "url_arquivo": resultado.arquivoUrl,
-                        }
+                        ExameResponse.model_construct(
+                            id=resultado.id,
+                            solicitacao_id=resultado.solicitacaoId,
+                            codigo_solicitacao=resultado.solicitacao.codigoSolicitacao,
+                            nome_exame=resultado.solicitacao.nomeExame,
+                            data_realizacao=resultado.dataRealizacao,
+                            nome_laboratorio=resultado.nomeLaboratorio,
+                            nome_arquivo=resultado.nomeArquivo,
+                            url_arquivo=resultado.arquivoUrl,
+                        )
                     )
                     if not paciente_info and resultado.solicitacao.paciente:
                         paciente_info = {
@@ -1495,26 +2024,29 @@ def listar_laudos(
 
             if paciente_info:
                 laudos_data.append(
-                    {
-                        "id": laudo.id,
-                        "paciente_id": paciente_info["paciente_id"],
-                        "paciente_nome": paciente_info["paciente_nome"],
-                        "paciente_cpf": paciente_info["paciente_cpf"],
-                        "medico_id": laudo.medicoId,
-                        "medico_nome": (
+                    LaudoResponse.model_construct(
+                        id=laudo.id,
+                        paciente_id=paciente_info["paciente_id"],
+                        paciente_nome=paciente_info["paciente_nome"],
+                        paciente_cpf=paciente_info["paciente_cpf"],
+                        medico_id=laudo.medicoId,
+                        medico_nome=(
                             laudo.medico.usuario.nome if laudo.medico else None
                         ),
-                        "medico_crm": laudo.medico.crm if laudo.medico else None,
-                        "titulo": laudo.titulo,
-                        "descricao": laudo.descricao,
-                        "status": laudo.status.value,
-                        "data_emissao": laudo.dataEmissao.isoformat(),
-                        "exames": exames,
-                    }
+                        medico_crm=laudo.medico.crm if laudo.medico else None,
+                        titulo=laudo.titulo,
+                        descricao=laudo.descricao,
+                        status=laudo.status.value,
+                        data_emissao=laudo.dataEmissao,
+                        exames=exames,
+                    )
                 )
 
-        return PaginatedResponse.create(
-            items=laudos_data, total=total, page=page, limit=limit
+        return RespostaORJSON(
+            PaginatedResponse.construir(
+                items=laudos_data, total=total, page=page, limit=limit
+            ),
+            headers=etag.cabecalhos(tag),
         )
     except Exception as e:
         print(e)
@@ -1524,11 +2056,23 @@ def listar_laudos(
 @app.get("/laudos/{laudo_id}", tags=["Laudos"])
 def obter_laudo(
     laudo_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Obter detalhes de um laudo"""
     try:
+        versao = etag.versao_do_registro(
+            db, Laudo.id, Laudo.atualizadoEm, laudo_id, *LaudoService.marcadores_laudo()
+        )
+        if versao is None:
+            raise HTTPException(status_code=404, detail="Laudo não encontrado")
+        tag = etag.gerar_etag(current_user.id, request.url.path, versao)
+        if etag.nao_modificado(request, tag):
+            return etag.resposta_304(tag)
+        response.headers.update(etag.cabecalhos(tag))
+
         laudo = LaudoService.buscar_laudo_por_id(db, laudo_id)
 
         if not laudo:
@@ -1667,7 +2211,18 @@ def delete_laudo(
 
     # 4. Deletar do DB (A relação LaudoResultado deve ter cascade delete no modelo)
     try:
+        EstatisticaService.registrar_laudo(db, laudo.medicoId, laudo.dataEmissao, -1)
+        MedicoPacienteService.remover_interacao(
+            db, laudo.medicoId, laudo.pacienteId, laudos=1
+        )
+        for lr in laudo.resultados:
+            TempoRespostaService.registrar_laudo(db, laudo, lr.resultado, -1)
+            lr.resultado.atualizadoEm = datetime.utcnow()
+        resultados_ids = [lr.resultadoExameId for lr in laudo.resultados]
         db.delete(laudo)
+        db.flush()
+        # Exames que ficaram sem laudo voltam para a fila
+        FilaLaudoService.devolver(db, resultados_ids)
         db.commit()
     except Exception as e:
         db.rollback()
@@ -1676,6 +2231,87 @@ def delete_laudo(
     return {"message": "Laudo excluído com sucesso"}
 
 
+# ==========================================
+# FILA DE LAUDOS
+# ==========================================
+
+
+def _item_fila(item) -> dict:
+    return {
+        "resultado_id": item.resultadoExameId,
+        "paciente_id": item.pacienteId,
+        "medico_solicitante": item.medicoSolicitante,
+        "nome_exame": item.nomeExame,
+        "data_upload": item.dataUpload.isoformat(),
+        "reservado_em": item.reservadoEm.isoformat() if item.reservadoEm else None,
+    }
+
+
+@app.get("/fila-laudos", tags=["Laudos"])
+def obter_fila_laudos(
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_medico),
+):
+    """Tamanho da fila de exames sem laudo e itens reservados pelo médico"""
+    return {
+        "livres": FilaLaudoService.contar_livres(db),
+        "reservados": [
+            _item_fila(i) for i in FilaLaudoService.listar_reservas(db, current_user.id)
+        ],
+    }
+
+
+@app.post("/fila-laudos/reservar", tags=["Laudos"])
+def reservar_fila_laudos(
+    quantidade: int = 1,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_medico),
+):
+    """Puxa da fila os exames sem laudo mais antigos para o médico laudar"""
+    itens = FilaLaudoService.reservar(db, current_user.id, quantidade)
+    return {"itens": [_item_fila(i) for i in itens]}
+
+
+@app.post("/fila-laudos/{resultado_id}/liberar", tags=["Laudos"])
+def liberar_item_fila_laudos(
+    resultado_id: int,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_medico),
+):
+    """Devolve à fila um exame reservado pelo médico"""
+    if not FilaLaudoService.liberar(db, current_user.id, resultado_id):
+        raise HTTPException(status_code=404, detail="Reserva não encontrada")
+    return {"message": "Exame devolvido à fila"}
+
+
+# ==========================================
+# BUSCA
+# ==========================================
+
+
+@app.get("/busca", tags=["Busca"])
+def buscar(
+    q: str,
+    tipos: Optional[str] = None,  # Ex.: "paciente,laudo"
+    limite: int = 20,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Busca textual em pacientes, solicitações e laudos visíveis ao usuário"""
+    lista_tipos = None
+    if tipos:
+        lista_tipos = [t.strip() for t in tipos.split(",") if t.strip()]
+        invalidos = set(lista_tipos) - set(TIPOS_BUSCA)
+        if invalidos:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Tipos inválidos: {', '.join(sorted(invalidos))}",
+            )
+
+    resultados = BuscaService.buscar(db, current_user, q, lista_tipos, limite)
+    return {"termo": q, "total": len(resultados), "resultados": resultados}
+
+
 # ==========================================
 # DASHBOARD
 # ==========================================
@@ -1690,109 +2326,53 @@ def obter_estatisticas_dashboard(
 ):
     """Estatísticas do dashboard para médicos"""
     try:
-        # Calcula data de início baseado no período
-        data_fim = datetime.utcnow()
-        if periodo == "7d":
-            data_inicio = data_fim - timedelta(days=7)
-        elif periodo == "90d":
-            data_inicio = data_fim - timedelta(days=90)
-        elif periodo == "1y":
-            data_inicio = data_fim - timedelta(days=365)
-        elif periodo == "all":
-            data_inicio = datetime(2000, 1, 1)
-        else:  # 30d (default)
-            data_inicio = data_fim - timedelta(days=30)
-
-        if agrupamento == "dia":
-            format_str = "YYYY-MM-DD"
-        elif agrupamento == "semana":
-            format_str = "YYYY-WW"
-        else:
-            format_str = "YYYY-MM"
-
-        # Total de solicitações do médico
-        total_solicitacoes = (
-            db.query(func.count(SolicitacaoExame.id))
-            .filter(
-                SolicitacaoExame.medicoSolicitante == current_user.id,
-                SolicitacaoExame.dataSolicitacao >= data_inicio,
-            )
-            .scalar()
+        return DashboardService.obter_estatisticas(
+            db, current_user.id, periodo, agrupamento
         )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # Exames recebidos (com resultado)
-        exames_recebidos = (
-            db.query(func.count(ResultadoExame.id))
-            .join(SolicitacaoExame, ResultadoExame.solicitacaoId == SolicitacaoExame.id)
-            .filter(
-                SolicitacaoExame.medicoSolicitante == current_user.id,
-                ResultadoExame.dataUpload >= data_inicio,
-            )
-            .scalar()
-        )
 
-        # Laudos emitidos
-        laudos_emitidos = (
-            db.query(func.count(Laudo.id))
-            .filter(Laudo.medicoId == current_user.id, Laudo.dataEmissao >= data_inicio)
-            .scalar()
-        )
+@app.get("/dashboard/operacoes", tags=["Dashboard"])
+def obter_dashboard_operacoes(
+    periodo: Optional[str] = "30d",
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_funcionario),
+):
+    """Visão de operações da clínica para funcionários"""
+    try:
+        return DashboardService.obter_operacoes(db, periodo)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # Total de pacientes distintos
-        total_pacientes = (
-            db.query(func.count(func.distinct(SolicitacaoExame.pacienteId)))
-            .filter(
-                SolicitacaoExame.medicoSolicitante == current_user.id,
-                SolicitacaoExame.dataSolicitacao >= data_inicio,
-            )
-            .scalar()
-        )
 
-        # Solicitações por período/agrupamento
-        solicitacoes_por_agrupamento = (
-            db.query(
-                func.to_char(SolicitacaoExame.dataSolicitacao, format_str).label(
-                    "data_ponto"
-                ),
-                func.count(SolicitacaoExame.id).label("total"),
-            )
-            .filter(
-                SolicitacaoExame.medicoSolicitante == current_user.id,
-                SolicitacaoExame.dataSolicitacao >= data_inicio,
-            )
-            .group_by("data_ponto")
-            .order_by("data_ponto")
-            .all()
+@app.get("/analises/tempo-resposta", tags=["Dashboard"])
+def obter_tempos_resposta(
+    etapa: EtapaExame = EtapaExame.TOTAL,
+    agrupar_por: str = "laboratorio",  # laboratorio, exame ou medico
+    data_inicio: Optional[str] = None,  # Formato "YYYY-MM-DD"
+    data_fim: Optional[str] = None,
+    limite: int = 50,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_funcionario),
+):
+    """Percentis (p50/p90/p99) do tempo de resposta dos exames no período"""
+    try:
+        fim = date.fromisoformat(data_fim) if data_fim else date.today()
+        inicio = (
+            date.fromisoformat(data_inicio) if data_inicio else fim - timedelta(days=30)
         )
-
-        # Laudos por período/agrupamento
-        laudos_por_agrupamento = (
-            db.query(
-                func.to_char(Laudo.dataEmissao, format_str).label("data_ponto"),
-                func.count(Laudo.id).label("total"),
-            )
-            .filter(Laudo.medicoId == current_user.id, Laudo.dataEmissao >= data_inicio)
-            .group_by("data_ponto")
-            .order_by("data_ponto")
-            .all()
+        grupos = TempoRespostaService.percentis(
+            db, etapa, agrupar_por, inicio, fim, max(1, min(limite, 500))
         )
         return {
-            "resumo": {
-                "total_solicitacoes": total_solicitacoes or 0,
-                "exames_recebidos": exames_recebidos or 0,
-                "laudos_emitidos": laudos_emitidos or 0,
-                "total_pacientes": total_pacientes or 0,
-            },
-            "solicitacoes_por_agrupamento": [
-                {"data_ponto": row.data_ponto, "total": row.total}
-                for row in solicitacoes_por_agrupamento
-            ],
-            "laudos_por_agrupamento": [
-                {"data_ponto": row.data_ponto, "total": row.total}
-                for row in laudos_por_agrupamento
-            ],
+            "etapa": etapa.value,
+            "agrupar_por": agrupar_por,
+            "data_inicio": inicio.isoformat(),
+            "data_fim": fim.isoformat(),
+            "grupos": grupos,
         }
-    except Exception as e:
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
@@ -1824,6 +2404,83 @@ def _fetch_image_bytes(nome_arquivo: str) -> bytes:
         return f.read()
 
 
+# ==========================================
+# EVENTOS EM TEMPO REAL
+# ==========================================
+
+INTERVALO_KEEPALIVE = 15  # segundos
+
+
+@app.get("/eventos/stream", tags=["Eventos"])
+async def stream_eventos(token: str, request: Request):
+    """
+    Canal SSE com os eventos do usuário (resultado enviado, laudo finalizado,
+    status de solicitação). O token JWT vai na query string porque o
+    EventSource do navegador não envia headers.
+    """
+    usuario = await asyncio.to_thread(autenticar_token, token)
+    if usuario is None:
+        raise HTTPException(status_code=401, detail="Credenciais inválidas")
+    usuario_id = usuario.id
+
+    async def gerar():
+        fila = hub_eventos.conectar(usuario_id)
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    evento = await asyncio.wait_for(
+                        fila.get(), timeout=INTERVALO_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {evento['tipo']}\ndata: {json.dumps(evento)}\n\n"
+        finally:
+            hub_eventos.desconectar(usuario_id, fila)
+
+    return StreamingResponse(
+        gerar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/eventos/ws")
+async def websocket_eventos(websocket: WebSocket, token: str):
+    """Mesmo canal de /eventos/stream, via WebSocket"""
+    usuario = await asyncio.to_thread(autenticar_token, token)
+    if usuario is None:
+        await websocket.close(code=1008)
+        return
+    usuario_id = usuario.id
+
+    await websocket.accept()
+    fila = hub_eventos.conectar(usuario_id)
+    try:
+        while True:
+            try:
+                evento = await asyncio.wait_for(fila.get(), timeout=INTERVALO_KEEPALIVE)
+            except asyncio.TimeoutError:
+                evento = {"tipo": "ping", "dados": {}}
+            await websocket.send_json(evento)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        hub_eventos.desconectar(usuario_id, fila)
+
+
+# ==========================================
+# MÉTRICAS DE CACHE
+# ==========================================
+
+
+@app.get("/cache/metricas", tags=["Cache"])
+def obter_metricas_cache(current_user: Usuario = Depends(require_funcionario)):
+    """Hits, misses, coalescências e expulsões por namespace de cache"""
+    return metricas_cache()
+
+
 # ==========================================
 # ROTA DE SAÚDE
 # ==========================================
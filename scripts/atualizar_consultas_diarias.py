@@ -0,0 +1,49 @@
+"""
+Job de consolidação do rollup diário de consultas (dashboard de operações).
+
+Consolida em consultas_diarias os dias encerrados desde a última execução.
+Agende logo após a meia-noite; o dashboard também consolida sob demanda
+quando encontra um dia novo. --reprocessar N recalcula os últimos N dias
+mesmo que já tenham sido consolidados.
+
+Uso:
+    python scripts/atualizar_consultas_diarias.py [--reprocessar N]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core import modelos  # noqa: F401  (registra todos os modelos)
+from app.core.database import SessionLocal
+from app.gestao_consultas.services.consulta_diaria_service import (
+    REPROCESSAR_DIAS,
+    ConsultaDiariaService,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reprocessar", type=int, default=None, help="recalcula os últimos N dias")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        dias = ConsultaDiariaService.atualizar(
+            db,
+            reprocessar_dias=args.reprocessar or REPROCESSAR_DIAS,
+            forcar=args.reprocessar is not None,
+        )
+        print(f"Dias consolidados: {dias} (até {ConsultaDiariaService.processado_ate(db)})")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
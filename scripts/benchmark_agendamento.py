@@ -0,0 +1,126 @@
+"""
+Benchmark de agendamentos concorrentes para o mesmo médico.
+
+Dispara N reservas simultâneas (threads, uma sessão cada) disputando os
+mesmos horários de um médico e verifica que cada horário terminou com
+exatamente uma consulta ativa.
+
+Uso:
+    python scripts/benchmark_agendamento.py --medico ID --paciente ID \\
+        [--reservas 500] [--horarios 20] [--threads 50]
+
+ATENÇÃO: cria consultas reais daqui a 366 dias; use um banco descartável.
+As consultas criadas são removidas ao final.
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core import modelos  # noqa: F401  (registra todos os modelos)
+from app.core.database import DATABASE_URL
+from app.gestao_consultas.services.consulta_service import ConsultaService
+
+
+def reservar(fabrica, medico_id, paciente_id, data_hora):
+    db = fabrica()
+    try:
+        ConsultaService.agendar_consulta(db, paciente_id, medico_id, data_hora, "benchmark")
+        return True
+    except ValueError:
+        return False
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--medico", type=int, required=True)
+    parser.add_argument("--paciente", type=int, required=True)
+    parser.add_argument("--reservas", type=int, default=500)
+    parser.add_argument("--horarios", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=50)
+    args = parser.parse_args()
+
+    # Uma conexão por thread, para que as reservas disputem de fato o banco
+    engine = create_engine(DATABASE_URL, pool_size=args.threads, max_overflow=0)
+    fabrica = sessionmaker(bind=engine, autoflush=False)
+
+    base = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    base += timedelta(days=366)
+    # Horários espaçados pela duração do médico, para não se sobreporem
+    with engine.connect() as conn:
+        duracao = conn.execute(
+            text('SELECT "duracaoConsulta" FROM medicos WHERE "usuarioId" = :m'),
+            {"m": args.medico},
+        ).scalar() or 30
+    horarios = [base + timedelta(minutes=duracao * i) for i in range(args.horarios)]
+    tentativas = [horarios[i % len(horarios)] for i in range(args.reservas)]
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        resultados = list(
+            executor.map(lambda h: reservar(fabrica, args.medico, args.paciente, h), tentativas)
+        )
+    duracao = time.perf_counter() - inicio
+
+    with engine.begin() as conn:
+        por_horario = conn.execute(
+            text(
+                """
+                SELECT "dataHora", count(*) FROM consultas
+                WHERE "medicoId" = :medico AND "motivoConsulta" = 'benchmark'
+                  AND status IN ('AGENDADA', 'CONFIRMADA')
+                  AND "dataHora" >= :base
+                GROUP BY 1
+                """
+            ),
+            {"medico": args.medico, "base": base},
+        ).all()
+        conn.execute(
+            text(
+                """
+                DELETE FROM logs_prontuario WHERE "tipoEvento" = 'CONSULTA'
+                  AND "referenciaId" IN (
+                      SELECT id FROM consultas
+                      WHERE "medicoId" = :medico AND "motivoConsulta" = 'benchmark'
+                        AND "dataHora" >= :base)
+                """
+            ),
+            {"medico": args.medico, "base": base},
+        )
+        conn.execute(
+            text(
+                """
+                DELETE FROM consultas
+                WHERE "medicoId" = :medico AND "motivoConsulta" = 'benchmark'
+                  AND "dataHora" >= :base
+                """
+            ),
+            {"medico": args.medico, "base": base},
+        )
+
+    aceitas = sum(resultados)
+    duplicados = [h for h, n in por_horario if n > 1]
+    print(f"{args.reservas} reservas em {duracao:.2f}s ({args.reservas / duracao:.0f}/s)")
+    print(f"aceitas: {aceitas}  recusadas: {args.reservas - aceitas}  horários: {len(horarios)}")
+
+    if aceitas != len(horarios) or duplicados:
+        print(f"ERRO: double-booking ou horário perdido ({len(duplicados)} duplicados)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Benchmark das estatísticas do dashboard (/dashboard/stats).
+
+Compara as seis queries antigas (quatro contagens + dois GROUP BY com
+to_char) com a query única do DashboardService.
+
+Uso:
+    python scripts/benchmark_dashboard.py --seed 2000000   # popula o banco
+    python scripts/benchmark_dashboard.py                  # só mede
+
+ATENÇÃO: --seed insere dados sintéticos; use um banco descartável.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.gestao_exames.services.dashboard_service import DashboardService
+
+
+SEED_SQL = [
+    # Médicos e pacientes sintéticos
+    """
+    INSERT INTO usuarios (nome, email, cpf, "hashPassword", tipo)
+    SELECT 'Bench Medico ' || g, 'bench.medico' || g || '@bench.local',
+           'BM' || lpad(g::text, 9, '0'), 'x', 'MEDICO'
+    FROM generate_series(1, :medicos) g
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO medicos ("usuarioId", crm)
+    SELECT id, 'CRM-BENCH-' || id FROM usuarios
+    WHERE email LIKE 'bench.medico%' AND tipo = 'MEDICO'
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO usuarios (nome, email, cpf, "hashPassword", tipo)
+    SELECT 'Bench Paciente ' || g, 'bench.paciente' || g || '@bench.local',
+           'BP' || lpad(g::text, 9, '0'), 'x', 'PACIENTE'
+    FROM generate_series(1, :pacientes) g
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO pacientes ("usuarioId")
+    SELECT id FROM usuarios
+    WHERE email LIKE 'bench.paciente%' AND tipo = 'PACIENTE'
+    ON CONFLICT DO NOTHING
+    """,
+    # Solicitações espalhadas pelos últimos 3 anos
+    """
+    INSERT INTO solicitacoes_exame ("codigoSolicitacao", "pacienteId", "medicoSolicitante",
+                                    "nomeExame", status, "dataSolicitacao")
+    SELECT 'B' || md5(random()::text || g)::varchar(9),
+           (SELECT array_agg("usuarioId") FROM pacientes)[1 + (g % :pacientes)],
+           (SELECT array_agg("usuarioId") FROM medicos)[1 + (g % :medicos)],
+           'Exame ' || (g % 50),
+           'RESULTADO_ENVIADO',
+           now() - (random() * interval '1095 days')
+    FROM generate_series(1, :linhas) g
+    """,
+    """
+    INSERT INTO resultados_exame ("solicitacaoId", "dataRealizacao", "nomeLaboratorio",
+                                  "arquivoUrl", "dataUpload")
+    SELECT s.id, s."dataSolicitacao" + interval '1 day', 'Lab ' || (s.id % 10),
+           'bench://' || s.id, s."dataSolicitacao" + interval '2 days'
+    FROM solicitacoes_exame s
+    WHERE s."codigoSolicitacao" LIKE 'B%'
+    """,
+    """
+    INSERT INTO laudos ("medicoId", "pacienteId", titulo, descricao, status, "dataEmissao")
+    SELECT s."medicoSolicitante", s."pacienteId", 'Laudo ' || s.id, 'Bench',
+           'FINALIZADO', s."dataSolicitacao" + interval '3 days'
+    FROM solicitacoes_exame s
+    WHERE s."codigoSolicitacao" LIKE 'B%' AND s.id % 2 = 0
+    """,
+    "ANALYZE",
+]
+
+# Reproduz as seis queries executadas antes da consolidação
+LEGADO_SQL = [
+    """SELECT count(id) FROM solicitacoes_exame
+       WHERE "medicoSolicitante" = :m AND "dataSolicitacao" >= :i""",
+    """SELECT count(r.id) FROM resultados_exame r
+       JOIN solicitacoes_exame s ON r."solicitacaoId" = s.id
+       WHERE s."medicoSolicitante" = :m AND r."dataUpload" >= :i""",
+    """SELECT count(id) FROM laudos WHERE "medicoId" = :m AND "dataEmissao" >= :i""",
+    """SELECT count(DISTINCT "pacienteId") FROM solicitacoes_exame
+       WHERE "medicoSolicitante" = :m AND "dataSolicitacao" >= :i""",
+    """SELECT to_char("dataSolicitacao", 'YYYY-MM') AS p, count(id) FROM solicitacoes_exame
+       WHERE "medicoSolicitante" = :m AND "dataSolicitacao" >= :i GROUP BY p ORDER BY p""",
+    """SELECT to_char("dataEmissao", 'YYYY-MM') AS p, count(id) FROM laudos
+       WHERE "medicoId" = :m AND "dataEmissao" >= :i GROUP BY p ORDER BY p""",
+]
+
+
+def medir(fn, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), max(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, default=0, help="linhas de solicitação a inserir")
+    parser.add_argument("--medicos", type=int, default=200)
+    parser.add_argument("--pacientes", type=int, default=50000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.seed:
+            print(f"Populando {args.seed} solicitações...")
+            for sql in SEED_SQL:
+                db.execute(
+                    text(sql),
+                    {
+                        "medicos": args.medicos,
+                        "pacientes": args.pacientes,
+                        "linhas": args.seed,
+                    },
+                )
+                db.commit()
+
+        medico_id = db.execute(
+            text(
+                """SELECT "medicoSolicitante" FROM solicitacoes_exame
+                   GROUP BY 1 ORDER BY count(*) DESC LIMIT 1"""
+            )
+        ).scalar()
+        if medico_id is None:
+            print("Banco sem solicitações. Rode com --seed.")
+            return 1
+
+        for periodo in ("30d", "1y", "all"):
+            data_inicio, _ = DashboardService.calcular_periodo(periodo)
+
+            def legado():
+                for sql in LEGADO_SQL:
+                    db.execute(text(sql), {"m": medico_id, "i": data_inicio}).all()
+
+            def consolidado():
+                DashboardService.obter_estatisticas(db, medico_id, periodo, "mes")
+
+            med_l, max_l = medir(legado, args.repeticoes)
+            med_c, max_c = medir(consolidado, args.repeticoes)
+            print(
+                f"periodo={periodo:>4}  legado: mediana {med_l:8.2f} ms (max {max_l:8.2f})"
+                f"  |  consolidado: mediana {med_c:8.2f} ms (max {max_c:8.2f})"
+            )
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Microbenchmark do cálculo de horários disponíveis (sem banco).
+
+Compara o algoritmo antigo de AgendaService.obter_horarios_disponiveis
+(loop dia a dia, mapa de dias recriado a cada iteração, varredura de todas
+as linhas de Agenda por dia, filtro em Python) com o ModeloSemanal.
+
+Uso:
+    python scripts/benchmark_disponibilidade.py [--dias 365] [--slots 40]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time as relogio
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.gestao_perfis.models.agenda import DiaSemana
+from app.gestao_consultas.services.motor_disponibilidade import ModeloSemanal
+
+DIAS = list(DiaSemana)
+
+
+def legado(horarios_agenda, consultas, data_inicio, data_fim):
+    """Cópia do algoritmo antigo, sem o acesso ao banco"""
+    horarios_possiveis = []
+    data_atual = data_inicio
+    while data_atual <= data_fim:
+        dia_semana_map = {
+            0: DiaSemana.SEGUNDA,
+            1: DiaSemana.TERCA,
+            2: DiaSemana.QUARTA,
+            3: DiaSemana.QUINTA,
+            4: DiaSemana.SEXTA,
+            5: DiaSemana.SABADO,
+            6: DiaSemana.DOMINGO,
+        }
+        dia_semana = dia_semana_map.get(data_atual.weekday())
+        for horario in horarios_agenda:
+            if horario.diaSemana == dia_semana:
+                horarios_possiveis.append(
+                    datetime.combine(data_atual.date(), horario.hora)
+                )
+        data_atual += timedelta(days=1)
+
+    horarios_ocupados = set(consultas)
+    return sorted(h for h in horarios_possiveis if h not in horarios_ocupados)
+
+
+def motor(horarios_agenda, consultas, data_inicio, data_fim):
+    modelo = ModeloSemanal(
+        [(h.diaSemana, h.hora) for h in horarios_agenda], duracao_minutos=30
+    )
+    return modelo.disponiveis(data_inicio.date(), data_fim.date(), consultas)
+
+
+def medir(fn, repeticoes, *args):
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = relogio.perf_counter()
+        resultado = fn(*args)
+        tempos.append((relogio.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--slots", type=int, default=40, help="slots por semana")
+    parser.add_argument("--ocupacao", type=float, default=0.3)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    horarios_agenda = []
+    for i in range(args.slots):
+        dia = DIAS[i % 5]
+        hora = time(8 + (i // 5) % 10, 30 * (i // 50 % 2))
+        horarios_agenda.append(SimpleNamespace(diaSemana=dia, hora=hora))
+
+    data_inicio = datetime(2025, 1, 1)
+    data_fim = data_inicio + timedelta(days=args.dias)
+
+    todos = legado(horarios_agenda, [], data_inicio, data_fim)
+    consultas = random.sample(todos, int(len(todos) * args.ocupacao))
+
+    t_legado, r_legado = medir(
+        legado, args.repeticoes, horarios_agenda, consultas, data_inicio, data_fim
+    )
+    t_motor, r_motor = medir(
+        motor, args.repeticoes, horarios_agenda, consultas, data_inicio, data_fim
+    )
+
+    print(f"janela: {args.dias} dias, {args.slots} slots/semana, {len(consultas)} consultas")
+    print(f"legado: {t_legado:8.2f} ms  ({len(r_legado)} horários)")
+    print(f"motor:  {t_motor:8.2f} ms  ({len(r_motor)} horários)")
+    print(f"speedup: {t_legado / t_motor:.1f}x")
+
+    if r_legado != r_motor:
+        print("ERRO: resultados divergentes")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
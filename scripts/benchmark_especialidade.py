@@ -0,0 +1,184 @@
+"""
+Benchmark da busca de horários livres por especialidade
+(/especialidades/{id}/horarios-disponiveis).
+
+Mede AgendaService.obter_horarios_disponiveis_especialidade com centenas
+de médicos na mesma especialidade, agenda de segunda a sexta e parte dos
+horários já ocupados. Meta: mediana abaixo de 100 ms no período máximo.
+
+Uso:
+    python scripts/benchmark_especialidade.py --seed --medicos 300   # popula
+    python scripts/benchmark_especialidade.py                        # só mede
+
+ATENÇÃO: --seed insere dados sintéticos; use um banco descartável.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.gestao_consultas.services.agenda_service import (
+    MAX_DIAS_BUSCA_ESPECIALIDADE,
+    AgendaService,
+)
+
+ESPECIALIDADE = "Bench Especialidade"
+META_MS = 100
+
+SEED_SQL = [
+    """
+    INSERT INTO especialidades (nome)
+    SELECT :especialidade
+    WHERE NOT EXISTS (SELECT 1 FROM especialidades WHERE nome = :especialidade)
+    """,
+    """
+    INSERT INTO usuarios (nome, email, cpf, "hashPassword", tipo)
+    SELECT 'Bench Especialista ' || g, 'bench.especialista' || g || '@bench.local',
+           'BE' || lpad(g::text, 9, '0'), 'x', 'MEDICO'
+    FROM generate_series(1, :medicos) g
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO medicos ("usuarioId", crm, "duracaoConsulta")
+    SELECT id, 'CRM-BENCH-E-' || id, 30 FROM usuarios
+    WHERE email LIKE 'bench.especialista%'
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO medico_especialidades ("medicoId", "especialidadeId")
+    SELECT u.id, e.id
+    FROM usuarios u, especialidades e
+    WHERE u.email LIKE 'bench.especialista%' AND e.nome = :especialidade
+    ON CONFLICT DO NOTHING
+    """,
+    # Segunda a sexta, das 8h às 18h, slots de 30 minutos
+    """
+    INSERT INTO agendas ("medicoId", "diaSemana", hora)
+    SELECT u.id, CAST(d AS diasemana), time '08:00' + s * interval '30 minutes'
+    FROM usuarios u
+    CROSS JOIN unnest(ARRAY['SEGUNDA', 'TERCA', 'QUARTA', 'QUINTA', 'SEXTA']) d
+    CROSS JOIN generate_series(0, 19) s
+    WHERE u.email LIKE 'bench.especialista%'
+      AND NOT EXISTS (SELECT 1 FROM agendas a WHERE a."medicoId" = u.id)
+    """,
+    """
+    INSERT INTO usuarios (nome, email, cpf, "hashPassword", tipo)
+    VALUES ('Bench Paciente Especialidade', 'bench.paciente.esp@bench.local',
+            'BPE00000001', 'x', 'PACIENTE')
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO pacientes ("usuarioId")
+    SELECT id FROM usuarios WHERE email = 'bench.paciente.esp@bench.local'
+    ON CONFLICT DO NOTHING
+    """,
+    # Ocupa a fração pedida dos horários das próximas semanas
+    """
+    INSERT INTO consultas ("pacienteId", "medicoId", "dataHora", status, "motivoConsulta")
+    SELECT p.id, a."medicoId", CAST(dia AS date) + a.hora, 'AGENDADA', 'benchmark'
+    FROM agendas a
+    JOIN usuarios u ON u.id = a."medicoId" AND u.email LIKE 'bench.especialista%'
+    CROSS JOIN (SELECT id FROM usuarios WHERE email = 'bench.paciente.esp@bench.local') p
+    CROSS JOIN generate_series(
+        CAST(:hoje AS date), CAST(:hoje AS date) + :dias, interval '1 day'
+    ) dia
+    WHERE EXTRACT(ISODOW FROM dia) = array_position(
+              ARRAY['SEGUNDA', 'TERCA', 'QUARTA', 'QUINTA', 'SEXTA', 'SABADO', 'DOMINGO'],
+              CAST(a."diaSemana" AS text))
+      AND random() < :ocupacao
+    ON CONFLICT DO NOTHING
+    """,
+    "ANALYZE",
+]
+
+
+def medir(fn, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), max(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", action="store_true", help="popula o banco")
+    parser.add_argument("--medicos", type=int, default=300)
+    parser.add_argument("--ocupacao", type=float, default=0.8)
+    parser.add_argument("--dias-ocupados", type=int, default=14)
+    parser.add_argument("--limite", type=int, default=20)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.seed:
+            print(f"Populando {args.medicos} médicos...")
+            for sql in SEED_SQL:
+                db.execute(
+                    text(sql),
+                    {
+                        "especialidade": ESPECIALIDADE,
+                        "medicos": args.medicos,
+                        "hoje": datetime.now().date(),
+                        "dias": args.dias_ocupados,
+                        "ocupacao": args.ocupacao,
+                    },
+                )
+                db.commit()
+
+        especialidade_id = db.execute(
+            text("SELECT id FROM especialidades WHERE nome = :nome"),
+            {"nome": ESPECIALIDADE},
+        ).scalar()
+        if especialidade_id is None:
+            print("Banco sem a especialidade de benchmark. Rode com --seed.")
+            return 1
+        medicos = db.execute(
+            text(
+                """SELECT count(*) FROM medico_especialidades
+                   WHERE "especialidadeId" = :e"""
+            ),
+            {"e": especialidade_id},
+        ).scalar()
+
+        hoje = datetime.now()
+        piores = []
+        for dias in (7, MAX_DIAS_BUSCA_ESPECIALIDADE):
+            fim = hoje + timedelta(days=dias - 1)
+
+            def buscar():
+                return AgendaService.obter_horarios_disponiveis_especialidade(
+                    db, especialidade_id, hoje, fim, args.limite
+                )
+
+            encontrados = len(buscar())
+            mediana, maximo = medir(buscar, args.repeticoes)
+            piores.append(mediana)
+            print(
+                f"{medicos} médicos, {dias:>2} dias: mediana {mediana:8.2f} ms "
+                f"(max {maximo:8.2f})  {encontrados} horários"
+            )
+
+        if max(piores) >= META_MS:
+            print(f"ACIMA DA META de {META_MS} ms")
+            return 1
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Benchmark da fila de laudos com vários médicos puxando itens ao mesmo tempo.
+
+Cada thread (uma sessão cada) reserva lotes até a fila esvaziar e
+"lauda" o lote removendo os itens da fila, como faria a criação do laudo.
+Mede reservas/s e itens/s e verifica que nenhum item foi entregue a dois
+médicos.
+
+Uso:
+    python scripts/benchmark_fila_laudos.py --medicos 1,2,3 \\
+        [--threads 20] [--lote 5]
+
+ATENÇÃO: esvazia a fila sem criar laudos; use um banco descartável. Ao
+final a fila é reconstruída a partir dos resultados sem laudo.
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import modelos  # noqa: F401  (registra todos os modelos)
+from app.core.database import DATABASE_URL
+from app.gestao_exames.services.fila_laudo_service import FilaLaudoService
+
+
+def trabalhar(fabrica, medico_id, lote):
+    """Reserva e lauda até não sobrar item; retorna (reservas, ids laudados)"""
+    db = fabrica()
+    reservas, laudados = 0, []
+    try:
+        while True:
+            itens = FilaLaudoService.reservar(db, medico_id, lote)
+            if not itens:
+                return reservas, laudados
+            reservas += 1
+            ids = [i.resultadoExameId for i in itens]
+            FilaLaudoService.remover(db, ids)
+            db.commit()
+            laudados.extend(ids)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--medicos", required=True, help="IDs de médicos separados por vírgula")
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--lote", type=int, default=5)
+    args = parser.parse_args()
+
+    medicos = [int(m) for m in args.medicos.split(",")]
+
+    # Uma conexão por thread, para que as reservas disputem de fato o banco
+    engine = create_engine(DATABASE_URL, pool_size=args.threads, max_overflow=0)
+    fabrica = sessionmaker(bind=engine, autoflush=False)
+
+    db = fabrica()
+    try:
+        FilaLaudoService.reconstruir(db)
+        total = FilaLaudoService.contar_livres(db)
+    finally:
+        db.close()
+    if not total:
+        print("Fila vazia: envie resultados de exame antes de rodar o benchmark.")
+        return 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        resultados = list(
+            executor.map(
+                lambda i: trabalhar(fabrica, medicos[i % len(medicos)], args.lote),
+                range(args.threads),
+            )
+        )
+    duracao = time.perf_counter() - inicio
+
+    reservas = sum(r for r, _ in resultados)
+    entregues = Counter(i for _, ids in resultados for i in ids)
+    duplicados = [i for i, n in entregues.items() if n > 1]
+
+    db = fabrica()
+    try:
+        FilaLaudoService.reconstruir(db)
+    finally:
+        db.close()
+
+    print(f"{total} itens, {args.threads} threads, lote {args.lote}: {duracao:.2f}s")
+    print(f"reservas: {reservas} ({reservas / duracao:.0f}/s)  itens: {len(entregues)} ({len(entregues) / duracao:.0f}/s)")
+
+    if duplicados or len(entregues) != total:
+        print(f"ERRO: {len(duplicados)} itens entregues em dobro, {total - len(entregues)} perdidos")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Benchmark da serialização das páginas de listagem (/exames e /laudos).
+
+Compara, para uma página de itens sintéticos (não usa o banco):
+- legado: dicts com .isoformat(), PaginatedResponse[dict].create, a
+  revalidação + jsonable_encoder que o FastAPI faz com o response_model e
+  o json.dumps do JSONResponse;
+- orjson: modelos tipados com model_construct e RespostaORJSON.
+
+Uso:
+    python scripts/benchmark_serializacao.py [--itens 100] [--repeticoes 500]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.respostas import RespostaORJSON
+from app.gestao_exames.schemas.exames_schemas import (
+    ExameResponse,
+    LaudoResponse,
+    ResultadoExameResponse,
+)
+from app.gestao_perfis.schemas.perfis_schemas import PaginatedResponse
+
+DESCRICAO = "Hemograma com valores dentro dos padrões de referência. " * 20
+
+
+def gerar_resultados(n):
+    """Objetos com os mesmos atributos que as rotas leem do ORM"""
+    agora = datetime(2025, 10, 1, 8, 30, 15, 123456)
+    return [
+        SimpleNamespace(
+            id=i,
+            solicitacaoId=i,
+            solicitacao=SimpleNamespace(
+                id=i,
+                codigoSolicitacao=f"K2XpJ9f{i:03d}",
+                pacienteId=1000 + i,
+                medicoSolicitante=7,
+                nomeExame="Hemograma Completo",
+                paciente=SimpleNamespace(
+                    usuario=SimpleNamespace(nome=f"Paciente {i}", cpf="12345678900")
+                ),
+                medico=SimpleNamespace(
+                    crm="CRM/AL 12839", usuario=SimpleNamespace(nome="Dra. Ana")
+                ),
+            ),
+            dataRealizacao=agora - timedelta(hours=i),
+            dataUpload=agora - timedelta(hours=i, minutes=-30),
+            nomeLaboratorio="Laboratório São Lucas",
+            nomeArquivo=f"exame_{i}.pdf",
+            arquivoUrl=f"/uploads/exames/exame_{i}.pdf",
+            observacoes="Exame realizado em jejum de 12h",
+        )
+        for i in range(n)
+    ]
+
+
+# ---------- /exames ----------
+
+
+def exames_legado(resultados):
+    return [
+        {
+            "id": r.id,
+            "solicitacao_id": r.solicitacao.id,
+            "codigo_solicitacao": r.solicitacao.codigoSolicitacao,
+            "paciente_id": r.solicitacao.pacienteId,
+            "paciente_nome": r.solicitacao.paciente.usuario.nome,
+            "paciente_cpf": r.solicitacao.paciente.usuario.cpf,
+            "medico_id": r.solicitacao.medicoSolicitante,
+            "medico_nome": r.solicitacao.medico.usuario.nome,
+            "medico_crm": r.solicitacao.medico.crm,
+            "nome_exame": r.solicitacao.nomeExame,
+            "data_realizacao": r.dataRealizacao.isoformat(),
+            "data_upload": r.dataUpload.isoformat(),
+            "nome_laboratorio": r.nomeLaboratorio,
+            "nome_arquivo": r.nomeArquivo,
+            "url_arquivo": r.arquivoUrl,
+            "observacoes": r.observacoes,
+            "tem_laudo": r.id % 2 == 0,
+        }
+        for r in resultados
+    ]
+
+
+def exames_tipados(resultados):
+    return [
+        ResultadoExameResponse.model_construct(
+            id=r.id,
+            solicitacao_id=r.solicitacao.id,
+            codigo_solicitacao=r.solicitacao.codigoSolicitacao,
+            paciente_id=r.solicitacao.pacienteId,
+            paciente_nome=r.solicitacao.paciente.usuario.nome,
+            paciente_cpf=r.solicitacao.paciente.usuario.cpf,
+            medico_id=r.solicitacao.medicoSolicitante,
+            medico_nome=r.solicitacao.medico.usuario.nome,
+            medico_crm=r.solicitacao.medico.crm,
+            nome_exame=r.solicitacao.nomeExame,
+            data_realizacao=r.dataRealizacao,
+            data_upload=r.dataUpload,
+            nome_laboratorio=r.nomeLaboratorio,
+            nome_arquivo=r.nomeArquivo,
+            url_arquivo=r.arquivoUrl,
+            observacoes=r.observacoes,
+            tem_laudo=r.id % 2 == 0,
+        )
+        for r in resultados
+    ]
+
+
+# ---------- /laudos (3 exames por laudo) ----------
+
+
+def laudos_legado(resultados):
+    return [
+        {
+            "id": i,
+            "paciente_id": r.solicitacao.pacienteId,
+            "paciente_nome": r.solicitacao.paciente.usuario.nome,
+            "paciente_cpf": r.solicitacao.paciente.usuario.cpf,
+            "medico_id": 7,
+            "medico_nome": "Dra. Ana",
+            "medico_crm": "CRM/AL 12839",
+            "titulo": "Laudo de Hemograma Completo",
+            "descricao": DESCRICAO,
+            "status": "FINALIZADO",
+            "data_emissao": r.dataUpload.isoformat(),
+            "exames": [
+                {
+                    "id": e.id,
+                    "solicitacao_id": e.solicitacaoId,
+                    "codigo_solicitacao": e.solicitacao.codigoSolicitacao,
+                    "nome_exame": e.solicitacao.nomeExame,
+                    "data_realizacao": e.dataRealizacao.isoformat(),
+                    "nome_laboratorio": e.nomeLaboratorio,
+                    "nome_arquivo": e.nomeArquivo,
+                    "url_arquivo": e.arquivoUrl,
+                }
+                for e in (r, r, r)
+            ],
+        }
+        for i, r in enumerate(resultados)
+    ]
+
+
+def laudos_tipados(resultados):
+    return [
+        LaudoResponse.model_construct(
+            id=i,
+            paciente_id=r.solicitacao.pacienteId,
+            paciente_nome=r.solicitacao.paciente.usuario.nome,
+            paciente_cpf=r.solicitacao.paciente.usuario.cpf,
+            medico_id=7,
+            medico_nome="Dra. Ana",
+            medico_crm="CRM/AL 12839",
+            titulo="Laudo de Hemograma Completo",
+            descricao=DESCRICAO,
+            status="FINALIZADO",
+            data_emissao=r.dataUpload,
+            exames=[
+                ExameResponse.model_construct(
+                    id=e.id,
+                    solicitacao_id=e.solicitacaoId,
+                    codigo_solicitacao=e.solicitacao.codigoSolicitacao,
+                    nome_exame=e.solicitacao.nomeExame,
+                    data_realizacao=e.dataRealizacao,
+                    nome_laboratorio=e.nomeLaboratorio,
+                    nome_arquivo=e.nomeArquivo,
+                    url_arquivo=e.arquivoUrl,
+                )
+                for e in (r, r, r)
+            ],
+        )
+        for i, r in enumerate(resultados)
+    ]
+
+
+async def renderizar_legado(campo, itens):
+    """O que a rota antiga + FastAPI fazem com o retorno"""
+    pagina = PaginatedResponse.create(items=itens, total=1000, page=1, limit=len(itens))
+    conteudo = await serialize_response(
+        field=campo, response_content=pagina, is_coroutine=True
+    )
+    return JSONResponse(conteudo).body
+
+
+def renderizar_orjson(itens):
+    pagina = PaginatedResponse.construir(
+        items=itens, total=1000, page=1, limit=len(itens)
+    )
+    return RespostaORJSON(pagina).body
+
+
+def medir(fn, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), max(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--itens", type=int, default=100)
+    parser.add_argument("--repeticoes", type=int, default=500)
+    args = parser.parse_args()
+
+    resultados = gerar_resultados(args.itens)
+    campo = create_model_field(
+        "Response", PaginatedResponse[dict], mode="serialization"
+    )
+    loop = asyncio.new_event_loop()
+
+    for rota, legado, tipado in (
+        ("/exames", exames_legado, exames_tipados),
+        ("/laudos", laudos_legado, laudos_tipados),
+    ):
+        corpo_legado = loop.run_until_complete(
+            renderizar_legado(campo, legado(resultados))
+        )
+        corpo_orjson = renderizar_orjson(tipado(resultados))
+
+        med_l, max_l = medir(
+            lambda: loop.run_until_complete(
+                renderizar_legado(campo, legado(resultados))
+            ),
+            args.repeticoes,
+        )
+        med_o, max_o = medir(
+            lambda: renderizar_orjson(tipado(resultados)), args.repeticoes
+        )
+        print(
+            f"{rota:<8} {args.itens} itens  legado: mediana {med_l:7.3f} ms (max {max_l:7.3f})"
+            f"  |  orjson: mediana {med_o:7.3f} ms (max {max_o:7.3f})"
+            f"  |  {med_l / med_o:4.1f}x  ({len(corpo_legado)} / {len(corpo_orjson)} bytes)"
+        )
+
+    loop.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
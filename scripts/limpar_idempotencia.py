@@ -0,0 +1,39 @@
+"""
+Limpeza das respostas guardadas de Idempotency-Key já vencidas.
+
+As chaves valem por TTL_HORAS (IdempotenciaService); depois disso a linha
+só ocupa espaço (uma chave vencida reutilizada é reaproveitada mesmo sem a
+limpeza). Agende a cada hora, por exemplo.
+
+Uso:
+    python scripts/limpar_idempotencia.py
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import SessionLocal
+from app.idempotencia.services.idempotencia_service import IdempotenciaService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        apagadas = IdempotenciaService.limpar_expiradas(db)
+        print(f"Chaves de idempotência vencidas apagadas: {apagadas}")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
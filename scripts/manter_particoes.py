@@ -0,0 +1,83 @@
+"""
+Job de manutenção das partições mensais de logs_prontuario.
+
+Para rodar diariamente via cron: cria as partições dos próximos meses,
+indexa com BRIN as partições antigas e, com --arquivar-meses, desanexa e
+exporta para CSV gzip as partições além do período de retenção.
+Também permite consultar ou restaurar um mês já arquivado.
+
+Uso:
+    python scripts/manter_particoes.py [--brin-meses N] [--arquivar-meses N]
+    python scripts/manter_particoes.py --consultar AAAA-MM [--paciente ID]
+    python scripts/manter_particoes.py --restaurar AAAA-MM
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import SessionLocal
+from app.gestao_consultas.services.particionamento_service import (
+    MESES_A_FRENTE,
+    MESES_BRIN,
+    ParticionamentoService,
+)
+
+
+def _mes(valor: str):
+    return datetime.strptime(valor, "%Y-%m").date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--meses-a-frente", type=int, default=MESES_A_FRENTE)
+    parser.add_argument("--brin-meses", type=int, default=MESES_BRIN,
+                        help="indexa com BRIN partições com mais de N meses")
+    parser.add_argument("--arquivar-meses", type=int, default=None,
+                        help="arquiva partições com mais de N meses")
+    parser.add_argument("--consultar", type=_mes, default=None, metavar="AAAA-MM",
+                        help="lista os eventos de um mês arquivado (JSON por linha)")
+    parser.add_argument("--paciente", type=int, default=None,
+                        help="filtra --consultar por paciente")
+    parser.add_argument("--restaurar", type=_mes, default=None, metavar="AAAA-MM",
+                        help="reanexa um mês arquivado")
+    args = parser.parse_args()
+
+    if args.consultar:
+        for evento in ParticionamentoService.consultar_arquivo(
+            args.consultar, paciente_id=args.paciente
+        ):
+            print(json.dumps(evento, ensure_ascii=False))
+        return 0
+
+    db = SessionLocal()
+    try:
+        if args.restaurar:
+            nome = ParticionamentoService.restaurar_particao(db, args.restaurar)
+            print(f"Partição {nome} restaurada.")
+            return 0
+
+        criadas = ParticionamentoService.garantir_particoes(db, args.meses_a_frente)
+        print(f"Partições criadas: {len(criadas)}")
+
+        indices = ParticionamentoService.criar_indices_brin(db, args.brin_meses)
+        print(f"Partições com índice BRIN: {len(indices)}")
+
+        if args.arquivar_meses is not None:
+            arquivos = ParticionamentoService.arquivar_antigas(db, args.arquivar_meses)
+            for arquivo in arquivos:
+                print(f"Arquivada: {arquivo}")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Job de recuperação dos rollups do dashboard.
+
+Recalcula estatisticas_diarias_medico e pacientes_diarios_medico a partir
+das tabelas de origem. Pode rodar via cron (ex.: diariamente com --dias 7)
+ou uma única vez sem argumentos para popular o histórico completo.
+
+Uso:
+    python scripts/reconstruir_estatisticas.py [--dias N] [--medico ID]
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core import modelos  # noqa: F401  (registra todos os modelos)
+from app.core.database import SessionLocal
+from app.gestao_exames.services.estatistica_service import EstatisticaService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dias", type=int, default=None, help="recalcula só os últimos N dias")
+    parser.add_argument("--medico", type=int, default=None, help="recalcula só um médico")
+    args = parser.parse_args()
+
+    desde = date.today() - timedelta(days=args.dias) if args.dias else None
+
+    db = SessionLocal()
+    try:
+        EstatisticaService.reconstruir(db, desde=desde, medico_id=args.medico)
+        print("Rollups do dashboard recalculados.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Job de recuperação da fila de laudos.
+
+Recalcula fila_laudos com todos os resultados de exame que ainda não têm
+laudo. Rode uma vez para popular a fila com o histórico existente.
+Reservas em andamento são descartadas.
+
+Uso:
+    python scripts/reconstruir_fila_laudos.py
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core import modelos  # noqa: F401  (registra todos os modelos)
+from app.core.database import SessionLocal
+from app.gestao_exames.services.fila_laudo_service import FilaLaudoService
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__).parse_args()
+
+    db = SessionLocal()
+    try:
+        FilaLaudoService.reconstruir(db)
+        print(f"Fila de laudos recalculada: {FilaLaudoService.contar_livres(db)} exames.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
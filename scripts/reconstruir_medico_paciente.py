@@ -0,0 +1,40 @@
+"""
+Job de recuperação do relacionamento médico-paciente.
+
+Recalcula medico_paciente a partir de solicitações, consultas e laudos.
+Rode uma vez para popular o histórico existente ou com --medico para
+corrigir um médico específico.
+
+Uso:
+    python scripts/reconstruir_medico_paciente.py [--medico ID]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import SessionLocal
+from app.gestao_perfis.services.medico_paciente_service import MedicoPacienteService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--medico", type=int, default=None, help="recalcula só um médico")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        MedicoPacienteService.reconstruir(db, medico_id=args.medico)
+        print("Relacionamentos médico-paciente recalculados.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
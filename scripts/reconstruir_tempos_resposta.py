@@ -0,0 +1,44 @@
+"""
+Job de recuperação dos histogramas de tempo de resposta dos exames.
+
+Recalcula tempos_resposta_diarios a partir de solicitações, resultados e
+laudos. Pode rodar via cron (ex.: diariamente com --dias 7) ou uma única
+vez sem argumentos para popular o histórico completo.
+
+Uso:
+    python scripts/reconstruir_tempos_resposta.py [--dias N]
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core import modelos  # noqa: F401  (registra todos os modelos)
+from app.core.database import SessionLocal
+from app.gestao_exames.services.tempo_resposta_service import TempoRespostaService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dias", type=int, default=None, help="recalcula só os últimos N dias")
+    args = parser.parse_args()
+
+    desde = date.today() - timedelta(days=args.dias) if args.dias else None
+
+    db = SessionLocal()
+    try:
+        TempoRespostaService.reconstruir(db, desde=desde)
+        print(f"Tempos de resposta recalculados desde {desde or 'o início'}.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Job de recuperação da linha do tempo do prontuário.
+
+Recalcula timeline_paciente a partir de consultas, solicitações,
+resultados e laudos. Rode uma vez para popular o histórico existente ou
+com --paciente para corrigir um paciente específico.
+
+Uso:
+    python scripts/reconstruir_timeline.py [--paciente ID]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import SessionLocal
+from app.gestao_consultas.services.timeline_service import TimelineService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paciente", type=int, default=None, help="recalcula só um paciente")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        TimelineService.reconstruir(db, paciente_id=args.paciente)
+        print("Linha do tempo recalculada.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Barramento: reconexão da escuta descarta o estado local"""
+
+from app.core import cache
+from app.core.barramento import Barramento
+
+
+class BackendInstavel:
+    """Cai na primeira conexão e para na segunda"""
+
+    remoto = True
+
+    def __init__(self):
+        self.conexoes = 0
+
+    def publicar(self, canal, mensagem):
+        pass
+
+    def escutar(self, canais, ao_receber, parar, ao_conectar):
+        self.conexoes += 1
+        ao_conectar()
+        if self.conexoes == 1:
+            raise ConnectionError("conexão perdida")
+        parar.set()
+
+
+def test_reconexao_chama_callbacks_so_depois_da_primeira_conexao():
+    barramento = Barramento(BackendInstavel())
+    chamadas = []
+    barramento.ao_reconectar(lambda: chamadas.append(1))
+
+    barramento._loop()
+
+    assert barramento.backend.conexoes == 2
+    assert chamadas == [1]
+
+
+def test_limpar_tudo_esvazia_todos_os_namespaces():
+    a = cache.obter_cache("teste_reconexao_a")
+    b = cache.obter_cache("teste_reconexao_b")
+    a.obter((1,), lambda: "x")
+    b.obter((2,), lambda: "y")
+
+    cache.limpar_tudo()
+
+    assert a.metricas()["itens"] == 0
+    assert b.metricas()["itens"] == 0
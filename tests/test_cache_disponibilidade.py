@@ -0,0 +1,25 @@
+"""Bitset de disponibilidade por semana"""
+
+from app.gestao_consultas.services.cache_disponibilidade import SemanaDisponivel
+
+SLOTS = [0, 30, 60, 90]
+
+
+def test_ocupar_duas_vezes_e_liberar_devolve_o_slot():
+    semana = SemanaDisponivel(list(SLOTS), 30, [], list(SLOTS))
+
+    semana.ocupar(30)
+    semana.ocupar(30)
+    assert semana.ocupadas == [30]
+    assert semana.disponiveis(0, 120) == [0, 60, 90]
+
+    semana.liberar(30)
+    assert semana.disponiveis(0, 120) == SLOTS
+
+
+def test_evento_de_consulta_ja_carregada():
+    semana = SemanaDisponivel(list(SLOTS), 30, [60], [0, 30, 90])
+
+    semana.ocupar(60)
+    semana.liberar(60)
+    assert semana.disponiveis(0, 120) == SLOTS
@@ -0,0 +1,87 @@
+"""Mudanças de status de consulta: disponibilidade e timeline"""
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.gestao_consultas.models.consulta import Consulta, StatusConsulta
+from app.gestao_consultas.models.log_prontuario import TipoEvento
+from app.gestao_consultas.services import consulta_service
+from app.gestao_consultas.services.consulta_service import ConsultaService
+
+DATA_HORA = datetime(2030, 3, 4, 9, 0)
+
+
+def _sessao(consulta):
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = consulta
+    return db
+
+
+@pytest.mark.parametrize(
+    "status_inicial, transicao, status_final, libera, ocupa",
+    [
+        (StatusConsulta.AGENDADA, ConsultaService.confirmar_consulta, StatusConsulta.CONFIRMADA, False, False),
+        (StatusConsulta.CONFIRMADA, ConsultaService.iniciar_consulta, StatusConsulta.EM_ANDAMENTO, True, False),
+        (StatusConsulta.EM_ANDAMENTO, ConsultaService.finalizar_consulta, StatusConsulta.FINALIZADA, False, False),
+        (StatusConsulta.AGENDADA, ConsultaService.cancelar_consulta, StatusConsulta.CANCELADA, True, False),
+    ],
+)
+def test_transicoes_de_status(status_inicial, transicao, status_final, libera, ocupa):
+    consulta = Consulta(id=7, medicoId=3, pacienteId=5, dataHora=DATA_HORA, status=status_inicial)
+    db = _sessao(consulta)
+
+    with patch.object(consulta_service, "TimelineService") as timeline, \
+            patch.object(consulta_service, "MedicoPacienteService"), \
+            patch.object(consulta_service, "liberar_apos_commit") as liberar, \
+            patch.object(consulta_service, "ocupar_apos_commit") as ocupar:
+        resultado = transicao(db, 7)
+
+    assert resultado.status == status_final
+    timeline.atualizar_status.assert_called_once_with(
+        db, TipoEvento.CONSULTA, 7, status_final.value
+    )
+    assert liberar.called == libera
+    assert ocupar.called == ocupa
+    if libera:
+        liberar.assert_called_once_with(db, 3, DATA_HORA)
+    db.commit.assert_called()
+
+
+def test_consulta_inexistente():
+    with pytest.raises(ValueError):
+        ConsultaService.confirmar_consulta(_sessao(None), 1)
+
+
+@pytest.mark.parametrize(
+    "status_inicial, descontos",
+    [(StatusConsulta.AGENDADA, 1), (StatusConsulta.CANCELADA, 0)],
+)
+def test_cancelar_desconta_consulta_do_relacionamento(status_inicial, descontos):
+    consulta = Consulta(id=7, medicoId=3, pacienteId=5, dataHora=DATA_HORA, status=status_inicial)
+    db = _sessao(consulta)
+
+    with patch.object(consulta_service, "TimelineService"), \
+            patch.object(consulta_service, "MedicoPacienteService") as relacionamento, \
+            patch.object(consulta_service, "liberar_apos_commit"), \
+            patch.object(consulta_service, "ocupar_apos_commit"):
+        ConsultaService.cancelar_consulta(db, 7)
+
+    assert relacionamento.remover_interacao.call_count == descontos
+    if descontos:
+        relacionamento.remover_interacao.assert_called_once_with(db, 3, 5, consultas=1)
+
+
+def test_agendar_recusa_horario_sobreposto():
+    db = MagicMock()
+    db.query.return_value.filter.return_value.scalar.return_value = 30
+    db.query.return_value.filter.return_value.first.return_value = (99,)
+
+    with pytest.raises(ValueError, match="Horário não disponível"):
+        ConsultaService.agendar_consulta(db, 5, 3, DATA_HORA)
+
+    sql = str(db.execute.call_args_list[0].args[0])
+    assert "pg_advisory_xact_lock" in sql
+    db.rollback.assert_called_once()
+    db.add.assert_not_called()
@@ -0,0 +1,39 @@
+"""Cursor opaco da paginação keyset"""
+
+import base64
+from datetime import datetime
+
+import pytest
+
+from app.core.paginacao import codificar_cursor, decodificar_cursor
+from app.gestao_consultas.models.consulta import Consulta
+
+COLUNAS = (Consulta.dataHora, Consulta.id)
+
+
+def _cru(json_bytes: bytes) -> str:
+    return base64.urlsafe_b64encode(json_bytes).decode().rstrip("=")
+
+
+def test_ida_e_volta():
+    cursor = codificar_cursor(datetime(2030, 1, 1, 9, 30), 42)
+    assert decodificar_cursor(cursor, COLUNAS) == [datetime(2030, 1, 1, 9, 30), 42]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "nao-e-base64!",
+        _cru(b"{}"),
+        _cru(b'[{"dt": "2030-01-01T00:00:00"}]'),
+        _cru(b'["2030-01-01", 1]'),
+        _cru(b'[{"dt": 5}, 1]'),
+        _cru(b'[{"dt": "ontem"}, 1]'),
+        _cru(b'[{"dt": "2030-01-01T00:00:00"}, "1"]'),
+        _cru(b'[{"dt": "2030-01-01T00:00:00"}, true]'),
+        _cru(b'[{"dt": "2030-01-01T00:00:00"}, null]'),
+    ],
+)
+def test_cursor_invalido(cursor):
+    with pytest.raises(ValueError, match="Cursor inválido"):
+        decodificar_cursor(cursor, COLUNAS)